@@ -5,6 +5,10 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+The notification stream (/api/notifications/stream/) is a long-lived
+response, so serve the project through this module (e.g.
+``uvicorn backend.asgi:application``) rather than WSGI.
 """
 
 import os
@@ -46,15 +46,17 @@ INSTALLED_APPS = [
 
 #Middleware are layers that process requests and responses.
 MIDDLEWARE = [
+    'campus.perf.PerformanceMiddleware',  # first, so its timing covers everything below
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',    
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'campus.routers.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    
+    'campus.db.ConnectionTimingMiddleware',
 ]
 
 #This tells Django:
@@ -82,17 +84,58 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# DB_ENGINE=django.db.backends.sqlite3 with DB_NAME=<file> runs everything
+# (including the benchmark suite) without a MySQL server.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        'ENGINE': os.environ.get('DB_ENGINE', 'django.db.backends.mysql'),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
         'PASSWORD': os.environ.get('DB_PASSWORD'),
         'HOST': os.environ.get('DB_HOST', 'localhost'),
         'PORT': os.environ.get('DB_PORT', '3307'),
+        # Keep each worker thread's connection for this many seconds instead of
+        # reconnecting per request (0 = close after every request). Under ASGI
+        # connections aren't reused across requests; set 0 there.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        # ping a reused connection before its first query in a request, so a
+        # connection MySQL dropped (wait_timeout, restart) is replaced, not an error
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'true').lower() == 'true',
     }
 }
 
+# Read replicas (campus/routers.py): DB_REPLICAS is a comma separated list of
+# MySQL `host[:port]` entries sharing the primary's credentials, or, with the
+# SQLite engine, database file names. They become replica1, replica2, ...
+for number, replica in enumerate(filter(None, os.environ.get('DB_REPLICAS', '').split(',')), start=1):
+    replica_config = dict(DATABASES['default'])
+    if 'sqlite' in replica_config['ENGINE']:
+        replica_config['NAME'] = replica.strip()
+    else:
+        host, _, port = replica.strip().partition(':')
+        replica_config.update(HOST=host, PORT=port or replica_config['PORT'])
+    DATABASES[f'replica{number}'] = replica_config
+
+DATABASE_ROUTERS = ['campus.routers.ReplicaRouter']
+# after a write, that user's reads stay on the primary this long (replication lag budget)
+READ_YOUR_WRITES_SECONDS = int(os.environ.get('DB_READ_YOUR_WRITES_SECONDS', 5))
+
+# Open the database connection when a worker starts (backend/wsgi.py) rather
+# than on its first request. Not with gunicorn --preload: forked workers
+# must not share one socket.
+DB_PREWARM = os.environ.get('DB_PREWARM', 'false').lower() == 'true'
+# Time the connection setup of every request (campus/db.py, Server-Timing: db-connect).
+DB_CONNECTION_TIMING = os.environ.get('DB_CONNECTION_TIMING', 'true').lower() == 'true'
+
+# Request profiling (campus/perf.py, /api/metrics/). Every request is timed;
+# PERF_SAMPLE_RATE of them also get SQL, serializer and N+1 analysis.
+PERF_ENABLED = True
+PERF_SAMPLE_RATE = float(os.environ.get('PERF_SAMPLE_RATE', 1.0 if DEBUG else 0.05))
+PERF_N_PLUS_ONE_THRESHOLD = 5  # the same SQL this many times in one request is flagged
+PERF_HISTORY = 500  # recent durations kept per view for the percentiles
+# /api/metrics/ is staff only; set this to let a scraper in with `X-Metrics-Token: <value>`
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -137,11 +180,19 @@ AUTH_USER_MODEL = 'campus.User'
 #tell Django REST framework to use session authentication
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'campus.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ),
+    # list endpoints return {"next", "previous", "results"}; see campus/pagination.py
+    'DEFAULT_PAGINATION_CLASS': 'campus.pagination.CampusCursorPagination',
 }
 
+# API tokens (campus/authentication.py)
+AUTH_TOKEN_LIFETIME_SECONDS = int(os.environ.get('AUTH_TOKEN_LIFETIME_SECONDS', 7 * 24 * 3600))
+AUTH_TOKEN_ROTATE_AFTER_SECONDS = 24 * 3600  # logging in again after this issues a new token
+AUTH_TOKEN_CACHE_TTL = 30  # how long a worker may keep using a revoked token it has cached
+AUTH_TOKEN_CACHE_SIZE = 10000
+
 #This allows React to send & receive cookies.
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
@@ -153,9 +204,72 @@ CSRF_TRUSTED_ORIGINS = [
 ]
 
 
+# Shared cache. Defaults to per-process memory; point CACHE_BACKEND/CACHE_LOCATION
+# at e.g. django.core.cache.backends.redis.RedisCache to share it between workers.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'gradlink'),
+    }
+}
+
+# Seconds a worker trusts its own copy of the mentorship type catalogue
+# before re-reading the shared cache (campus/cache.py).
+MENTORSHIP_TYPE_LOCAL_TTL = 30
+# Safety net for the shared copy, which is otherwise cleared when a type changes.
+MENTORSHIP_TYPE_CATALOGUE_TTL = 3600
+
+# Safety net for the per-student job board visibility cache, which is
+# otherwise invalidated when mentorships are accepted or cancelled.
+VISIBLE_POSTERS_TTL = 600
+
+
+# Delta sync (/api/sync/)
+SYNC_PAGE_SIZE = 500  # rows per model per response
+SYNC_OVERLAP_SECONDS = 5  # re-send this much history to catch late commits
+SYNC_TOMBSTONE_RETENTION_DAYS = 30  # `prune_tombstones` deletes older ones
+
+# Largest id list accepted by the bulk-status endpoints (campus/transitions.py)
+BULK_STATUS_MAX_IDS = 500
+
+
+# Push notifications (/api/notifications/stream/, campus/notifications.py).
+# The in-process broker only reaches clients connected to the same worker;
+# run several workers with campus.notifications.RedisBroker instead.
+NOTIFICATION_BROKER = os.environ.get('NOTIFICATION_BROKER', 'campus.notifications.InProcessBroker')
+NOTIFICATION_REDIS_URL = os.environ.get('NOTIFICATION_REDIS_URL', 'redis://localhost:6379/0')
+NOTIFICATION_HEARTBEAT_SECONDS = 15  # keep-alive comment so proxies don't drop idle streams
+NOTIFICATION_RETRY_MS = 3000  # how long EventSource waits before reconnecting
+
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Media serving (campus/media.py). With MEDIA_SENDFILE='nginx' the view answers
+# with X-Accel-Redirect to MEDIA_ACCEL_PREFIX (an `internal` location aliased to
+# MEDIA_ROOT); with 'sendfile' it sets X-Sendfile (Apache mod_xsendfile, lighttpd).
+# Left empty, files are streamed by Django with Range/ETag support.
+MEDIA_SENDFILE = os.environ.get('MEDIA_SENDFILE', '')
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+MEDIA_SIGNATURE_MAX_AGE = 6 * 3600  # lifetime of the signed resume/activity links in API responses
+MEDIA_CACHE_SECONDS = 3600
+
+# Profile image variants (campus/thumbnails.py)
+THUMBNAIL_SIZES = (64, 128, 256)
+THUMBNAIL_WORKERS = 2  # background threads per process; 0 makes them inline after commit
+
+# Resumes and activity files (campus/uploads.py)
+UPLOAD_LIMITS = {
+    'resume': {'max_size': 5 * 1024 * 1024, 'extensions': ['pdf', 'doc', 'docx']},
+    'activity_file': {
+        'max_size': 25 * 1024 * 1024,
+        'extensions': ['pdf', 'doc', 'docx', 'ppt', 'pptx', 'xls', 'xlsx', 'txt', 'png', 'jpg', 'jpeg', 'zip'],
+    },
+}
+UPLOAD_MAX_CHUNK_SIZE = 8 * 1024 * 1024
+UPLOAD_TEMP_DIR = os.environ.get('UPLOAD_TEMP_DIR', os.path.join(BASE_DIR, 'upload_tmp'))  # outside MEDIA_ROOT
+UPLOAD_SESSION_TTL_HOURS = 24  # `prune_uploads` drops unfinished uploads older than this
+
 # Email Configuration
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
@@ -164,3 +278,9 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
+
+# Notification emails go through the campus outbox (campus/emails.py) and are
+# delivered by `python manage.py send_queued_emails --loop`.
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_BACKOFF_SECONDS = 60  # doubled after every failed attempt
+EMAIL_OUTBOX_LEASE_SECONDS = 300  # how long a worker may hold a claimed batch
@@ -17,9 +17,11 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
+from campus.views import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('campus.urls')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    # access-checked; the transfer itself is handed to nginx/Apache when MEDIA_SENDFILE is set
+    path(settings.MEDIA_URL.lstrip('/') + '<path:path>', serve_media),
+]
@@ -9,10 +9,15 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
 
+if settings.DB_PREWARM:
+    from campus.db import prewarm_connections
+    prewarm_connections()
+
 #Used to deploy the Django application on a web server
\ No newline at end of file
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CampusConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'campus'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (registers the model signal receivers)
+        from .db import install_connection_timing
+        from .perf import install_serializer_timing
+        install_serializer_timing()
+        install_connection_timing()
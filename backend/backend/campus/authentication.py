@@ -0,0 +1,123 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+# =========================
+# TOKEN EXPIRY
+# =========================
+def token_expires_at(created):
+    return created + timedelta(seconds=settings.AUTH_TOKEN_LIFETIME_SECONDS)
+
+
+def token_expired(created):
+    return timezone.now() >= token_expires_at(created)
+
+
+def issue_token(user):
+    """
+    Returns the user's token, replacing it with a fresh one when it has
+    expired or is past AUTH_TOKEN_ROTATE_AFTER_SECONDS.
+    """
+    token, created = Token.objects.get_or_create(user=user)
+    age = (timezone.now() - token.created).total_seconds()
+    if not created and (token_expired(token.created) or age >= settings.AUTH_TOKEN_ROTATE_AFTER_SECONDS):
+        token.delete()  # evicted from the cache by the post_delete receiver
+        token = Token.objects.create(user=user)
+    return token
+
+
+# =========================
+# TOKEN CACHE
+# =========================
+# Token key -> (user, token created) in a bounded per-process LRU, so an
+# authenticated request normally skips the Token + User query. Entries live
+# for AUTH_TOKEN_CACHE_TTL seconds. Deleting a token or saving/deleting a
+# user evicts the entries in this process (see campus/signals.py); other
+# processes drop theirs when the TTL runs out.
+class TokenCache:
+    def __init__(self):
+        self._entries = OrderedDict()  # key -> (user, created, expires)
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() >= entry[2]:
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[0], entry[1]
+
+    def set(self, key, user, created):
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (user, created, time.monotonic() + settings.AUTH_TOKEN_CACHE_TTL)
+            self._keys_by_user.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > settings.AUTH_TOKEN_CACHE_SIZE:
+                self._discard(next(iter(self._entries)))
+
+    def evict(self, key):
+        with self._lock:
+            self._discard(key)
+
+    def evict_user(self, user_id):
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._keys_by_user.get(entry[0].pk)
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[entry[0].pk]
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication with expiring tokens and the token cache above in front of the lookup."""
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            try:
+                token = Token.objects.select_related('user').get(key=key)
+            except Token.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            user = token.user
+            user._state.fields_cache.clear()
+            token_cache.set(key, user, token.created)
+            cached = (user, token.created)
+
+        user, created = cached
+        if token_expired(created):
+            token_cache.evict(key)
+            raise exceptions.AuthenticationFailed(_('Token has expired.'))
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        # each request gets its own copy, so caches it fills (alumni_profile...) don't leak across requests
+        user = copy.copy(user)
+        token = Token(key=key, user=user, created=created)
+        return user, token
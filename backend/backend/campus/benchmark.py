@@ -0,0 +1,378 @@
+import datetime
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from .db import connection_stats, reset_connection_stats
+from .models import (
+    User, AlumniProfile, MentorshipType, Event, MentorshipRequest,
+    MentorshipActivity, Job, ReferralRequest,
+)
+from .mentorships import rebuild_mentorships
+from .stats import rebuild_alumni_stats
+
+
+# =========================
+# SYNTHETIC DATA GENERATOR
+# =========================
+BENCH_PASSWORD = 'bench-pass-123'
+BATCH_SIZE = 5000
+
+DEGREES = ['B.Tech CSE', 'B.Tech ECE', 'B.Tech ME', 'B.Sc Physics', 'B.Com', 'MBA', 'MCA']
+COMPANIES = ['Google', 'Infosys', 'TCS', 'Deloitte', 'Meta', 'UST', 'IBS', 'Microsoft', 'Amazon', 'Wipro']
+INDUSTRIES = ['Software', 'Consulting', 'Finance', 'Manufacturing', 'Research', 'Education']
+TITLES = ['Software Engineer', 'Data Analyst', 'Product Manager', 'Consultant', 'Designer', 'SRE']
+MENTORSHIP_TYPES = ['Career Guidance', 'Resume Review', 'Mock Interview', 'Higher Studies', 'Startup Advice']
+
+
+def default_counts(users):
+    """Row counts for every table, derived from the number of users."""
+    alumni = max(1, users // 5)
+    students = max(1, users - alumni)
+    requests = students * 2
+    return {
+        'alumni': alumni,
+        'students': students,
+        'events': max(1, users // 50),
+        'registrations_per_event': 20,
+        'mentorship_requests': requests,
+        'activities': requests,
+        'jobs': alumni,
+        'referrals': students // 2,
+    }
+
+
+def bulk_insert(model, rows):
+    """Inserts `rows` (any iterable, usually a generator) BATCH_SIZE at a time, so only one batch is in memory."""
+    rows = iter(rows)
+    while batch := list(islice(rows, BATCH_SIZE)):
+        model.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+
+
+def generate_campus_data(counts, seed=0, log=print):
+    """
+    Inserts a synthetic campus with bulk_create. Users are named
+    bench_student_<n> / bench_alumni_<n> and all share BENCH_PASSWORD.
+    Returns the number of rows created per table.
+    """
+    rng = random.Random(seed)
+    password = make_password(BENCH_PASSWORD)  # hash once, reuse for every user
+    now = timezone.now()
+
+    types = [MentorshipType.objects.get_or_create(name=name)[0] for name in MENTORSHIP_TYPES]
+
+    def make_users(role, count):
+        log(f"Creating {count} {role} users")
+        prefix = f'bench_{role}_'
+        start = User.objects.filter(username__startswith=prefix).count()
+        bulk_insert(User, (
+            User(
+                username=f'{prefix}{start + i}', password=password, role=role,
+                first_name=f'{role.title()}{start + i}', last_name=rng.choice(['Nair', 'Menon', 'Pillai', 'Thomas']),
+                email=f'{prefix}{start + i}@bench.local', college='Bench College',
+                degree=rng.choice(DEGREES), batch_year=rng.randint(2000, 2026),
+            )
+            for i in range(count)
+        ))
+        return list(User.objects.filter(username__startswith=prefix).order_by('-id').values_list('id', flat=True)[:count])
+
+    alumni_ids = make_users('alumni', counts['alumni'])
+    student_ids = make_users('student', counts['students'])
+
+    log("Creating alumni profiles")
+    bulk_insert(AlumniProfile, (
+        AlumniProfile(
+            user_id=user_id, current_company=rng.choice(COMPANIES), job_title=rng.choice(TITLES),
+            industry=rng.choice(INDUSTRIES), years_of_experience=rng.randint(0, 25),
+            willing_to_mentor=rng.random() < 0.6,
+        )
+        for user_id in alumni_ids
+    ))
+    profiles = list(AlumniProfile.objects.filter(user_id__in=alumni_ids).values_list('id', flat=True))
+    bulk_insert(AlumniProfile.available_for.through, (
+        AlumniProfile.available_for.through(alumniprofile_id=profile_id, mentorshiptype_id=t.id)
+        for profile_id in profiles for t in rng.sample(types, rng.randint(1, 3))
+    ))
+
+    log(f"Creating {counts['events']} events")
+    bulk_insert(Event, (
+        Event(
+            title=f'Bench event {i}', description='Synthetic event', type=rng.choice(['online', 'offline']),
+            date=datetime.date(2026, 1, 1) + datetime.timedelta(days=rng.randint(-365, 365)),
+            time=datetime.time(rng.randint(8, 20), 0), location='Main hall', organizer_id=rng.choice(alumni_ids),
+        )
+        for i in range(counts['events'])
+    ))
+    event_ids = list(Event.objects.order_by('-id').values_list('id', flat=True)[:counts['events']])
+    per_event = min(counts['registrations_per_event'], len(student_ids))
+    bulk_insert(Event.registered_users.through, (
+        Event.registered_users.through(event_id=event_id, user_id=user_id)
+        for event_id in event_ids for user_id in rng.sample(student_ids, per_event)
+    ))
+
+    log(f"Creating {counts['mentorship_requests']} mentorship requests")
+    statuses = ['pending', 'accepted', 'accepted', 'rejected', 'cancelled']
+    bulk_insert(MentorshipRequest, (
+        MentorshipRequest(
+            student_id=rng.choice(student_ids), alumni_id=rng.choice(alumni_ids),
+            message='Synthetic request', status=rng.choice(statuses),
+        )
+        for _ in range(counts['mentorship_requests'])
+    ))
+    request_ids = list(MentorshipRequest.objects.order_by('-id').values_list('id', flat=True)[:counts['mentorship_requests']])
+    bulk_insert(MentorshipRequest.mentorship_types.through, (
+        MentorshipRequest.mentorship_types.through(mentorshiprequest_id=request_id, mentorshiptype_id=rng.choice(types).id)
+        for request_id in request_ids
+    ))
+
+    log(f"Creating {counts['activities']} mentorship activities")
+    bulk_insert(MentorshipActivity, (
+        MentorshipActivity(
+            mentorship_request_id=rng.choice(request_ids), title='Synthetic session',
+            status=rng.choice(['pending', 'in_progress', 'completed', 'scheduled']),
+            date=now + datetime.timedelta(days=rng.randint(-60, 60)),
+        )
+        for _ in range(counts['activities'])
+    ))
+
+    log(f"Creating {counts['jobs']} jobs and {counts['referrals']} referrals")
+    bulk_insert(Job, (
+        Job(
+            title=rng.choice(TITLES), company=rng.choice(COMPANIES), location=rng.choice(['Kochi', 'Bangalore', 'Remote']),
+            description='Synthetic job', job_type=rng.choice(['full_time', 'internship', 'contract']),
+            posted_by_id=rng.choice(alumni_ids),
+        )
+        for _ in range(counts['jobs'])
+    ))
+    job_ids = list(Job.objects.order_by('-id').values_list('id', flat=True)[:counts['jobs']])
+    bulk_insert(ReferralRequest, (
+        ReferralRequest(
+            job_id=rng.choice(job_ids), student_id=rng.choice(student_ids), resume='referral_resumes/bench.pdf',
+            status=rng.choice(['pending', 'viewed', 'referred', 'rejected']),
+        )
+        for _ in range(counts['referrals'])
+    ))
+
+    # bulk_create skips the signal receivers, so build the dashboard counters
+    # and the mentorship read model directly
+    log("Rebuilding alumni stats")
+    rebuild_alumni_stats(alumni_ids)
+    log("Rebuilding mentorships")
+    rebuild_mentorships(alumni_ids)
+    return counts
+
+
+# =========================
+# SCENARIOS
+# =========================
+# Each scenario is (name, role, method, path, body). `path` and `body` may be
+# callables taking the run context, which holds sample ids picked from the data.
+def sample_context():
+    student = User.objects.filter(role='student', sent_mentorship_requests__status='accepted').first() \
+        or User.objects.filter(role='student').first()
+    alumni = User.objects.filter(role='alumni', received_mentorship_requests__isnull=False).first() \
+        or User.objects.filter(role='alumni').first()
+    if student is None or alumni is None:
+        raise ValueError("The database needs at least one student and one alumni; run generate_campus_data first.")
+
+    mentorship_request = MentorshipRequest.objects.filter(alumni=alumni).first()
+    return {
+        'student': student,
+        'alumni': alumni,
+        'event_id': Event.objects.values_list('id', flat=True).first(),
+        'request_id': mentorship_request.id if mentorship_request else None,
+        'type_id': MentorshipType.objects.values_list('id', flat=True).first(),
+        'counter': iter(range(10 ** 9)),
+    }
+
+
+def signup_body(ctx):
+    n = next(ctx['counter'])
+    return {
+        'username': f'bench_signup_{time.time_ns()}_{n}', 'email': f'signup{n}@bench.local',
+        'password': BENCH_PASSWORD, 'confirm_password': BENCH_PASSWORD, 'first_name': 'New', 'last_name': 'User',
+        'role': 'student', 'college': 'Bench College', 'degree': 'B.Tech CSE', 'batch_year': 2026,
+    }
+
+
+SCENARIOS = [
+    ('signup', None, 'post', '/api/signup/', signup_body),
+    ('login', None, 'post', '/api/login/', lambda ctx: {'username': ctx['student'].username, 'password': BENCH_PASSWORD}),
+    ('profile (get)', 'student', 'get', '/api/profile/update/', None),
+    ('profile (update)', 'student', 'put', '/api/profile/update/', {'bio': 'Benchmarking'}),
+    ('logout', 'student', 'post', '/api/logout/', None),
+    ('delete profile', 'throwaway', 'delete', '/api/delete-profile/', None),
+    ('dashboard stats', 'alumni', 'get', '/api/alumni/dashboard-stats/', None),
+    ('events (list)', 'student', 'get', '/api/events/', None),
+    ('events (detail)', 'student', 'get', lambda ctx: f"/api/events/{ctx['event_id']}/", None),
+    ('events (register)', 'student', 'put', lambda ctx: f"/api/events/{ctx['event_id']}/register/", None),
+    ('events (unregister)', 'student', 'delete', lambda ctx: f"/api/events/{ctx['event_id']}/register/", None),
+    ('events (create)', 'alumni', 'post', '/api/events/', {
+        'title': 'Bench talk', 'description': '-', 'date': '2026-06-01', 'time': '10:00',
+        'location': 'Online', 'type': 'online',
+    }),
+    ('alumni (list)', 'student', 'get', '/api/alumni/', None),
+    ('alumni (search)', 'student', 'get', '/api/alumni/?q=engineer&industry=Software', None),
+    ('alumni (detail)', 'student', 'get', lambda ctx: f"/api/alumni/{ctx['alumni'].id}/", None),
+    ('mentorship types', 'student', 'get', '/api/mentorship-types/', None),
+    ('mentorship requests (student)', 'student', 'get', '/api/mentorship-requests/', None),
+    ('mentorship requests (alumni)', 'alumni', 'get', '/api/mentorship-requests/', None),
+    ('mentorships (mentors)', 'student', 'get', '/api/mentorships/', None),
+    ('mentorships (mentees)', 'alumni', 'get', '/api/mentorships/', None),
+    ('mentorship requests (create)', 'student', 'post', '/api/mentorship-requests/',
+     lambda ctx: {'alumni': ctx['alumni'].id, 'message': 'Bench', 'mentorship_types': [ctx['type_id']]}),
+    ('mentorship requests (accept)', 'alumni', 'post', lambda ctx: f"/api/mentorship-requests/{ctx['request_id']}/accept/", None),
+    ('mentorship activities (list)', 'alumni', 'get', '/api/mentorship-activities/', None),
+    ('mentorship activities (create)', 'alumni', 'post', '/api/mentorship-activities/',
+     lambda ctx: {'mentorship_request': ctx['request_id'], 'title': 'Bench session', 'status': 'pending'}),
+    ('jobs (student feed)', 'student', 'get', '/api/jobs/', None),
+    ('jobs (my jobs)', 'alumni', 'get', '/api/jobs/?my_jobs=true', None),
+    ('referrals (student)', 'student', 'get', '/api/referrals/', None),
+    ('referrals (alumni)', 'alumni', 'get', '/api/referrals/', None),
+]
+
+
+# =========================
+# RUNNER
+# =========================
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def make_client(role, ctx):
+    client = Client(HTTP_HOST='localhost')
+    if role is None:
+        return client
+    if role == 'throwaway':
+        n = next(ctx['counter'])
+        user = User.objects.create_user(
+            username=f'bench_throwaway_{time.time_ns()}_{n}', password=BENCH_PASSWORD, role='student',
+            college='Bench College', degree='B.Tech CSE', batch_year=2026,
+        )
+    else:
+        user = ctx[role]
+    token, _ = Token.objects.get_or_create(user=user)
+    client.defaults['HTTP_AUTHORIZATION'] = f'Token {token.key}'
+    return client
+
+
+def run_once(scenario, ctx):
+    name, role, method, path, body = scenario
+    client = make_client(role, ctx)  # setup is not timed
+    path = path(ctx) if callable(path) else path
+    body = body(ctx) if callable(body) else body
+    kwargs = {'data': body, 'content_type': 'application/json'} if body is not None else {}
+
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = getattr(client, method)(path, **kwargs)
+        elapsed = time.perf_counter() - started
+    return elapsed, len(queries.captured_queries), len(response.content), response.status_code
+
+
+def run_scenario(scenario, ctx, iterations, warmup=2, threads=1):
+    for _ in range(warmup):
+        run_once(scenario, ctx)
+
+    def worker(count):
+        try:
+            return [run_once(scenario, ctx) for _ in range(count)]
+        finally:
+            if threads > 1:
+                connections.close_all()  # each thread owns its own connection
+
+    reset_connection_stats()
+    started = time.perf_counter()
+    if threads > 1:
+        shares = [iterations // threads + (1 if i < iterations % threads else 0) for i in range(threads)]
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            samples = [sample for chunk in pool.map(worker, shares) for sample in chunk]
+    else:
+        samples = worker(iterations)
+    wall = time.perf_counter() - started
+    db = connection_stats()
+
+    latencies = sorted(sample[0] * 1000 for sample in samples)
+    # Sequential runs divide by the time spent inside requests so untimed setup
+    # (creating throwaway users, tokens) doesn't count; threaded runs use wall time.
+    busy = wall if threads > 1 else sum(sample[0] for sample in samples)
+    statuses = {}
+    for sample in samples:
+        statuses[str(sample[3])] = statuses.get(str(sample[3]), 0) + 1
+    return {
+        'name': scenario[0],
+        'requests': len(samples),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        'throughput_rps': round(len(samples) / busy, 2) if busy else 0.0,
+        'queries_per_request': round(sum(sample[1] for sample in samples) / len(samples), 2) if samples else 0.0,
+        'bytes_per_request': round(sum(sample[2] for sample in samples) / len(samples)) if samples else 0,
+        # CONN_MAX_AGE at work: new connections opened vs reused, and the setup cost per request
+        'connections_opened': db['opened'],
+        'connect_ms_per_request': db['setup_ms_per_request'] or 0.0,
+        'statuses': statuses,
+    }
+
+
+def run_benchmark(iterations=50, warmup=2, threads=1, only=None, log=print):
+    ctx = sample_context()
+    scenarios = [s for s in SCENARIOS if not only or any(word in s[0] for word in only)]
+    results = []
+    for scenario in scenarios:
+        log(f"Running {scenario[0]}")
+        results.append(run_scenario(scenario, ctx, iterations, warmup=warmup, threads=threads))
+
+    return {
+        'timestamp': timezone.now().isoformat(),
+        'database': connection.vendor,
+        'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE', 0),
+        'iterations': iterations,
+        'threads': threads,
+        'dataset': {
+            'users': User.objects.count(),
+            'events': Event.objects.count(),
+            'mentorship_requests': MentorshipRequest.objects.count(),
+            'mentorship_activities': MentorshipActivity.objects.count(),
+            'jobs': Job.objects.count(),
+            'referrals': ReferralRequest.objects.count(),
+        },
+        'scenarios': results,
+    }
+
+
+def compare_results(current, baseline):
+    """Returns rows of (scenario, metric, baseline, current, change %) for scenarios present in both runs."""
+    previous = {row['name']: row for row in baseline['scenarios']}
+    rows = []
+    for row in current['scenarios']:
+        old = previous.get(row['name'])
+        if old is None:
+            continue
+        for metric in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps', 'queries_per_request'):
+            change = (row[metric] - old[metric]) / old[metric] * 100 if old[metric] else 0.0
+            rows.append((row['name'], metric, old[metric], row[metric], round(change, 1)))
+    return rows
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_results(results, path):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
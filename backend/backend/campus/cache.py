@@ -0,0 +1,120 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .mentorships import mentor_ids
+from .models import MentorshipType
+
+
+# =========================
+# MENTORSHIP TYPE CATALOGUE
+# =========================
+# The catalogue is tiny and rarely changes, so it is kept in two layers:
+# a per-process copy (no network hop at all) that is trusted for
+# MENTORSHIP_TYPE_LOCAL_TTL seconds, backed by the shared Django cache.
+# Saving or deleting a MentorshipType clears both once the transaction
+# commits (see campus/signals.py), so a concurrent rebuild can't cache the
+# old rows; other processes pick the change up when their local copy
+# expires. The shared entry also expires after MENTORSHIP_TYPE_CATALOGUE_TTL,
+# in case an invalidation is ever missed.
+CATALOGUE_KEY = 'campus:mentorship-type-catalogue'
+
+_local = {'catalogue': None, 'expires': 0.0}
+
+
+def get_mentorship_type_catalogue():
+    """
+    Returns a dict with the serialized `types`, an id -> name map in `names`,
+    and the `etag` / `last_modified` validators for conditional requests.
+    """
+    now = time.monotonic()
+    if _local['catalogue'] is not None and now < _local['expires']:
+        return _local['catalogue']
+
+    catalogue = cache.get(CATALOGUE_KEY)
+    if catalogue is None:
+        catalogue = build_catalogue()
+        cache.set(CATALOGUE_KEY, catalogue, settings.MENTORSHIP_TYPE_CATALOGUE_TTL)
+
+    _local['catalogue'] = catalogue
+    _local['expires'] = now + settings.MENTORSHIP_TYPE_LOCAL_TTL
+    return catalogue
+
+
+def build_catalogue():
+    types = [{'id': t.id, 'name': t.name} for t in MentorshipType.objects.order_by('id')]
+    digest = hashlib.md5(json.dumps(types, sort_keys=True).encode()).hexdigest()
+    return {
+        'types': types,
+        'names': {t['id']: t['name'] for t in types},
+        'etag': f'"{digest}"',
+        'last_modified': int(time.time()),
+    }
+
+
+def clear_mentorship_type_catalogue():
+    cache.delete(CATALOGUE_KEY)
+    _local['catalogue'] = None
+
+
+def invalidate_mentorship_type_catalogue():
+    transaction.on_commit(clear_mentorship_type_catalogue)
+
+
+def mentorship_type_details(ids):
+    """Resolves MentorshipType ids to [{'id', 'name'}] from the catalogue instead of a join."""
+    names = get_mentorship_type_catalogue()['names']
+    if any(type_id not in names for type_id in ids):
+        # created in another process since our local copy was taken
+        _local['catalogue'] = None
+        names = get_mentorship_type_catalogue()['names']
+    return [{'id': type_id, 'name': names[type_id]} for type_id in ids if type_id in names]
+
+
+def mentorship_type_ids(obj, field_name):
+    """
+    Returns the ids behind a MentorshipType many-to-many field on `obj`.
+    Uses prefetched rows when the view loaded them, otherwise reads only the
+    through table.
+    """
+    prefetched = getattr(obj, '_prefetched_objects_cache', {})
+    if field_name in prefetched:
+        return [t.pk for t in prefetched[field_name]]
+
+    field = obj._meta.get_field(field_name)
+    through = field.remote_field.through
+    return list(
+        through.objects.filter(**{field.m2m_field_name(): obj.pk})
+        .order_by(field.m2m_reverse_field_name())
+        .values_list(field.m2m_reverse_field_name(), flat=True)
+    )
+
+
+# =========================
+# JOB BOARD VISIBILITY
+# =========================
+# Students only see jobs posted by alumni who accepted one of their
+# mentorship requests (their Mentorship rows, campus/mentorships.py). That set
+# changes rarely, so it is cached per student and dropped (after commit)
+# whenever one of their requests enters or leaves 'accepted' (see campus/signals.py).
+VISIBLE_POSTERS_KEY = 'campus:visible-posters:{}'
+
+
+def visible_job_posters(student_id):
+    """Returns the sorted ids of the alumni whose jobs `student_id` may see."""
+    key = VISIBLE_POSTERS_KEY.format(student_id)
+    posters = cache.get(key)
+    if posters is None:
+        # read the primary: a lagging replica must not be cached as the truth
+        posters = mentor_ids(student_id, using=DEFAULT_DB_ALIAS)
+        cache.set(key, posters, settings.VISIBLE_POSTERS_TTL)
+    return posters
+
+
+def invalidate_visible_job_posters(student_id):
+    key = VISIBLE_POSTERS_KEY.format(student_id)
+    transaction.on_commit(lambda: cache.delete(key))
@@ -0,0 +1,125 @@
+import threading
+import time
+
+from asgiref.local import Local
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.utils.deprecation import MiddlewareMixin
+
+
+# =========================
+# CONNECTION SETUP TIMING
+# =========================
+# With CONN_MAX_AGE > 0 a worker thread keeps its MySQL connection between
+# requests, so only the first request (or the first after the connection
+# expired or failed its health check) pays for the TCP + auth handshake.
+# These counters show how often that happens and what it costs.
+_stats = {'opened': 0, 'reused': 0, 'setup_seconds': 0.0}
+_stats_lock = threading.Lock()
+
+
+def connection_setup(alias=DEFAULT_DB_ALIAS):
+    """
+    Makes sure `alias` has a usable connection, running the CONN_HEALTH_CHECKS
+    ping if one is due. Returns (seconds spent, whether a new connection was opened).
+    """
+    connection = connections[alias]
+    started = time.perf_counter()
+    connection.close_if_health_check_failed()
+    opened = connection.connection is None
+    connection.ensure_connection()
+    elapsed = time.perf_counter() - started
+
+    with _stats_lock:
+        _stats['opened' if opened else 'reused'] += 1
+        _stats['setup_seconds'] += elapsed
+    return elapsed, opened
+
+
+def connection_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    total = stats['opened'] + stats['reused']
+    stats['reuse_ratio'] = round(stats['reused'] / total, 4) if total else None
+    stats['setup_ms_per_request'] = round(stats['setup_seconds'] * 1000 / total, 3) if total else None
+    return stats
+
+
+def reset_connection_stats():
+    with _stats_lock:
+        _stats.update(opened=0, reused=0, setup_seconds=0.0)
+
+
+def prewarm_connections(aliases=None):
+    """Opens the connections of this thread up front, so the first request doesn't pay for them."""
+    for alias in aliases or [DEFAULT_DB_ALIAS]:
+        connection_setup(alias)
+
+
+# =========================
+# PER-REQUEST TIMING
+# =========================
+# The middleware doesn't touch the database itself: requests that never
+# query (a cached 304, a proxied media file) must not pay for a connection
+# just to have it measured. Instead, while a request is being timed, the
+# first health-check ping and connect of the default connection are timed
+# where Django does them, the first time a query needs a cursor.
+_local = Local()  # per request context, not per thread (see campus/routers.py)
+
+
+def timed(method, kind):
+    def wrapper(self, *args, **kwargs):
+        timing = getattr(_local, 'timing', None)
+        if timing is None or self.alias != DEFAULT_DB_ALIAS:
+            return method(self, *args, **kwargs)
+        if kind == 'connect':
+            timing['used'] = True
+            pending = self.connection is None
+        else:
+            pending = self.connection is not None and self.health_check_enabled and not self.health_check_done
+        if not pending:
+            return method(self, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            timing['seconds'] += time.perf_counter() - started
+            timing['opened'] = timing['opened'] or kind == 'connect'
+    wrapper._campus_timed = True
+    return wrapper
+
+
+def install_connection_timing():
+    # Django has no hook around connection setup, so wrap the two steps of it
+    for name, kind in (('close_if_health_check_failed', 'ping'), ('ensure_connection', 'connect')):
+        method = getattr(BaseDatabaseWrapper, name)
+        if not getattr(method, '_campus_timed', False):
+            setattr(BaseDatabaseWrapper, name, timed(method, kind))
+
+
+class ConnectionTimingMiddleware(MiddlewareMixin):
+    """
+    Reports how long the default connection took to set up (health check
+    plus connect) as `Server-Timing: db-connect`, for requests that used the
+    database. Async views (the notification stream) are skipped.
+    """
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if settings.DB_CONNECTION_TIMING and not iscoroutinefunction(view_func):
+            _local.timing = {'used': False, 'opened': False, 'seconds': 0.0}
+        return None
+
+    def process_response(self, request, response):
+        timing = getattr(_local, 'timing', None)
+        _local.timing = None
+        if timing is None or not timing['used']:
+            return response
+        with _stats_lock:
+            _stats['opened' if timing['opened'] else 'reused'] += 1
+            _stats['setup_seconds'] += timing['seconds']
+        entry = f'db-connect;dur={timing["seconds"] * 1000:.2f};desc="{"new" if timing["opened"] else "reused"}"'
+        existing = response.get('Server-Timing')
+        response['Server-Timing'] = f'{existing}, {entry}' if existing else entry
+        return response
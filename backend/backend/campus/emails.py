@@ -0,0 +1,112 @@
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# QUEUEING
+# =========================
+def queue_email(subject, body, recipients, from_email=None):
+    """
+    Stores an email in the outbox and returns immediately.
+    Delivery happens later in `send_queued_emails`, so a slow or failing
+    SMTP server never blocks the API request.
+    """
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipients),
+        next_attempt_at=timezone.now(),
+    )
+
+
+# =========================
+# DELIVERY
+# =========================
+def claim_batch(batch_size):
+    """
+    Reserves up to `batch_size` due emails for this worker.
+
+    Claiming is a single guarded UPDATE that also pushes `next_attempt_at`
+    forward by a lease, so two workers never pick the same row and rows held
+    by a crashed worker become due again once the lease runs out.
+    """
+    now = timezone.now()
+    due_ids = list(
+        OutboundEmail.objects.filter(status='pending', next_attempt_at__lte=now)
+        .order_by('next_attempt_at', 'id')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    if not due_ids:
+        return []
+
+    token = uuid.uuid4().hex
+    OutboundEmail.objects.filter(id__in=due_ids, status='pending', next_attempt_at__lte=now).update(
+        claim_token=token,
+        next_attempt_at=now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS),
+    )
+    return list(OutboundEmail.objects.filter(claim_token=token, status='pending').order_by('id'))
+
+
+def send_batch(batch_size=50):
+    """
+    Sends one batch of due emails over a single SMTP connection.
+    Returns a (sent, failed) tuple of counts.
+    """
+    emails = claim_batch(batch_size)
+    if not emails:
+        return 0, 0
+
+    sent = failed = 0
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        for email in emails:
+            record_failure(email, e)
+        return 0, len(emails)
+
+    try:
+        for email in emails:
+            message = EmailMessage(
+                email.subject, email.body, email.from_email, email.recipients, connection=connection
+            )
+            try:
+                message.send()
+            except Exception as e:
+                record_failure(email, e)
+                failed += 1
+            else:
+                email.status = 'sent'
+                email.sent_at = timezone.now()
+                email.claim_token = None
+                email.save(update_fields=['status', 'sent_at', 'claim_token'])
+                sent += 1
+    finally:
+        connection.close()
+
+    return sent, failed
+
+
+def record_failure(email, error):
+    """Schedules a retry with exponential backoff, or gives up after the last attempt."""
+    email.attempts += 1
+    email.last_error = str(error)
+    email.claim_token = None
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = 'failed'
+        logger.error("Giving up on email %s after %s attempts: %s", email.id, email.attempts, error)
+    else:
+        delay = settings.EMAIL_OUTBOX_BACKOFF_SECONDS * 2 ** (email.attempts - 1)
+        email.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        logger.warning("Email %s failed (attempt %s), retrying in %ss: %s", email.id, email.attempts, delay, error)
+    email.save(update_fields=['attempts', 'last_error', 'claim_token', 'status', 'next_attempt_at'])
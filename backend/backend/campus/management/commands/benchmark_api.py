@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from campus.benchmark import run_benchmark, compare_results, load_results, save_results
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs every campus API scenario in-process against the configured database and reports "
+        "p50/p95/p99 latency, throughput and queries per request. Mutating scenarios write to the "
+        "database, so point this at a benchmark database (see generate_campus_data)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help='Timed requests per scenario.')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per scenario before measuring.')
+        parser.add_argument('--threads', type=int, default=1, help='Concurrent clients per scenario.')
+        parser.add_argument('--only', nargs='*', help='Only run scenarios whose name contains one of these words.')
+        parser.add_argument('--output', help='Write the results as JSON to this file.')
+        parser.add_argument('--compare', help='A previous JSON result to compare against.')
+
+    def handle(self, *args, **options):
+        # keep notification emails in memory and accept the test client's host
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', ALLOWED_HOSTS=['localhost']):
+            results = run_benchmark(
+                iterations=options['iterations'], warmup=options['warmup'], threads=options['threads'],
+                only=options['only'], log=lambda line: self.stderr.write(line),
+            )
+
+        header = f"{'scenario':<34}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}{'queries':>9}{'bytes':>9}  statuses"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for row in results['scenarios']:
+            self.stdout.write(
+                f"{row['name']:<34}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+                f"{row['throughput_rps']:>9.1f}{row['queries_per_request']:>9.1f}{row['bytes_per_request']:>9}  {row['statuses']}"
+            )
+
+        if options['compare']:
+            self.stdout.write('')
+            self.stdout.write(f"Compared with {options['compare']}:")
+            for name, metric, old, new, change in compare_results(results, load_results(options['compare'])):
+                self.stdout.write(f"  {name:<34}{metric:<22}{old:>10} -> {new:<10} ({change:+.1f}%)")
+
+        if options['output']:
+            save_results(results, options['output'])
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
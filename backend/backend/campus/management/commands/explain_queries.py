@@ -0,0 +1,131 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from campus.models import User
+from campus.views import (
+    EventViewSet, AlumniViewSet, JobViewSet,
+    MentorshipRequestViewSet, MentorshipViewSet, MentorshipActivityViewSet, ReferralRequestViewSet,
+)
+
+
+# (label, viewset, role of the user making the request, query params)
+SCENARIOS = [
+    ('events', EventViewSet, 'student', {}),
+    ('alumni', AlumniViewSet, 'student', {}),
+    ('jobs (student feed)', JobViewSet, 'student', {}),
+    ('jobs (my jobs)', JobViewSet, 'alumni', {'my_jobs': 'true'}),
+    ('mentorship-requests (student)', MentorshipRequestViewSet, 'student', {}),
+    ('mentorship-requests (alumni)', MentorshipRequestViewSet, 'alumni', {}),
+    ('mentorships (mentors)', MentorshipViewSet, 'student', {}),
+    ('mentorships (mentees)', MentorshipViewSet, 'alumni', {}),
+    ('mentorship-activities', MentorshipActivityViewSet, 'alumni', {}),
+    ('mentorship-activities (by request)', MentorshipActivityViewSet, 'alumni', {'request_id': '1', 'status': 'scheduled'}),
+    ('referrals (student)', ReferralRequestViewSet, 'student', {}),
+    ('referrals (alumni)', ReferralRequestViewSet, 'alumni', {}),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs EXPLAIN on the main list query of each campus viewset and reports full table scans. "
+        "On tiny tables the planner may pick a scan even when an index exists, so run this against "
+        "a realistically sized database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--student', help='Username to run the student scenarios as (default: first student).')
+        parser.add_argument('--alumni', help='Username to run the alumni scenarios as (default: first alumni).')
+        parser.add_argument('--fail-on-scan', action='store_true', help='Exit with an error if any full scan is found.')
+
+    def handle(self, *args, **options):
+        users = {
+            'student': self.get_user('student', options['student']),
+            'alumni': self.get_user('alumni', options['alumni']),
+        }
+        factory = APIRequestFactory()
+        flagged = []
+
+        for label, viewset_class, role, params in SCENARIOS:
+            queryset = self.list_queryset(factory, viewset_class, users[role], params)
+            plan = explain(queryset)
+            scans = full_scans(plan, connection.vendor)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"== {label}"))
+            self.stdout.write(plan)
+            if scans:
+                flagged.append(label)
+                for line in scans:
+                    self.stdout.write(self.style.WARNING(f"FULL SCAN: {line}"))
+            else:
+                self.stdout.write(self.style.SUCCESS("OK: no full scans"))
+            self.stdout.write('')
+
+        if flagged:
+            summary = f"{len(flagged)} quer{'y' if len(flagged) == 1 else 'ies'} with full scans: {', '.join(flagged)}"
+            if options['fail_on_scan']:
+                raise CommandError(summary)
+            self.stdout.write(self.style.WARNING(summary))
+        else:
+            self.stdout.write(self.style.SUCCESS("All queries use indexes."))
+
+    def get_user(self, role, username):
+        if username:
+            try:
+                return User.objects.get(username=username, role=role)
+            except User.DoesNotExist:
+                raise CommandError(f"No {role} named '{username}'.")
+        user = User.objects.filter(role=role).order_by('id').first()
+        # an empty database still produces a plan, just for a user that doesn't exist
+        return user or User(id=0, role=role)
+
+    def list_queryset(self, factory, viewset_class, user, params):
+        http_request = factory.get('/', params)
+        force_authenticate(http_request, user=user)
+        view = viewset_class(action='list', format_kwarg=None, kwargs={})
+        view.request = Request(http_request)
+        view.request.user = user
+        queryset = view.filter_queryset(view.get_queryset())
+        # mirror what CampusCursorPagination sends for the first page
+        ordering = getattr(view, 'cursor_ordering', None)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset[:view.paginator.page_size if view.paginator else 20]
+
+
+def explain(queryset):
+    if connection.vendor == 'mysql':
+        # the default on MySQL 8.0.16+ is FORMAT=TREE, which has no access types to check
+        return queryset.explain(format='json')
+    return queryset.explain()
+
+
+def full_scans(plan, vendor):
+    """Returns the plan lines (on MySQL, the tables) read whole without an index."""
+    if vendor == 'mysql':
+        return [
+            f"{table['table_name']} (access_type ALL)"
+            for table in plan_tables(json.loads(plan)) if table.get('access_type') == 'ALL'
+        ]
+    if vendor == 'sqlite':
+        return [
+            line for line in plan.splitlines()
+            if 'SCAN ' in line and 'USING' not in line and 'CONSTANT ROW' not in line
+        ]
+    # PostgreSQL and friends
+    return [line for line in plan.splitlines() if 'Seq Scan' in line]
+
+
+def plan_tables(node):
+    """Yields every `table` entry of a MySQL EXPLAIN FORMAT=JSON plan, however deeply nested."""
+    if isinstance(node, dict):
+        if isinstance(node.get('table'), dict):
+            yield node['table']
+        for value in node.values():
+            yield from plan_tables(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from plan_tables(value)
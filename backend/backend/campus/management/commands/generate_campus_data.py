@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from campus.benchmark import default_counts, generate_campus_data, BENCH_PASSWORD
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills the database with a synthetic campus for benchmarking. Row counts scale with --users "
+        "(10k to 1M is the intended range); each table can be overridden individually."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=0)
+        for name in default_counts(1):
+            parser.add_argument(f"--{name.replace('_', '-')}", type=int, dest=name, help=f'Override the number of {name}.')
+
+    def handle(self, *args, **options):
+        counts = default_counts(options['users'])
+        for name in counts:
+            if options.get(name) is not None:
+                counts[name] = options[name]
+
+        with transaction.atomic():
+            generate_campus_data(counts, seed=options['seed'], log=self.stdout.write)
+
+        summary = ', '.join(f'{name}={count}' for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Generated {summary}. Every bench user's password is '{BENCH_PASSWORD}'."))
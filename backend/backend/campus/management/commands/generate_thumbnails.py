@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from campus.models import User
+from campus.thumbnails import generate_thumbnails
+
+
+class Command(BaseCommand):
+    help = "Creates any missing profile image thumbnails (e.g. for images uploaded before variants existed)."
+
+    def handle(self, *args, **options):
+        created = failed = 0
+        names = User.objects.exclude(image='').exclude(image__isnull=True).values_list('image', flat=True)
+        for name in names.iterator():
+            try:
+                created += generate_thumbnails(name)
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"{name}: {exc}")
+        self.stdout.write(self.style.SUCCESS(f"Created {created} thumbnail(s); {failed} image(s) failed."))
@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from campus.models import Upload
+from campus.uploads import discard_upload
+
+
+class Command(BaseCommand):
+    help = "Deletes chunked uploads that were not finished within UPLOAD_SESSION_TTL_HOURS, with their temp files."
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+        stale = Upload.objects.filter(status='uploading', updated_at__lt=cutoff)
+        count = 0
+        for upload in stale.iterator():
+            discard_upload(upload)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Deleted {count} unfinished upload(s)."))
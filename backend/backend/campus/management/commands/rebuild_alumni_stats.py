@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from campus.models import User
+from campus.stats import rebuild_alumni_stats
+
+
+class Command(BaseCommand):
+    help = "Recomputes the AlumniStats dashboard counters from the source tables to correct any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*', help='Only rebuild these users (default: every alumnus).')
+
+    def handle(self, *args, **options):
+        alumni_ids = None
+        if options['usernames']:
+            users = dict(User.objects.filter(username__in=options['usernames']).values_list('username', 'id'))
+            missing = set(options['usernames']) - set(users)
+            if missing:
+                raise CommandError(f"Unknown users: {', '.join(sorted(missing))}")
+            alumni_ids = list(users.values())
+
+        rows = rebuild_alumni_stats(alumni_ids)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {len(rows)} user(s)."))
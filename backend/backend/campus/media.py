@@ -0,0 +1,170 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_etags
+
+from .models import MentorshipActivity, ReferralRequest, Upload
+
+
+# =========================
+# ACCESS CONTROL
+# =========================
+# Files under a protected prefix are only served to the people on the row
+# that references them (or to the uploader, before it is attached). Links
+# put in API responses carry a signature binding the path to the viewer, so
+# a plain <a href> works without an Authorization header; the ownership
+# check still runs for signed links.
+PROTECTED_PREFIXES = ('referral_resumes/', 'mentorship_activities/')
+SIGNATURE_SALT = 'campus.media'
+
+
+def is_protected(name):
+    return name.startswith(PROTECTED_PREFIXES)
+
+
+def sign_media(name, user_id):
+    return signing.TimestampSigner(salt=SIGNATURE_SALT).sign(f'{user_id}:{name}').rsplit(':', 2)[-2:]
+
+
+def signed_query(name, user_id):
+    timestamp, signature = sign_media(name, user_id)
+    return f'u={user_id}&t={timestamp}&s={signature}'
+
+
+def signed_user_id(name, params):
+    """Returns the user id a signed link was issued to, or None if it is missing, forged or expired."""
+    try:
+        value = f"{params['u']}:{name}:{params['t']}:{params['s']}"
+        signing.TimestampSigner(salt=SIGNATURE_SALT).unsign(value, max_age=settings.MEDIA_SIGNATURE_MAX_AGE)
+        return int(params['u'])
+    except (KeyError, ValueError, signing.BadSignature):
+        return None
+
+
+def can_access(user_id, name):
+    if not is_protected(name):
+        return True
+    if user_id is None:
+        return False
+    if Upload.objects.filter(file=name, owner_id=user_id).exists():
+        return True
+    if name.startswith('referral_resumes/'):
+        return ReferralRequest.objects.filter(resume=name).filter(
+            Q(student_id=user_id) | Q(job__posted_by_id=user_id)
+        ).exists()
+    return MentorshipActivity.objects.filter(file=name).filter(
+        Q(mentorship_request__student_id=user_id) | Q(mentorship_request__alumni_id=user_id)
+    ).exists()
+
+
+# =========================
+# RESPONSES
+# =========================
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def file_etag(stat):
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def media_response(request, name, path, protected):
+    """
+    Builds the response for one media file. With MEDIA_SENDFILE set, the front
+    server (nginx / Apache / lighttpd) is told to send the file itself and the
+    worker is free immediately; otherwise it is streamed from here, honouring
+    If-None-Match and a single-part Range.
+    """
+    stat = os.stat(path)
+    etag = file_etag(stat)
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': f"{'private' if protected else 'public'}, max-age={settings.MEDIA_CACHE_SECONDS}",
+    }
+
+    if etag in parse_etags(request.headers.get('If-None-Match', '')) or request.headers.get('If-None-Match') == '*':
+        response = HttpResponseNotModified()
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    if settings.MEDIA_SENDFILE:
+        response = HttpResponse(content_type=content_type)
+        if settings.MEDIA_SENDFILE == 'nginx':
+            # an `internal` location aliased to MEDIA_ROOT; nginx handles Range itself
+            response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + name
+        else:
+            response['X-Sendfile'] = path
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    start, end = requested_range(request, etag, stat.st_size)
+    if start == 'unsatisfiable':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+
+    handle = open(path, 'rb')
+    if start is None:
+        response = FileResponse(handle, content_type=content_type)
+    else:
+        handle.seek(start)
+        response = FileResponse(RangeReader(handle, end - start + 1), content_type=content_type, status=206)
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Length'] = str(end - start + 1)
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+def requested_range(request, etag, size):
+    """
+    Returns (start, end) of a single byte range, (None, None) to send the whole
+    file, or ('unsatisfiable', None). Multi-part ranges get the whole file.
+    """
+    match = RANGE_RE.match(request.headers.get('Range', '').strip())
+    if not match or not (match.group(1) or match.group(2)):
+        return None, None
+    if_range = request.headers.get('If-Range')
+    if if_range and if_range != etag:
+        return None, None  # the file changed since the client's partial copy
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start = max(size - int(last), 0)  # suffix range: the last N bytes
+        end = size - 1
+    if start >= size or start > end:
+        return 'unsatisfiable', None
+    return start, end
+
+
+class RangeReader:
+    """Reads at most `length` bytes from `handle`, in blocks, for FileResponse."""
+
+    block_size = 64 * 1024
+
+    def __init__(self, handle, length):
+        self.handle = handle
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.handle.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.handle.close()
@@ -0,0 +1,82 @@
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.db.models import Q
+
+from .models import Mentorship, MentorshipRequest
+
+
+# =========================
+# MENTORSHIP READ MODEL
+# =========================
+# Mentorship holds one row per (student, alumnus) pair that has an accepted
+# request. It is rewritten from MentorshipRequest whenever a request enters or
+# leaves 'accepted' (campus/signals.py, campus/transitions.py), so it never
+# needs to be trusted blindly: `sync_mentorships` on any pair repairs it.
+
+
+def pair_filter(pairs):
+    condition = Q()
+    for student_id, alumni_id in pairs:
+        condition |= Q(student_id=student_id, alumni_id=alumni_id)
+    return condition
+
+
+def sync_mentorships(pairs):
+    """Brings the Mentorship rows of the given (student id, alumni id) pairs in line with their requests."""
+    pairs = set(pairs)
+    if not pairs:
+        return
+
+    latest = {}
+    accepted = MentorshipRequest.objects.filter(pair_filter(pairs), status='accepted').order_by('updated_at', 'id')
+    for row in accepted.values('id', 'student_id', 'alumni_id'):
+        latest[(row['student_id'], row['alumni_id'])] = row['id']
+
+    ended = pairs - set(latest)
+    if ended:
+        Mentorship.objects.filter(pair_filter(ended)).delete()
+    write_mentorships(latest)
+
+
+def write_mentorships(latest):
+    """Upserts one row per {(student id, alumni id): request id}."""
+    if not latest:
+        return
+    upsert = {'update_conflicts': True, 'update_fields': ['request']}  # started_at keeps the first acceptance
+    if connection.features.supports_update_conflicts_with_target:
+        upsert['unique_fields'] = ['alumni', 'student']
+    Mentorship.objects.bulk_create(
+        [Mentorship(student_id=s, alumni_id=a, request_id=r) for (s, a), r in latest.items()], batch_size=1000, **upsert
+    )
+
+
+def rebuild_mentorships(alumni_ids, chunk_size=500):
+    """
+    Rewrites the Mentorship rows of `alumni_ids` from their accepted requests,
+    for data inserted without signals (bulk_create, raw SQL). Returns the
+    number of rows kept.
+    """
+    kept = 0
+    for start in range(0, len(alumni_ids), chunk_size):
+        chunk = alumni_ids[start:start + chunk_size]
+        latest = {}
+        accepted = MentorshipRequest.objects.filter(alumni_id__in=chunk, status='accepted').order_by('updated_at', 'id')
+        for row in accepted.values('id', 'student_id', 'alumni_id').iterator():
+            latest[(row['student_id'], row['alumni_id'])] = row['id']
+
+        stale = [
+            pk for pk, student_id, alumni_id in
+            Mentorship.objects.filter(alumni_id__in=chunk).values_list('id', 'student_id', 'alumni_id')
+            if (student_id, alumni_id) not in latest
+        ]
+        if stale:
+            Mentorship.objects.filter(pk__in=stale).delete()
+        write_mentorships(latest)
+        kept += len(latest)
+    return kept
+
+
+def mentor_ids(student_id, using=DEFAULT_DB_ALIAS):
+    return list(
+        Mentorship.objects.using(using).filter(student_id=student_id)
+        .order_by('alumni_id').values_list('alumni_id', flat=True)
+    )
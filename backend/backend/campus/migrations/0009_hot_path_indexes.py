@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('campus', '0008_job_referralrequest'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['-date'], name='event_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['posted_by', '-posted_at'], name='job_poster_posted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['-posted_at'], name='job_posted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mentorshipactivity',
+            index=models.Index(fields=['mentorship_request', 'status', '-created_at'], name='mact_request_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mentorshipactivity',
+            index=models.Index(fields=['-created_at'], name='mact_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mentorshiprequest',
+            index=models.Index(fields=['student', '-requested_at'], name='mreq_student_requested_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mentorshiprequest',
+            index=models.Index(fields=['alumni', '-requested_at'], name='mreq_alumni_requested_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mentorshiprequest',
+            index=models.Index(fields=['alumni', 'status'], name='mreq_alumni_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mentorshiprequest',
+            index=models.Index(fields=['student', 'status'], name='mreq_student_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='referralrequest',
+            index=models.Index(fields=['student', '-requested_at'], name='ref_student_requested_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='referralrequest',
+            index=models.Index(fields=['job', '-requested_at'], name='ref_job_requested_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role'], name='user_role_idx'),
+        ),
+    ]
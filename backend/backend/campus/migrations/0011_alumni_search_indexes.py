@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:33
+
+from django.db import migrations, models
+
+
+# FULLTEXT indexes for the alumni `q` search (campus/search.py). They only
+# exist on MySQL; other backends fall back to icontains and skip these.
+FULLTEXT_INDEXES = [
+    ('campus_user', 'user_name_fulltext', 'first_name, last_name'),
+    ('campus_alumniprofile', 'profile_job_fulltext', 'current_company, job_title'),
+]
+
+
+def add_fulltext_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    for table, name, columns in FULLTEXT_INDEXES:
+        schema_editor.execute(f'CREATE FULLTEXT INDEX {name} ON {table} ({columns})')
+
+
+def drop_fulltext_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    for table, name, columns in FULLTEXT_INDEXES:
+        schema_editor.execute(f'DROP INDEX {name} ON {table}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('campus', '0010_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alumniprofile',
+            index=models.Index(fields=['industry'], name='profile_industry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alumniprofile',
+            index=models.Index(fields=['current_company'], name='profile_company_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alumniprofile',
+            index=models.Index(fields=['willing_to_mentor'], name='profile_mentor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'batch_year'], name='user_role_batch_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'degree'], name='user_role_degree_idx'),
+        ),
+        migrations.RunPython(add_fulltext_indexes, drop_fulltext_indexes),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campus', '0011_alumni_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlumniStats',
+            fields=[
+                ('alumni', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_mentees', models.IntegerField(default=0)),
+                ('pending_requests', models.IntegerField(default=0)),
+                ('accepted_requests', models.IntegerField(default=0)),
+                ('rejected_requests', models.IntegerField(default=0)),
+                ('cancelled_requests', models.IntegerField(default=0)),
+                ('total_activities', models.IntegerField(default=0)),
+                ('completed_activities', models.IntegerField(default=0)),
+                ('referrals_pending', models.IntegerField(default=0)),
+                ('referrals_viewed', models.IntegerField(default=0)),
+                ('referrals_referred', models.IntegerField(default=0)),
+                ('referrals_rejected', models.IntegerField(default=0)),
+                ('event_registrations', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campus', '0013_event_capacity'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mentorshiprequest',
+            index=models.Index(fields=['student', 'updated_at'], name='mreq_student_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mentorshiprequest',
+            index=models.Index(fields=['alumni', 'updated_at'], name='mreq_alumni_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campus', '0016_upload'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mentorshipactivity',
+            index=models.Index(fields=['file'], name='mact_file_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='referralrequest',
+            index=models.Index(fields=['resume'], name='ref_resume_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='upload',
+            index=models.Index(fields=['file', 'owner'], name='upload_file_owner_idx'),
+        ),
+    ]
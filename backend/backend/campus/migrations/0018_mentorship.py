@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_mentorships(apps, schema_editor):
+    # one row per pair with an accepted request, pointing at its latest one
+    MentorshipRequest = apps.get_model('campus', 'MentorshipRequest')
+    Mentorship = apps.get_model('campus', 'Mentorship')
+    latest = {}
+    accepted = MentorshipRequest.objects.filter(status='accepted').order_by('updated_at', 'id')
+    for row in accepted.values('id', 'student_id', 'alumni_id').iterator():
+        latest[(row['student_id'], row['alumni_id'])] = row['id']
+    Mentorship.objects.bulk_create(
+        [Mentorship(student_id=s, alumni_id=a, request_id=r) for (s, a), r in latest.items()], batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campus', '0017_media_access_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Mentorship',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('alumni', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mentees', to=settings.AUTH_USER_MODEL)),
+                ('request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='campus.mentorshiprequest')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mentors', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['alumni', '-started_at'], name='mentorship_alumni_idx'), models.Index(fields=['student', '-started_at'], name='mentorship_student_idx')],
+                'constraints': [models.UniqueConstraint(fields=('alumni', 'student'), name='mentorship_pair_unique')],
+            },
+        ),
+        migrations.RunPython(fill_mentorships, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,73 @@
+import uuid
+
 from django.contrib.auth.models import AbstractUser # to inherit the default user table provided by django 
 from django.db import models # to create our own tables in the database
+from django.db.models.fields.files import FieldFile
+
+
+# Base: TrackedModel
+# Remembers the column values of a row as loaded (or last saved), so that
+# save() on an existing row only writes the columns that changed, and
+# receivers can ask what a field was before (`original_value`).
+# Callers passing update_fields themselves are left alone.
+class TrackedModel(models.Model):
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_values()
+        return instance
+
+    def remember_values(self, fields=None):
+        # deferred fields aren't in __dict__ and are left out
+        loaded = dict(getattr(self, '_loaded_values', {}))  # copies of an instance (copy.copy) share the old dict
+        for field in self._meta.concrete_fields:
+            if field.attname in self.__dict__ and (fields is None or field.name in fields or field.attname in fields):
+                loaded[field.attname] = tracked_value(self.__dict__[field.attname])
+        self._loaded_values = loaded
+
+    def original_value(self, attname):
+        return getattr(self, '_loaded_values', {}).get(attname)
+
+    def changed_fields(self):
+        loaded = getattr(self, '_loaded_values', {})
+        changed = []
+        for field in self._meta.concrete_fields:
+            if field.primary_key or field.attname not in self.__dict__:
+                continue
+            value = self.__dict__[field.attname]
+            if isinstance(value, FieldFile) and not value._committed:
+                changed.append(field.name)  # a new upload, even under the old name
+            elif field.attname not in loaded or tracked_value(value) != loaded[field.attname]:
+                changed.append(field.name)
+        return changed
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None and not args \
+                and not kwargs.get('force_insert'):
+            changed = self.changed_fields()
+            # auto_now columns are always written, so a bare save() still touches the row;
+            # with none of those and nothing changed, Django skips the save
+            changed += [f.name for f in self._meta.concrete_fields if getattr(f, 'auto_now', False) and f.name not in changed]
+            kwargs['update_fields'] = changed
+        super().save(*args, **kwargs)
+        self.remember_values(kwargs.get('update_fields'))
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        # loading a deferred field lands here too; other unsaved edits must stay dirty
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self.remember_values(fields)
+
+
+def tracked_value(value):
+    return value.name if isinstance(value, FieldFile) else value
 
 
 
 # Table: User
-class User(AbstractUser):
+class User(TrackedModel, AbstractUser):
     ROLE_CHOICES = ( 
         ('student', 'Student'),
         ('alumni', 'Alumni'),
@@ -17,6 +80,14 @@ class User(AbstractUser):
     bio = models.TextField(blank=True, null=True)
     image = models.ImageField(upload_to='profile_images/', blank=True, null=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['role'], name='user_role_idx'),  # alumni directory
+            # directory filters (campus/search.py)
+            models.Index(fields=['role', 'batch_year'], name='user_role_batch_idx'),
+            models.Index(fields=['role', 'degree'], name='user_role_degree_idx'),
+        ]
+
     def __str__(self): #This controls how the object appears in Django admin.
         return self.username
 
@@ -30,7 +101,7 @@ class MentorshipType(models.Model):
     
 
 # Table: AlumniProfile
-class AlumniProfile(models.Model):
+class AlumniProfile(TrackedModel):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='alumni_profile')
     current_company = models.CharField(max_length=100, blank=True, null=True)
     job_title = models.CharField(max_length=100, blank=True, null=True)
@@ -40,12 +111,21 @@ class AlumniProfile(models.Model):
     willing_to_mentor = models.BooleanField(default=False)
     available_for = models.ManyToManyField(MentorshipType, blank=True)
 
+    class Meta:
+        # directory filters (campus/search.py); the FULLTEXT index on
+        # (current_company, job_title) is created by migration 0011 on MySQL only
+        indexes = [
+            models.Index(fields=['industry'], name='profile_industry_idx'),
+            models.Index(fields=['current_company'], name='profile_company_idx'),
+            models.Index(fields=['willing_to_mentor'], name='profile_mentor_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username}'s Alumni Profile"
 
 
 # Table: Event
-class Event(models.Model):
+class Event(TrackedModel):
     EVENT_TYPE_CHOICES = (
         ('online', 'Online'),
         ('offline', 'Offline'),
@@ -59,14 +139,20 @@ class Event(models.Model):
     type = models.CharField(max_length=10, choices=EVENT_TYPE_CHOICES)
     organizer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='organized_events')
     registered_users = models.ManyToManyField(User, related_name='registered_events', blank=True)
+    capacity = models.PositiveIntegerField(blank=True, null=True) # empty = no limit
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-date'], name='event_date_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
 
 # Table: MentorshipRequest
-class MentorshipRequest(models.Model):
+class MentorshipRequest(TrackedModel):
     STATUS_CHOICES = (
         ('pending', 'Pending'),
         ('accepted', 'Accepted'),
@@ -82,12 +168,25 @@ class MentorshipRequest(models.Model):
     requested_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # inbox listings (MentorshipRequestViewSet.get_queryset)
+            models.Index(fields=['student', '-requested_at'], name='mreq_student_requested_idx'),
+            models.Index(fields=['alumni', '-requested_at'], name='mreq_alumni_requested_idx'),
+            # accepted-mentor lookups and dashboard counts
+            models.Index(fields=['alumni', 'status'], name='mreq_alumni_status_idx'),
+            models.Index(fields=['student', 'status'], name='mreq_student_status_idx'),
+            # ?updated_since polling
+            models.Index(fields=['student', 'updated_at'], name='mreq_student_updated_idx'),
+            models.Index(fields=['alumni', 'updated_at'], name='mreq_alumni_updated_idx'),
+        ]
+
     def __str__(self):
         return f"Request from {self.student.username} to {self.alumni.username} - {self.status}"
 
 
 # Table: MentorshipActivity
-class MentorshipActivity(models.Model):
+class MentorshipActivity(TrackedModel):
     STATUS_CHOICES = (
         ('pending', 'Pending'),
         ('in_progress', 'In Progress'),
@@ -105,12 +204,45 @@ class MentorshipActivity(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['mentorship_request', 'status', '-created_at'], name='mact_request_status_idx'),
+            models.Index(fields=['-created_at'], name='mact_created_idx'),
+            models.Index(fields=['mentorship_request', 'updated_at'], name='mact_request_updated_idx'),  # sync
+            models.Index(fields=['file'], name='mact_file_idx'),  # media access checks
+        ]
+
     def __str__(self):
         return f"{self.title} - {self.mentorship_request.student.username}"
 
 
+# Table: Mentorship
+# Read model: one row per (student, alumnus) pair with at least one accepted
+# request, kept in sync by campus/mentorships.py. Backs the mentee/mentor
+# lists and "is X mentoring Y" checks without scanning MentorshipRequest.
+class Mentorship(models.Model):
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='mentors')
+    alumni = models.ForeignKey(User, on_delete=models.CASCADE, related_name='mentees')
+    # the most recently accepted request of the pair; activities hang off it
+    request = models.ForeignKey(MentorshipRequest, on_delete=models.CASCADE, related_name='+')
+    started_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # one row per pair; also the conflict target of write_mentorships' upsert
+            models.UniqueConstraint(fields=['alumni', 'student'], name='mentorship_pair_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['alumni', '-started_at'], name='mentorship_alumni_idx'),
+            models.Index(fields=['student', '-started_at'], name='mentorship_student_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.alumni.username} mentoring {self.student.username}"
+
+
 # Table: Job
-class Job(models.Model):
+class Job(TrackedModel):
     JOB_TYPE_CHOICES = (
         ('full_time', 'Full Time'),
         ('internship', 'Internship'),
@@ -126,12 +258,18 @@ class Job(models.Model):
     posted_at = models.DateTimeField(auto_now_add=True)
     posted_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posted_jobs')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['posted_by', '-posted_at'], name='job_poster_posted_idx'),
+            models.Index(fields=['-posted_at'], name='job_posted_idx'),
+        ]
+
     def __str__(self):
         return f"{self.title} at {self.company}"
 
 
 # Table: ReferralRequest
-class ReferralRequest(models.Model):
+class ReferralRequest(TrackedModel):
     STATUS_CHOICES = (
         ('pending', 'Pending'),
         ('viewed', 'Viewed'),
@@ -146,5 +284,132 @@ class ReferralRequest(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     requested_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', '-requested_at'], name='ref_student_requested_idx'),
+            models.Index(fields=['job', '-requested_at'], name='ref_job_requested_idx'),  # alumni inbox joins via job
+            models.Index(fields=['resume'], name='ref_resume_idx'),  # media access checks
+        ]
+
     def __str__(self):
         return f"Referral for {self.student.username} - {self.job.title}"
+
+
+# Table: OutboundEmail
+# Outbox for notification emails. Views only insert rows here; the
+# `send_queued_emails` management command delivers them in batches.
+class OutboundEmail(models.Model):
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True, null=True)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    claim_token = models.CharField(max_length=32, blank=True, null=True)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+            models.Index(fields=['claim_token'], name='outbox_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
+
+
+# Table: AlumniStats
+# One row of dashboard counters per user, kept current by the signal
+# receivers in campus/signals.py. `python manage.py rebuild_alumni_stats`
+# recomputes the rows from scratch if they ever drift.
+class AlumniStats(models.Model):
+    alumni = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    total_mentees = models.IntegerField(default=0)
+    pending_requests = models.IntegerField(default=0)
+    accepted_requests = models.IntegerField(default=0)
+    rejected_requests = models.IntegerField(default=0)
+    cancelled_requests = models.IntegerField(default=0)
+    total_activities = models.IntegerField(default=0)
+    completed_activities = models.IntegerField(default=0)
+    referrals_pending = models.IntegerField(default=0)
+    referrals_viewed = models.IntegerField(default=0)
+    referrals_referred = models.IntegerField(default=0)
+    referrals_rejected = models.IntegerField(default=0)
+    event_registrations = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Stats for {self.alumni.username}"
+
+
+# Table: Tombstone
+# Records deleted mentorship requests and activities so /api/sync/ can tell
+# clients what to drop. Participants are stored as plain ids (not foreign keys)
+# because tombstones are written while those users may be being deleted.
+class Tombstone(models.Model):
+    MODEL_CHOICES = (
+        ('mentorship_request', 'Mentorship Request'),
+        ('mentorship_activity', 'Mentorship Activity'),
+    )
+
+    model = models.CharField(max_length=30, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    student_id = models.BigIntegerField()
+    alumni_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['student_id', 'deleted_at'], name='tombstone_student_idx'),
+            models.Index(fields=['alumni_id', 'deleted_at'], name='tombstone_alumni_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} deleted at {self.deleted_at}"
+
+
+# Table: Upload
+# A resumable chunked upload (campus/uploads.py). Chunks are appended to a
+# temp file until `received` reaches `size`; the finished file is stored
+# under its SHA-256, and its storage name is kept in `file` so a referral or
+# activity can attach it by upload id.
+class Upload(models.Model):
+    PURPOSE_CHOICES = (
+        ('resume', 'Referral Resume'),
+        ('activity_file', 'Mentorship Activity File'),
+    )
+    STATUS_CHOICES = (
+        ('uploading', 'Uploading'),
+        ('complete', 'Complete'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='uploads')
+    purpose = models.CharField(max_length=20, choices=PURPOSE_CHOICES)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='uploading')
+    sha256 = models.CharField(max_length=64, blank=True)
+    file = models.FileField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'updated_at'], name='upload_status_updated_idx'),  # prune_uploads
+            models.Index(fields=['file', 'owner'], name='upload_file_owner_idx'),  # media access checks
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size}, {self.status})"
@@ -0,0 +1,146 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# BROKERS
+# =========================
+# A broker fans messages out to the notification streams of one user.
+# `publish` is called from ordinary (sync) request code; `subscribe` is used
+# by the async stream view and yields a subscription whose `get(timeout)`
+# returns the next message, or None if nothing arrived in time.
+#
+# InProcessBroker only reaches streams served by the same process, which is
+# enough for a single ASGI worker. With several workers, set
+# NOTIFICATION_BROKER to campus.notifications.RedisBroker.
+
+class InProcessBroker:
+    queue_size = 100
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, user_id, message):
+        with self._lock:
+            targets = list(self._subscribers.get(user_id, ()))
+        for loop, queue in targets:
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, message)
+            except RuntimeError:
+                pass  # the stream's event loop has already shut down
+
+    @staticmethod
+    def _deliver(queue, message):
+        if queue.full():
+            queue.get_nowait()  # a stalled client loses its oldest message, not the newest
+        queue.put_nowait(message)
+
+    @asynccontextmanager
+    async def subscribe(self, user_id):
+        entry = (asyncio.get_running_loop(), asyncio.Queue(maxsize=self.queue_size))
+        with self._lock:
+            self._subscribers[user_id].add(entry)
+        try:
+            yield QueueSubscription(entry[1])
+        finally:
+            with self._lock:
+                self._subscribers[user_id].discard(entry)
+                if not self._subscribers[user_id]:
+                    del self._subscribers[user_id]
+
+
+class QueueSubscription:
+    def __init__(self, queue):
+        self.queue = queue
+
+    async def get(self, timeout):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class RedisBroker:
+    """Publishes through Redis pub/sub (one channel per user) so every worker sees every message."""
+
+    def __init__(self):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured("RedisBroker needs the 'redis' package (pip install redis).")
+        self.url = settings.NOTIFICATION_REDIS_URL
+        self.client = redis.Redis.from_url(self.url)
+
+    @staticmethod
+    def channel(user_id):
+        return f'campus:notifications:{user_id}'
+
+    def publish(self, user_id, message):
+        self.client.publish(self.channel(user_id), json.dumps(message))
+
+    @asynccontextmanager
+    async def subscribe(self, user_id):
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(self.channel(user_id))
+        try:
+            yield RedisSubscription(pubsub)
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+            await client.aclose()
+
+
+class RedisSubscription:
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    async def get(self, timeout):
+        message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        return json.loads(message['data']) if message else None
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(settings.NOTIFICATION_BROKER)()
+    return _broker
+
+
+# =========================
+# PUBLISHING
+# =========================
+def notify(user_ids, message):
+    """
+    Pushes `message` to every open stream of the given users once the current
+    transaction commits, so clients never hear about a change that rolled back.
+    """
+    user_ids = {user_id for user_id in user_ids if user_id}
+
+    def send():
+        broker = get_broker()
+        for user_id in user_ids:
+            try:
+                broker.publish(user_id, message)
+            except Exception:
+                logger.exception("Could not publish %s to user %s", message.get('type'), user_id)
+
+    if user_ids:
+        transaction.on_commit(send)
@@ -0,0 +1,25 @@
+from rest_framework.pagination import CursorPagination
+
+
+# =========================
+# CURSOR PAGINATION
+# =========================
+class CampusCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the campus list endpoints.
+
+    Each viewset declares its sort order in `cursor_ordering`; the last entry
+    should be the primary key so rows sharing the same date still come back in
+    a stable order. Because the cursor encodes the position of the last row
+    seen, a deep page costs the same indexed range scan as the first one.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'  # e.g. /api/events/?page_size=50
+    max_page_size = 100
+    ordering = ('-id',)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', None)
+        if ordering:
+            return tuple(ordering)
+        return super().get_ordering(request, queryset, view)
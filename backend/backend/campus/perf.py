@@ -0,0 +1,203 @@
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+
+from asgiref.local import Local
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# REQUEST PROFILING
+# =========================
+# PerformanceMiddleware times every request; a sample of them
+# (PERF_SAMPLE_RATE) also gets its SQL counted and timed, its serializer
+# time measured and its queries checked for N+1 patterns. Results go out as
+# a Server-Timing header (visible in the browser's network tab) and into
+# per-view aggregates served by /api/metrics/. Unsampled requests only cost
+# two clock reads.
+#
+# The aggregates are per process: each worker reports what it has served.
+_local = Local()  # the profile of the running request; per context, as ASGI shares one thread between requests
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+def sql_shape(sql):
+    """Collapses `IN (%s, %s, ...)` so queries differing only in list length group together."""
+    return IN_LIST_RE.sub('IN (...)', sql)
+
+
+class RequestProfile:
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.in_serializer = False
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        # installed as a connection execute_wrapper; under ASGI the connection
+        # is shared by every request on the thread, so only count our own
+        if getattr(_local, 'profile', None) is not self:
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries += 1
+            self.shapes[sql_shape(sql)] += 1
+
+    def repeated_queries(self):
+        threshold = settings.PERF_N_PLUS_ONE_THRESHOLD
+        return [(sql, count) for sql, count in self.shapes.most_common() if count >= threshold]
+
+
+def timed_data(data_property):
+    """Wraps a serializer's `data` property to add its time to the running profile."""
+    def data(self):
+        profile = getattr(_local, 'profile', None)
+        if profile is None or profile.in_serializer:
+            return data_property.fget(self)
+        profile.in_serializer = True  # nested serializers are part of the outer one's time
+        started = time.perf_counter()
+        try:
+            return data_property.fget(self)
+        finally:
+            profile.serializer_seconds += time.perf_counter() - started
+            profile.in_serializer = False
+    return property(data)
+
+
+def install_serializer_timing():
+    # DRF has no hook around serialization, so time the `data` properties the views read
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        if not getattr(cls.data.fget, '_campus_timed', False):
+            cls.data = timed_data(cls.data)
+            cls.data.fget._campus_timed = True
+
+
+class PerformanceMiddleware(MiddlewareMixin):
+    """Keep it first in MIDDLEWARE so the total covers the other middleware."""
+
+    def process_request(self, request):
+        if not settings.PERF_ENABLED:
+            return
+        request._perf_started = time.perf_counter()
+        request._perf_profile = None
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not hasattr(request, '_perf_started'):
+            return None
+        # async views (the notification stream) are long-lived and not profiled
+        if iscoroutinefunction(view_func) or random.random() >= settings.PERF_SAMPLE_RATE:
+            return None
+        profile = RequestProfile()
+        for connection in connections.all():
+            connection.execute_wrappers.append(profile)
+        _local.profile = profile
+        request._perf_profile = profile
+        return None
+
+    def process_response(self, request, response):
+        started = getattr(request, '_perf_started', None)
+        if started is None:
+            return response
+        profile = request._perf_profile
+        if profile is not None:
+            for connection in connections.all():
+                if profile in connection.execute_wrappers:
+                    connection.execute_wrappers.remove(profile)
+            _local.profile = None
+
+        total = time.perf_counter() - started
+        size = None if response.streaming else len(response.content)
+        match = request.resolver_match
+        view = f"{request.method} {match.view_name if match else 'unresolved'}"
+
+        entries = [f'total;dur={total * 1000:.2f}']
+        if profile is not None:
+            entries.append(f'db;dur={profile.db_seconds * 1000:.2f};desc="{profile.queries} queries"')
+            entries.append(f'serialize;dur={profile.serializer_seconds * 1000:.2f}')
+            repeated = profile.repeated_queries()
+            if repeated:
+                entries.append(f'n-plus-one;desc="{repeated[0][1]}x same query"')
+                logger.warning("Possible N+1 in %s: %s", view, '; '.join(f'{n}x {sql[:200]}' for sql, n in repeated))
+        existing = response.get('Server-Timing')
+        response['Server-Timing'] = ', '.join([existing, *entries] if existing else entries)
+
+        if match is not None:
+            record(view, total, size, profile)
+        return response
+
+
+def record(view, total, size, profile):
+    with _metrics_lock:
+        stats = _metrics.get(view)
+        if stats is None:
+            stats = _metrics[view] = {
+                'requests': 0, 'sampled': 0, 'durations': deque(maxlen=settings.PERF_HISTORY),
+                'bytes': 0, 'queries': 0, 'db_seconds': 0.0, 'serializer_seconds': 0.0,
+                'n_plus_one': 0, 'repeated_queries': Counter(),
+            }
+        stats['requests'] += 1
+        stats['durations'].append(total)
+        stats['bytes'] += size or 0
+        if profile is not None:
+            stats['sampled'] += 1
+            stats['queries'] += profile.queries
+            stats['db_seconds'] += profile.db_seconds
+            stats['serializer_seconds'] += profile.serializer_seconds
+            repeated = profile.repeated_queries()
+            if repeated:
+                stats['n_plus_one'] += 1
+                for sql, count in repeated:
+                    stats['repeated_queries'][sql[:300]] = max(stats['repeated_queries'][sql[:300]], count)
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def metrics_snapshot():
+    """Per-view aggregates for /api/metrics/; times are in milliseconds."""
+    with _metrics_lock:
+        views = {}
+        for view, stats in _metrics.items():
+            durations = sorted(d * 1000 for d in stats['durations'])
+            sampled = stats['sampled']
+            views[view] = {
+                'requests': stats['requests'],
+                'sampled': sampled,
+                'p50_ms': round(percentile(durations, 50), 3),
+                'p95_ms': round(percentile(durations, 95), 3),
+                'p99_ms': round(percentile(durations, 99), 3),
+                'bytes_per_request': round(stats['bytes'] / stats['requests']),
+                'queries_per_request': round(stats['queries'] / sampled, 2) if sampled else None,
+                'db_ms_per_request': round(stats['db_seconds'] * 1000 / sampled, 3) if sampled else None,
+                'serializer_ms_per_request': round(stats['serializer_seconds'] * 1000 / sampled, 3) if sampled else None,
+                'n_plus_one_requests': stats['n_plus_one'],
+                'repeated_queries': [
+                    {'sql': sql, 'max_repeats': count} for sql, count in stats['repeated_queries'].most_common(5)
+                ],
+            }
+    return views
+
+
+def reset_metrics():
+    with _metrics_lock:
+        _metrics.clear()
@@ -1,3 +1,6 @@
+import hmac
+
+from django.conf import settings
 from rest_framework import permissions
 
 class IsOrganizerOrReadOnly(permissions.BasePermission):
@@ -13,3 +16,19 @@ class IsOrganizerOrReadOnly(permissions.BasePermission):
 
         # Write permissions are only allowed to the organizer of the event.
         return obj.organizer == request.user
+
+
+class IsStaffOrMetricsToken(permissions.BasePermission):
+    """
+    Allows staff users, and scrapers sending the shared METRICS_TOKEN in an
+    `X-Metrics-Token` header. With METRICS_TOKEN unset (the default) only staff
+    get in. The peer address is never trusted: behind a local reverse proxy
+    every request comes from 127.0.0.1.
+    """
+
+    def has_permission(self, request, view):
+        if request.user and request.user.is_staff:
+            return True
+        token = settings.METRICS_TOKEN
+        sent = request.headers.get('X-Metrics-Token', '')
+        return bool(token) and hmac.compare_digest(sent.encode(), token.encode())
@@ -0,0 +1,64 @@
+from django.db import connection, transaction, IntegrityError
+
+from .models import Event
+from .stats import bump
+
+EventRegistration = Event.registered_users.through
+
+
+# =========================
+# EVENT REGISTRATION
+# =========================
+# Registration is one conditional INSERT and unregistration one DELETE on the
+# through table, so repeating either call is harmless and concurrent clicks
+# can't interleave a check with a write. The unique (event, user) constraint
+# is the final guard against duplicates.
+
+def register_user(event, user):
+    """
+    Registers `user` for `event`. Returns 'registered' (new or existing
+    registration) or 'full' when the event has reached its capacity.
+    `event` only needs `id`, `capacity` and `organizer_id` loaded.
+    """
+    qn = connection.ops.quote_name
+    registrations = qn(EventRegistration._meta.db_table)
+    events = qn(Event._meta.db_table)
+    sql = f"""
+        INSERT INTO {registrations} (event_id, user_id)
+        SELECT e.id, %s FROM {events} e
+        WHERE e.id = %s
+          AND NOT EXISTS (SELECT 1 FROM {registrations} r WHERE r.event_id = %s AND r.user_id = %s)
+          AND (e.capacity IS NULL OR e.capacity > (SELECT COUNT(*) FROM {registrations} c WHERE c.event_id = %s))
+    """
+
+    with transaction.atomic():
+        if event.capacity is not None:
+            # Queue registrations for a limited event behind its row lock so the
+            # capacity check and the insert happen as one step per registrant.
+            # Everyone takes this single lock first, so they can't deadlock.
+            list(Event.objects.select_for_update().filter(pk=event.pk).values_list('pk'))
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(sql, [user.pk, event.pk, event.pk, user.pk, event.pk])
+                inserted = cursor.rowcount == 1
+        except IntegrityError:
+            inserted = False  # the same user registered concurrently
+
+        if inserted:
+            # raw SQL sends no m2m_changed, so keep the dashboard counter current here
+            bump(event.organizer_id, event_registrations=1)
+            return 'registered'
+
+    if EventRegistration.objects.filter(event_id=event.pk, user_id=user.pk).exists():
+        return 'registered'
+    return 'full'
+
+
+def unregister_user(event, user):
+    """Removes the registration if there is one. Returns True if a row was deleted."""
+    with transaction.atomic():
+        # no signals or cascades hang off the through table, so this is a single DELETE
+        deleted, _ = EventRegistration.objects.filter(event_id=event.pk, user_id=user.pk).delete()
+        if deleted:
+            bump(event.organizer_id, event_registrations=-deleted)
+    return bool(deleted)
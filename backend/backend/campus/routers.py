@@ -0,0 +1,79 @@
+import hashlib
+import random
+
+from asgiref.local import Local
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.deprecation import MiddlewareMixin
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+# =========================
+# READ REPLICAS
+# =========================
+# Replicas are configured with DB_REPLICAS (see settings.py) and get the
+# aliases replica1, replica2, ... Only reads of campus models made while
+# serving a safe request to a viewset with `read_from_replica = True` go to
+# a replica; everything else, including auth tokens and sessions, stays on
+# the primary.
+#
+# Read-your-writes: after a successful write, the credential that made it
+# (token or session) is pinned to the primary for READ_YOUR_WRITES_SECONDS,
+# long enough for the replicas to catch up. The pin is kept in the shared
+# cache so it holds across workers.
+# The flag is context-local, not thread-local: under ASGI the sync middleware
+# and views of concurrent requests take turns on one shared thread.
+_state = Local()
+PIN_KEY = 'campus:db-pin:{}'
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica')]
+
+
+def credential_key(request):
+    """A stable hash of whatever authenticates the request, or None for anonymous requests."""
+    credential = request.headers.get('Authorization') or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    return hashlib.sha256(credential.encode()).hexdigest() if credential else None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not getattr(_state, 'use_replica', False) or model._meta.app_label != 'campus':
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None  # reads inside a transaction must see its writes
+        replicas = replica_aliases()
+        return random.choice(replicas) if replicas else None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # replicas hold the same rows as the primary
+
+
+class ReplicaRoutingMiddleware(MiddlewareMixin):
+    def process_request(self, request):
+        _state.use_replica = False
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'cls', None)
+        if (
+            request.method in SAFE_METHODS
+            and getattr(view_class, 'read_from_replica', False)
+            and replica_aliases()
+        ):
+            key = credential_key(request)
+            _state.use_replica = key is None or not cache.get(PIN_KEY.format(key))
+        return None
+
+    def process_response(self, request, response):
+        _state.use_replica = False
+        if request.method not in SAFE_METHODS and response.status_code < 400 and replica_aliases():
+            key = credential_key(request)
+            if key is not None:
+                cache.set(PIN_KEY.format(key), 1, settings.READ_YOUR_WRITES_SECONDS)
+        return response
@@ -0,0 +1,169 @@
+from django.db import connection
+from django.db.models import BooleanField, Count, Q
+from django.db.models.expressions import RawSQL
+from rest_framework.exceptions import ValidationError
+
+from .cache import get_mentorship_type_catalogue
+from .models import AlumniProfile, User
+
+
+# =========================
+# ALUMNI SEARCH
+# =========================
+# Query parameters understood by the alumni directory (AlumniViewSet):
+#   q                  words matched against name, company and job title
+#   industry, company, degree      exact values, comma separated for "any of"
+#   batch_year         exact years, comma separated
+#   batch_min, batch_max           inclusive batch year range
+#   willing_to_mentor  true / false
+#   available_for      MentorshipType ids, comma separated
+#
+# On MySQL `q` uses the FULLTEXT indexes from migration 0011; other databases
+# (SQLite in tests) fall back to icontains.
+FACET_LIMIT = 20
+FULLTEXT_MIN_WORD = 3  # InnoDB ignores shorter tokens (innodb_ft_min_token_size)
+
+AvailableFor = AlumniProfile.available_for.through
+
+
+def split_param(params, name):
+    raw = params.get(name, '')
+    return [value.strip() for value in raw.split(',') if value.strip()]
+
+
+def int_list(params, name):
+    try:
+        return [int(value) for value in split_param(params, name)]
+    except ValueError:
+        raise ValidationError({name: 'Expected a comma separated list of numbers.'})
+
+
+def int_param(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({name: 'Expected a number.'})
+
+
+def filter_text(field):
+    def apply(queryset, params, name):
+        values = split_param(params, name)
+        return queryset.filter(**{f'{field}__in': values}) if values else queryset
+    return apply
+
+
+def filter_batch(queryset, params, name):
+    years = int_list(params, 'batch_year')
+    if years:
+        queryset = queryset.filter(batch_year__in=years)
+    batch_min = int_param(params, 'batch_min')
+    if batch_min is not None:
+        queryset = queryset.filter(batch_year__gte=batch_min)
+    batch_max = int_param(params, 'batch_max')
+    if batch_max is not None:
+        queryset = queryset.filter(batch_year__lte=batch_max)
+    return queryset
+
+
+def filter_mentor(queryset, params, name):
+    value = params.get(name, '').lower()
+    if value in ('true', '1'):
+        return queryset.filter(alumni_profile__willing_to_mentor=True)
+    if value in ('false', '0'):
+        return queryset.filter(alumni_profile__willing_to_mentor=False)
+    return queryset
+
+
+def filter_available_for(queryset, params, name):
+    type_ids = int_list(params, name)
+    if not type_ids:
+        return queryset
+    # semi-join on the through table so alumni with several matching types aren't duplicated
+    return queryset.filter(
+        alumni_profile__id__in=AvailableFor.objects.filter(mentorshiptype_id__in=type_ids).values('alumniprofile_id')
+    )
+
+
+# facet name -> (filter, column grouped for the facet counts)
+DIMENSIONS = {
+    'industry': (filter_text('alumni_profile__industry'), 'alumni_profile__industry'),
+    'company': (filter_text('alumni_profile__current_company'), 'alumni_profile__current_company'),
+    'degree': (filter_text('degree'), 'degree'),
+    'batch_year': (filter_batch, 'batch_year'),
+    'willing_to_mentor': (filter_mentor, 'alumni_profile__willing_to_mentor'),
+    'available_for': (filter_available_for, None),
+}
+
+
+def search_text(queryset, term):
+    words = term.split()
+    if not words:
+        return queryset
+
+    stripped = [strip_operators(word) for word in words]
+    if connection.vendor == 'mysql' and all(len(word) >= FULLTEXT_MIN_WORD for word in stripped):
+        # every word must match, as a prefix, in either FULLTEXT index; like the
+        # fallback below, each word may match a different one ("ann google")
+        for word in stripped:
+            names = User.objects.filter(
+                RawSQL('MATCH (first_name, last_name) AGAINST (%s IN BOOLEAN MODE)', [f'{word}*'], output_field=BooleanField())
+            ).values('id')
+            jobs = AlumniProfile.objects.filter(
+                RawSQL('MATCH (current_company, job_title) AGAINST (%s IN BOOLEAN MODE)', [f'{word}*'], output_field=BooleanField())
+            ).values('user_id')
+            queryset = queryset.filter(Q(id__in=names) | Q(id__in=jobs))
+        return queryset
+
+    for word in words:
+        queryset = queryset.filter(
+            Q(first_name__icontains=word) | Q(last_name__icontains=word)
+            | Q(alumni_profile__current_company__icontains=word) | Q(alumni_profile__job_title__icontains=word)
+        )
+    return queryset
+
+
+def strip_operators(word):
+    # drop characters that have a meaning in MySQL boolean mode
+    return ''.join(ch for ch in word if ch not in '+-<>()~*"@')
+
+
+def search_alumni(queryset, params, exclude=None):
+    """Applies `q` and every dimension filter in `params`, except the dimension named in `exclude`."""
+    queryset = search_text(queryset, params.get('q', ''))
+    for name, (apply, _column) in DIMENSIONS.items():
+        if name != exclude:
+            queryset = apply(queryset, params, name)
+    return queryset
+
+
+def alumni_facets(base_queryset, params):
+    """
+    Counts matching alumni per value of each dimension. Each facet ignores its
+    own filter, so picking one industry still shows the counts of the others.
+    """
+    facets = {}
+    for name, (_apply, column) in DIMENSIONS.items():
+        filtered = search_alumni(base_queryset, params, exclude=name).order_by()
+        if column is None:
+            rows = (
+                AvailableFor.objects.filter(alumniprofile__user__in=filtered.values('id'))
+                .values('mentorshiptype_id').annotate(count=Count('alumniprofile_id'))
+                .order_by('-count')[:FACET_LIMIT]
+            )
+            names = get_mentorship_type_catalogue()['names']
+            facets[name] = [
+                {'value': row['mentorshiptype_id'], 'label': names.get(row['mentorshiptype_id']), 'count': row['count']}
+                for row in rows
+            ]
+            continue
+
+        rows = (
+            filtered.exclude(**{f'{column}__isnull': True})
+            .values(column).annotate(count=Count('id'))
+            .order_by('-count', column)[:FACET_LIMIT]
+        )
+        facets[name] = [{'value': row[column], 'count': row['count']} for row in rows if row[column] != '']
+    return facets
@@ -1,6 +1,13 @@
 from rest_framework import serializers
+from django.core.files.storage import default_storage
 from django.db import transaction
-from .models import User, AlumniProfile, MentorshipType, Event, MentorshipRequest, MentorshipActivity, Job, ReferralRequest
+from .cache import mentorship_type_details, mentorship_type_ids
+from .models import (
+    User, AlumniProfile, MentorshipType, Event, MentorshipRequest, MentorshipActivity, Mentorship, Job, ReferralRequest, Upload,
+)
+from .media import signed_query
+from .thumbnails import DEFAULT_FORMAT, thumbnail_name
+from .uploads import check_declared, check_file, store_file
 
 
 # =========================
@@ -76,7 +83,7 @@ class MentorshipTypeSerializer(serializers.ModelSerializer):
 # ALUMNI PROFILE SERIALIZER
 # =========================
 class AlumniProfileSerializer(serializers.ModelSerializer):
-    available_for = MentorshipTypeSerializer(many=True, read_only=True)
+    available_for = serializers.SerializerMethodField()
 
     class Meta:
         model = AlumniProfile
@@ -90,6 +97,10 @@ class AlumniProfileSerializer(serializers.ModelSerializer):
             'available_for',
         ]
 
+    # Type names come from the cached catalogue rather than a join (campus/cache.py).
+    def get_available_for(self, obj):
+        return mentorship_type_details(mentorship_type_ids(obj, 'available_for'))
+
 # =========================
 # USER SERIALIZER (READ)
 # =========================
@@ -131,7 +142,7 @@ class UserUpdateSerializer(serializers.ModelSerializer):
             if attr == 'batch_year' and value == '':
                 value = None
             setattr(instance, attr, value)
-        instance.save()
+        instance.save()  # only the columns that changed are written (TrackedModel)
 
         # Update alumni profile fields if user is alumni
         if instance.role == 'alumni' and hasattr(instance, 'alumni_profile'):
@@ -156,33 +167,80 @@ class UserUpdateSerializer(serializers.ModelSerializer):
 # =========================
 # EVENT SERIALIZER
 # =========================
+def wants_registered_users(request):
+    if request is None:
+        return False
+    include = request.query_params.get('include', '')
+    return 'registered_users' in include.split(',')
+
+
 class EventSerializer(serializers.ModelSerializer):
     organizer_name = serializers.CharField(source='organizer.username', read_only=True)
     is_registered = serializers.SerializerMethodField() #Used when a field does not exist in the model but we want to generate it.
-    participants_count = serializers.IntegerField(source='registered_users.count', read_only=True)
+    participants_count = serializers.SerializerMethodField()
     participants = serializers.SerializerMethodField()
 
     class Meta:
         model = Event
-        fields = ['id', 'title', 'description', 'date', 'time', 'location', 'type', 'organizer', 'organizer_name', 'registered_users', 'created_at', 'is_registered', 'participants_count', 'participants']
+        fields = ['id', 'title', 'description', 'date', 'time', 'location', 'type', 'capacity', 'organizer', 'organizer_name', 'registered_users', 'created_at', 'is_registered', 'participants_count', 'participants']
         read_only_fields = ['organizer', 'created_at', 'registered_users']
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The full attendee id list is opt-in (?include=registered_users) so popular
+        # events don't ship thousands of ids to every viewer.
+        if not wants_registered_users(self.context.get('request')):
+            self.fields.pop('registered_users', None)
+
+    # EventViewSet annotates both values onto the queryset; the fallbacks cover
+    # instances that did not come from it (e.g. right after create).
     def get_is_registered(self, obj):
+        if hasattr(obj, 'is_registered'):
+            return bool(obj.is_registered)
         user = self.context.get('request').user
         if user.is_authenticated:
             return obj.registered_users.filter(id=user.id).exists()
         return False
 
+    def get_participants_count(self, obj):
+        if hasattr(obj, 'participants_count'):
+            return obj.participants_count
+        return obj.registered_users.count()
+
     def get_participants(self, obj):
         user = self.context.get('request').user
-        if user.is_authenticated and user == obj.organizer:
+        if user.is_authenticated and user.id == obj.organizer_id:
             # Return specific fields for participants
-            return obj.registered_users.values('id', 'first_name', 'last_name', 'email', 'username')
+            fields = ('id', 'first_name', 'last_name', 'email', 'username')
+            if hasattr(obj, 'organizer_participants'):  # prefetched by EventViewSet
+                return [{field: getattr(u, field) for field in fields} for u in obj.organizer_participants]
+            return obj.registered_users.values(*fields)
         return None
 
 # =========================
 # ALUMNI CARD SERIALIZER
 # =========================
+class ThumbnailField(serializers.ImageField):
+    """
+    Links a square variant of a profile image instead of the original upload
+    (see campus/thumbnails.py). Serializers expose the WebP variant and, next
+    to it as `<field>_fallback`, the JPEG one for clients without WebP.
+    """
+
+    def __init__(self, size, fmt=DEFAULT_FORMAT, **kwargs):
+        self.size = size
+        self.fmt = fmt
+        kwargs.setdefault('read_only', True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        url = default_storage.url(thumbnail_name(value.name, self.size, self.fmt))
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
+
+
 class AlumniCardSerializer(serializers.ModelSerializer):
     name = serializers.SerializerMethodField()
     role = serializers.CharField(source='alumni_profile.job_title', read_only=True)
@@ -190,17 +248,28 @@ class AlumniCardSerializer(serializers.ModelSerializer):
     company = serializers.CharField(source='alumni_profile.current_company', read_only=True)
     dept = serializers.CharField(source='degree', read_only=True)
     batch = serializers.IntegerField(source='batch_year', read_only=True)
-    skills = serializers.StringRelatedField(source='alumni_profile.available_for', many=True, read_only=True)
+    skills = serializers.SerializerMethodField()
     mentorship = serializers.BooleanField(source='alumni_profile.willing_to_mentor', read_only=True)
     industry = serializers.CharField(source='alumni_profile.industry', read_only=True)
+    image = ThumbnailField(128)
+    image_fallback = ThumbnailField(128, fmt='jpg', source='image')
 
     class Meta:
         model = User
-        fields = ['id', 'name', 'role', 'company', 'dept', 'batch', 'skills', 'mentorship', 'industry', 'image']
+        fields = [
+            'id', 'name', 'role', 'company', 'dept', 'batch', 'skills', 'mentorship', 'industry',
+            'image', 'image_fallback',
+        ]
 
     def get_name(self, obj):
         return f"{obj.first_name} {obj.last_name}"
 
+    def get_skills(self, obj):
+        profile = getattr(obj, 'alumni_profile', None)
+        if profile is None:
+            return None
+        return [t['name'] for t in mentorship_type_details(mentorship_type_ids(profile, 'available_for'))]
+
 
 # =========================
 # MENTORSHIP REQUEST SERIALIZER
@@ -213,15 +282,17 @@ class MentorshipRequestSerializer(serializers.ModelSerializer):
     alumni_company = serializers.SerializerMethodField()
     alumni_role = serializers.SerializerMethodField()
     student_dept = serializers.SerializerMethodField()
-    student_image = serializers.ImageField(source='student.image', read_only=True)
-    alumni_image = serializers.ImageField(source='alumni.image', read_only=True)
-    mentorship_types_details = MentorshipTypeSerializer(source='mentorship_types', many=True, read_only=True)
+    student_image = ThumbnailField(64, source='student.image')
+    student_image_fallback = ThumbnailField(64, fmt='jpg', source='student.image')
+    alumni_image = ThumbnailField(64, source='alumni.image')
+    alumni_image_fallback = ThumbnailField(64, fmt='jpg', source='alumni.image')
+    mentorship_types_details = serializers.SerializerMethodField()
 
     class Meta:
         model = MentorshipRequest
         fields = [
-            'id', 'student', 'student_name', 'student_full_name', 'student_dept', 'student_image',
-            'alumni', 'alumni_name', 'alumni_full_name', 'alumni_company', 'alumni_role', 'alumni_image',
+            'id', 'student', 'student_name', 'student_full_name', 'student_dept', 'student_image', 'student_image_fallback',
+            'alumni', 'alumni_name', 'alumni_full_name', 'alumni_company', 'alumni_role', 'alumni_image', 'alumni_image_fallback',
             'message', 'mentorship_types', 'mentorship_types_details',
             'status', 'requested_at', 'updated_at'
         ]
@@ -230,24 +301,140 @@ class MentorshipRequestSerializer(serializers.ModelSerializer):
     def get_student_full_name(self, obj):
         return f"{obj.student.first_name} {obj.student.last_name}"
 
+    def get_mentorship_types_details(self, obj):
+        return mentorship_type_details(mentorship_type_ids(obj, 'mentorship_types'))
+
     def get_student_dept(self, obj):
         return obj.student.degree
 
     def get_alumni_full_name(self, obj):
         return f"{obj.alumni.first_name} {obj.alumni.last_name}"
 
+    # MentorshipRequestViewSet joins alumni__alumni_profile, so neither lookup
+    # below queries (a missing profile is cached as None by select_related).
     def get_alumni_company(self, obj):
-        if hasattr(obj.alumni, 'alumni_profile'):
-            return obj.alumni.alumni_profile.current_company
-        return None
+        profile = getattr(obj.alumni, 'alumni_profile', None)
+        return profile.current_company if profile else None
 
     def get_alumni_role(self, obj):
-        if hasattr(obj.alumni, 'alumni_profile'):
-            return obj.alumni.alumni_profile.job_title
-        return None
+        profile = getattr(obj.alumni, 'alumni_profile', None)
+        return profile.job_title if profile else None
+
+
+class MentorshipSerializer(serializers.ModelSerializer):
+    """A row of the mentee / mentor lists, with a short profile of both sides."""
+    student_full_name = serializers.SerializerMethodField()
+    student_dept = serializers.CharField(source='student.degree', read_only=True)
+    student_batch_year = serializers.IntegerField(source='student.batch_year', read_only=True)
+    student_image = ThumbnailField(64, source='student.image')
+    student_image_fallback = ThumbnailField(64, fmt='jpg', source='student.image')
+    alumni_full_name = serializers.SerializerMethodField()
+    alumni_company = serializers.SerializerMethodField()
+    alumni_role = serializers.SerializerMethodField()
+    alumni_image = ThumbnailField(64, source='alumni.image')
+    alumni_image_fallback = ThumbnailField(64, fmt='jpg', source='alumni.image')
+    mentorship_types_details = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Mentorship
+        fields = [
+            'id', 'request', 'started_at',
+            'student', 'student_full_name', 'student_dept', 'student_batch_year', 'student_image', 'student_image_fallback',
+            'alumni', 'alumni_full_name', 'alumni_company', 'alumni_role', 'alumni_image', 'alumni_image_fallback',
+            'mentorship_types_details',
+        ]
+
+    def get_student_full_name(self, obj):
+        return f"{obj.student.first_name} {obj.student.last_name}"
+
+    def get_alumni_full_name(self, obj):
+        return f"{obj.alumni.first_name} {obj.alumni.last_name}"
+
+    # MentorshipViewSet joins the profile and prefetches the request's types
+    def get_alumni_company(self, obj):
+        profile = getattr(obj.alumni, 'alumni_profile', None)
+        return profile.current_company if profile else None
+
+    def get_alumni_role(self, obj):
+        profile = getattr(obj.alumni, 'alumni_profile', None)
+        return profile.job_title if profile else None
+
+    def get_mentorship_types_details(self, obj):
+        return mentorship_type_details(mentorship_type_ids(obj.request, 'mentorship_types'))
+
+
+# =========================
+# FILE ATTACHMENTS
+# =========================
+class UploadSerializer(serializers.ModelSerializer):
+    offset = serializers.IntegerField(source='received', read_only=True)
 
+    class Meta:
+        model = Upload
+        fields = ['id', 'purpose', 'filename', 'size', 'offset', 'status', 'sha256', 'created_at']
+        read_only_fields = ['status', 'sha256', 'created_at']
+
+    def validate(self, attrs):
+        check_declared(attrs['purpose'], attrs['filename'], attrs['size'])
+        return attrs
+
+
+class AttachmentMixin:
+    """
+    Lets a serializer take its file either directly (multipart, checked and
+    deduplicated here) or as `upload`, the id of a finished chunked upload.
+    Subclasses set `attachment_field` and `attachment_purpose`.
+    """
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        upload = attrs.pop('upload', None)
+        field = self.attachment_field
+        if upload is not None:
+            user = getattr(self.context.get('request'), 'user', None)
+            if upload.owner_id != getattr(user, 'pk', None) or upload.purpose != self.attachment_purpose:
+                raise serializers.ValidationError({'upload': 'Unknown upload.'})
+            attrs[field] = upload.file.name
+        elif attrs.get(field):
+            check_file(attrs[field], self.attachment_purpose)
+        return attrs
+
+    def store_attachment(self, validated_data):
+        uploaded = validated_data.get(self.attachment_field)
+        if uploaded and not isinstance(uploaded, str):
+            validated_data[self.attachment_field] = store_file(uploaded, uploaded.name, self.attachment_purpose)
+        return validated_data
+
+    def create(self, validated_data):
+        return super().create(self.store_attachment(validated_data))
+
+    def update(self, instance, validated_data):
+        return super().update(instance, self.store_attachment(validated_data))
+
+
+class ProtectedFileField(serializers.FileField):
+    """A file URL signed for the requesting user, so the link works in a plain <a href> (see campus/media.py)."""
+
+    def to_representation(self, value):
+        url = super().to_representation(value)
+        request = self.context.get('request')
+        if not url or request is None or not request.user.is_authenticated:
+            return url
+        return f'{url}?{signed_query(value.name, request.user.pk)}'
+
+
+def upload_field():
+    return serializers.PrimaryKeyRelatedField(
+        queryset=Upload.objects.filter(status='complete'), write_only=True, required=False,
+    )
+
+
+class MentorshipActivitySerializer(AttachmentMixin, serializers.ModelSerializer):
+    attachment_field = 'file'
+    attachment_purpose = 'activity_file'
+    upload = upload_field()
+    file = ProtectedFileField(required=False, allow_null=True, max_length=100)
 
-class MentorshipActivitySerializer(serializers.ModelSerializer):
     class Meta:
         model = MentorshipActivity
         fields = '__all__' #means return every field from model
@@ -256,6 +443,10 @@ class MentorshipActivitySerializer(serializers.ModelSerializer):
 class JobSerializer(serializers.ModelSerializer):
     posted_by_name = serializers.CharField(source='posted_by.username', read_only=True)
     posted_by_full_name = serializers.SerializerMethodField()
+    # annotated on the poster's own list (my_jobs=true), left out elsewhere
+    pending_referrals = serializers.IntegerField(read_only=True)
+    viewed_referrals = serializers.IntegerField(read_only=True)
+    referred_referrals = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Job
@@ -266,7 +457,11 @@ class JobSerializer(serializers.ModelSerializer):
         return f"{obj.posted_by.first_name} {obj.posted_by.last_name}"
 
 
-class ReferralRequestSerializer(serializers.ModelSerializer):
+class ReferralRequestSerializer(AttachmentMixin, serializers.ModelSerializer):
+    attachment_field = 'resume'
+    attachment_purpose = 'resume'
+    upload = upload_field()
+    resume = ProtectedFileField(required=False, max_length=100)  # or sent as `upload`
     student_name = serializers.CharField(source='student.username', read_only=True)
     student_full_name = serializers.SerializerMethodField()
     job_title = serializers.CharField(source='job.title', read_only=True)
@@ -277,5 +472,11 @@ class ReferralRequestSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ['student', 'requested_at']
 
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if self.instance is None and not attrs.get('resume'):
+            raise serializers.ValidationError({'resume': 'Attach a resume or pass the id of a finished upload.'})
+        return attrs
+
     def get_student_full_name(self, obj):
         return f"{obj.student.first_name} {obj.student.last_name}"
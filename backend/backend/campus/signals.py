@@ -0,0 +1,248 @@
+from django.db.models import Count, Subquery
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+from .cache import invalidate_mentorship_type_catalogue, invalidate_visible_job_posters
+from .mentorships import sync_mentorships
+from .models import User, MentorshipType, Event, Job, MentorshipRequest, MentorshipActivity, ReferralRequest, Tombstone
+from .notifications import notify
+from .thumbnails import queue_thumbnails
+from .stats import bump, status_deltas, mentee_delta, REQUEST_STATUS_FIELDS, REFERRAL_STATUS_FIELDS
+
+EventRegistration = Event.registered_users.through
+
+# post_save receivers tell what changed with `instance.original_value(field)`:
+# the value as last loaded or saved (TrackedModel in campus/models.py). It is
+# only updated once save() returns, after every receiver has run.
+
+
+# =========================
+# CACHE INVALIDATION
+# =========================
+@receiver([post_save, post_delete], sender=MentorshipType)
+def mentorship_type_changed(sender, **kwargs):
+    invalidate_mentorship_type_catalogue()
+
+
+@receiver(post_save, sender=MentorshipRequest)
+def mentorship_request_visibility_changed(sender, instance, created, raw=False, **kwargs):
+    old_status = None if created else instance.original_value('status')
+    if not raw and old_status != instance.status and 'accepted' in (old_status, instance.status):
+        invalidate_visible_job_posters(instance.student_id)
+
+
+@receiver(post_delete, sender=MentorshipRequest)
+def accepted_mentorship_request_deleted(sender, instance, **kwargs):
+    if instance.status == 'accepted':
+        invalidate_visible_job_posters(instance.student_id)
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    token_cache.evict(instance.key)
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, **kwargs):
+    # cached tokens carry a copy of the user; drop it so the next request reloads it
+    token_cache.evict_user(instance.pk)
+
+
+# =========================
+# PROFILE IMAGE THUMBNAILS
+# =========================
+@receiver(post_save, sender=User)
+def profile_image_saved(sender, instance, raw=False, **kwargs):
+    name = instance.image.name if instance.image else None
+    if name and name != instance.original_value('image') and not raw:
+        queue_thumbnails(name)
+
+
+# =========================
+# ALUMNI STATS COUNTERS
+# =========================
+# Each receiver turns one row change into a single counter UPDATE on the
+# affected AlumniStats row (see campus/stats.py).
+
+
+@receiver(post_save, sender=MentorshipRequest)
+def mentorship_request_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_status = None if created else instance.original_value('status')
+    if old_status != instance.status:
+        deltas = status_deltas(REQUEST_STATUS_FIELDS, old_status, instance.status)
+        if instance.status == 'accepted':
+            deltas['total_mentees'] = mentee_delta(instance, entering=True)
+        elif old_status == 'accepted':
+            deltas['total_mentees'] = mentee_delta(instance, entering=False)
+        bump(instance.alumni_id, **deltas)
+
+
+@receiver(post_delete, sender=MentorshipRequest)
+def mentorship_request_deleted(sender, instance, **kwargs):
+    deltas = status_deltas(REQUEST_STATUS_FIELDS, instance.status, None)
+    if instance.status == 'accepted':
+        deltas['total_mentees'] = mentee_delta(instance, entering=False)
+    bump(instance.alumni_id, **deltas)
+
+
+def request_alumni(mentorship_request_id):
+    return Subquery(MentorshipRequest.objects.filter(pk=mentorship_request_id).values('alumni_id')[:1])
+
+
+@receiver(post_save, sender=MentorshipActivity)
+def mentorship_activity_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_status = None if created else instance.original_value('status')
+    if created or old_status != instance.status:
+        completed = (instance.status == 'completed') - (old_status == 'completed')
+        bump(request_alumni(instance.mentorship_request_id), total_activities=int(created), completed_activities=completed)
+
+
+@receiver(post_delete, sender=MentorshipActivity)
+def mentorship_activity_deleted(sender, instance, **kwargs):
+    bump(
+        request_alumni(instance.mentorship_request_id),
+        total_activities=-1, completed_activities=-int(instance.status == 'completed'),
+    )
+
+
+def job_poster(job_id):
+    return Subquery(Job.objects.filter(pk=job_id).values('posted_by_id')[:1])
+
+
+@receiver(post_save, sender=ReferralRequest)
+def referral_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_status = None if created else instance.original_value('status')
+    if old_status != instance.status:
+        bump(job_poster(instance.job_id), **status_deltas(REFERRAL_STATUS_FIELDS, old_status, instance.status))
+
+
+@receiver(post_delete, sender=ReferralRequest)
+def referral_deleted(sender, instance, **kwargs):
+    bump(job_poster(instance.job_id), **status_deltas(REFERRAL_STATUS_FIELDS, instance.status, None))
+
+
+def registrations_by_organizer(registrations):
+    return registrations.values('event__organizer_id').annotate(n=Count('id')).order_by()
+
+
+# Django sends no save/delete signals for auto-created through rows, so
+# registrations are counted from m2m_changed and from the deletes that cascade
+# into the through table.
+@receiver(m2m_changed, sender=EventRegistration)
+def event_registrations_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'post_add' and pk_set:
+        # pk_set only holds the rows that were actually inserted
+        if not reverse:
+            bump(instance.organizer_id, event_registrations=len(pk_set))
+            return
+        for row in Event.objects.filter(pk__in=pk_set).values('organizer_id').annotate(n=Count('id')).order_by():
+            bump(row['organizer_id'], event_registrations=row['n'])
+
+    elif action in ('pre_remove', 'pre_clear'):
+        # count the rows that exist before they are deleted
+        if reverse:
+            registrations = EventRegistration.objects.filter(user_id=instance.pk)
+            if pk_set is not None:
+                registrations = registrations.filter(event_id__in=pk_set)
+        else:
+            registrations = EventRegistration.objects.filter(event_id=instance.pk)
+            if pk_set is not None:
+                registrations = registrations.filter(user_id__in=pk_set)
+        for row in registrations_by_organizer(registrations):
+            bump(row['event__organizer_id'], event_registrations=-row['n'])
+
+
+@receiver(pre_delete, sender=Event)
+def event_deleted(sender, instance, **kwargs):
+    registrations = EventRegistration.objects.filter(event_id=instance.pk).count()
+    bump(instance.organizer_id, event_registrations=-registrations)
+
+
+@receiver(pre_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    registrations = EventRegistration.objects.filter(user_id=instance.pk).exclude(event__organizer_id=instance.pk)
+    for row in registrations_by_organizer(registrations):
+        bump(row['event__organizer_id'], event_registrations=-row['n'])
+
+
+# =========================
+# MENTORSHIP READ MODEL
+# =========================
+@receiver(post_save, sender=MentorshipRequest)
+def mentorship_request_relationship(sender, instance, created, raw=False, **kwargs):
+    old_status = None if created else instance.original_value('status')
+    if not raw and old_status != instance.status and 'accepted' in (old_status, instance.status):
+        sync_mentorships([(instance.student_id, instance.alumni_id)])
+
+
+@receiver(post_delete, sender=MentorshipRequest)
+def accepted_mentorship_request_removed(sender, instance, **kwargs):
+    # its Mentorship row went with it (cascade); another accepted request may take over
+    if instance.status == 'accepted':
+        sync_mentorships([(instance.student_id, instance.alumni_id)])
+
+
+# =========================
+# SYNC TOMBSTONES
+# =========================
+@receiver(post_delete, sender=MentorshipRequest)
+def mentorship_request_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(
+        model='mentorship_request', object_id=instance.pk,
+        student_id=instance.student_id, alumni_id=instance.alumni_id,
+    )
+
+
+@receiver(post_delete, sender=MentorshipActivity)
+def mentorship_activity_tombstone(sender, instance, **kwargs):
+    # activities are deleted before their request when a request cascades, so this still finds it
+    participants = MentorshipRequest.objects.filter(pk=instance.mentorship_request_id).values_list('student_id', 'alumni_id').first()
+    if participants:
+        Tombstone.objects.create(
+            model='mentorship_activity', object_id=instance.pk,
+            student_id=participants[0], alumni_id=participants[1],
+        )
+
+
+# =========================
+# PUSH NOTIFICATIONS
+# =========================
+# Sent to the notification stream (views.notification_stream) once the
+# transaction commits, so open clients refresh the one row instead of polling.
+@receiver(post_save, sender=MentorshipRequest)
+def mentorship_request_notify(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_status = None if created else instance.original_value('status')
+    if created or old_status != instance.status:
+        notify([instance.student_id, instance.alumni_id], {
+            'type': 'mentorship_request',
+            'id': instance.pk,
+            'status': instance.status,
+            'previous_status': old_status,
+        })
+
+
+@receiver(post_save, sender=ReferralRequest)
+def referral_notify(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_status = None if created else instance.original_value('status')
+    if created or old_status != instance.status:
+        poster_id = Job.objects.filter(pk=instance.job_id).values_list('posted_by_id', flat=True).first()
+        notify([instance.student_id, poster_id], {
+            'type': 'referral_request',
+            'id': instance.pk,
+            'job': instance.job_id,
+            'status': instance.status,
+            'previous_status': old_status,
+        })
@@ -0,0 +1,134 @@
+from django.db import connection
+from django.db.models import Count, F
+
+from .models import User, AlumniStats, Event, MentorshipRequest, MentorshipActivity, ReferralRequest
+
+
+# =========================
+# ALUMNI DASHBOARD COUNTERS
+# =========================
+REQUEST_STATUS_FIELDS = {
+    'pending': 'pending_requests',
+    'accepted': 'accepted_requests',
+    'rejected': 'rejected_requests',
+    'cancelled': 'cancelled_requests',
+}
+
+REFERRAL_STATUS_FIELDS = {
+    'pending': 'referrals_pending',
+    'viewed': 'referrals_viewed',
+    'referred': 'referrals_referred',
+    'rejected': 'referrals_rejected',
+}
+
+COUNTER_FIELDS = [
+    'total_mentees', *REQUEST_STATUS_FIELDS.values(), 'total_activities', 'completed_activities',
+    *REFERRAL_STATUS_FIELDS.values(), 'event_registrations',
+]
+
+
+def bump(alumni, **deltas):
+    """
+    Adds `deltas` to the counters of one AlumniStats row in a single UPDATE.
+    `alumni` may be an id or a Subquery resolving to one. A missing row is left
+    alone: it is built from scratch the first time the dashboard asks for it.
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if deltas:
+        AlumniStats.objects.filter(alumni_id=alumni).update(**{f: F(f) + d for f, d in deltas.items()})
+
+
+def status_deltas(fields, old_status, new_status):
+    deltas = {}
+    if old_status in fields:
+        deltas[fields[old_status]] = -1
+    if new_status in fields:
+        deltas[fields[new_status]] = deltas.get(fields[new_status], 0) + 1
+    return deltas
+
+
+def mentee_delta(mentorship_request, entering):
+    """+1/-1 when a student gains or loses their only accepted request with this alumnus."""
+    other_accepted = MentorshipRequest.objects.filter(
+        student_id=mentorship_request.student_id,
+        alumni_id=mentorship_request.alumni_id,
+        status='accepted',
+    ).exclude(pk=mentorship_request.pk).exists()
+    if other_accepted:
+        return 0
+    return 1 if entering else -1
+
+
+def compute_stats(alumni_ids):
+    """Recomputes every counter for the given users with one grouped query per metric."""
+    stats = {alumni_id: dict.fromkeys(COUNTER_FIELDS, 0) for alumni_id in alumni_ids}
+
+    rows = (
+        MentorshipRequest.objects.filter(alumni_id__in=alumni_ids)
+        .values('alumni_id', 'status').annotate(n=Count('id')).order_by()
+    )
+    for row in rows:
+        if row['status'] in REQUEST_STATUS_FIELDS:
+            stats[row['alumni_id']][REQUEST_STATUS_FIELDS[row['status']]] = row['n']
+
+    rows = (
+        MentorshipRequest.objects.filter(alumni_id__in=alumni_ids, status='accepted')
+        .values('alumni_id').annotate(n=Count('student_id', distinct=True)).order_by()
+    )
+    for row in rows:
+        stats[row['alumni_id']]['total_mentees'] = row['n']
+
+    rows = (
+        MentorshipActivity.objects.filter(mentorship_request__alumni_id__in=alumni_ids)
+        .values('mentorship_request__alumni_id', 'status').annotate(n=Count('id')).order_by()
+    )
+    for row in rows:
+        counters = stats[row['mentorship_request__alumni_id']]
+        counters['total_activities'] += row['n']
+        if row['status'] == 'completed':
+            counters['completed_activities'] = row['n']
+
+    rows = (
+        ReferralRequest.objects.filter(job__posted_by_id__in=alumni_ids)
+        .values('job__posted_by_id', 'status').annotate(n=Count('id')).order_by()
+    )
+    for row in rows:
+        if row['status'] in REFERRAL_STATUS_FIELDS:
+            stats[row['job__posted_by_id']][REFERRAL_STATUS_FIELDS[row['status']]] = row['n']
+
+    rows = (
+        Event.registered_users.through.objects.filter(event__organizer_id__in=alumni_ids)
+        .values('event__organizer_id').annotate(n=Count('id')).order_by()
+    )
+    for row in rows:
+        stats[row['event__organizer_id']]['event_registrations'] = row['n']
+
+    return stats
+
+
+def rebuild_alumni_stats(alumni_ids=None, chunk_size=500):
+    """
+    Rewrites the AlumniStats rows for `alumni_ids` (default: every alumnus)
+    from the source tables and returns the rows written.
+    """
+    if alumni_ids is None:
+        alumni_ids = list(User.objects.filter(role='alumni').order_by('id').values_list('id', flat=True))
+
+    upsert = {'update_conflicts': True, 'update_fields': [*COUNTER_FIELDS, 'updated_at']}
+    if connection.features.supports_update_conflicts_with_target:
+        upsert['unique_fields'] = ['alumni']
+
+    written = []
+    for start in range(0, len(alumni_ids), chunk_size):
+        chunk = alumni_ids[start:start + chunk_size]
+        rows = [AlumniStats(alumni_id=alumni_id, **counters) for alumni_id, counters in compute_stats(chunk).items()]
+        AlumniStats.objects.bulk_create(rows, **upsert)
+        written.extend(rows)
+    return written
+
+
+def get_alumni_stats(user):
+    stats = AlumniStats.objects.filter(alumni=user).first()
+    if stats is None:
+        stats = rebuild_alumni_stats([user.id])[0]
+    return stats
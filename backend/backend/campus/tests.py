@@ -1,3 +1,1415 @@
-from django.test import TestCase
+import asyncio
+import contextvars
+import datetime
+import io
+import json
+import os
+import re
+import tempfile
+from unittest import mock, skipUnless
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.conf import settings
+from django.core import mail
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.db import connection
+from django.http import JsonResponse
+from django.test import AsyncClient, AsyncRequestFactory, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import ResolverMatch
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from . import notifications, perf
+from .authentication import token_cache
+from .cache import get_mentorship_type_catalogue, clear_mentorship_type_catalogue
+from .db import connection_stats, reset_connection_stats
+from .management.commands.explain_queries import full_scans
+from .models import (
+    User, AlumniProfile, MentorshipType, Event, MentorshipRequest, MentorshipActivity, Mentorship,
+    Job, ReferralRequest, OutboundEmail, AlumniStats, Upload,
+)
+from .perf import PerformanceMiddleware, RequestProfile, metrics_snapshot, reset_metrics
+from .routers import ReplicaRouter, _state as routing_state
+from .stats import COUNTER_FIELDS, compute_stats
+from .uploads import OffsetMismatch, append_chunk, temp_path
+from .views import notification_stream
+
+
+def make_user(username, role='student', **extra):
+    defaults = {
+        'password': 'pass12345',
+        'first_name': username.title(),
+        'last_name': 'Test',
+        'email': f'{username}@example.com',
+        'college': 'GEC',
+        'degree': 'B.Tech CSE',
+        'batch_year': 2020,
+    }
+    defaults.update(extra)
+    return User.objects.create_user(username=username, role=role, **defaults)
+
+
+def make_alumni(username, types=(), **profile_fields):
+    user = make_user(username, role='alumni')
+    profile = AlumniProfile.objects.create(
+        user=user,
+        job_title=profile_fields.pop('job_title', 'Engineer'),
+        current_company=profile_fields.pop('current_company', 'Acme'),
+        **profile_fields
+    )
+    if types:
+        profile.available_for.set(types)
+    return user
+
+
+# =========================
+# ALUMNI DIRECTORY TESTS
+# =========================
+class AlumniDirectoryQueryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.student = make_user('viewer')
+        self.client.force_authenticate(self.student)
+        self.types = [
+            MentorshipType.objects.create(name='Career Guidance'),
+            MentorshipType.objects.create(name='Resume Review'),
+        ]
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/alumni/')
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_alumni(self):
+        for i in range(3):
+            make_alumni(f'alum{i}', types=self.types)
+        get_mentorship_type_catalogue()  # type names are served from the warm catalogue cache
+        small = self.count_list_queries()
+
+        for i in range(3, 25):
+            make_alumni(f'alum{i}', types=self.types)
+        large = self.count_list_queries()
+
+        self.assertEqual(small, large)
+
+    def test_cards_include_profile_and_skills(self):
+        make_alumni('alice', types=self.types, industry='Software', willing_to_mentor=True)
+        response = self.client.get('/api/alumni/')
+        card = response.data['results'][0]
+        self.assertEqual(card['company'], 'Acme')
+        self.assertEqual(card['industry'], 'Software')
+        self.assertTrue(card['mentorship'])
+        self.assertEqual(sorted(card['skills']), ['Career Guidance', 'Resume Review'])
+
+
+# =========================
+# PAGINATION TESTS
+# =========================
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.organizer = make_user('organizer', role='alumni')
+        self.client.force_authenticate(self.organizer)
+        # several events share a date so the id tiebreaker matters
+        for i in range(7):
+            Event.objects.create(
+                title=f'Event {i}', description='-', date=datetime.date(2026, 1, 1 + i // 3),
+                time=datetime.time(10, 0), location='Hall', type='offline', organizer=self.organizer,
+            )
+
+    def walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_pages_cover_every_row_once_in_order(self):
+        ids = self.walk('/api/events/?page_size=2')
+        expected = list(Event.objects.order_by('-date', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_page_size_is_capped(self):
+        response = self.client.get('/api/events/?page_size=100000')
+        self.assertEqual(len(response.data['results']), 7)
+        self.assertIsNone(response.data['next'])
+
+
+# =========================
+# EVENT LIST TESTS
+# =========================
+class EventListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.organizer = make_user('host', role='alumni')
+        self.viewer = make_user('viewer')
+        self.client.force_authenticate(self.viewer)
+
+    def make_events(self, count, attendees):
+        for i in range(count):
+            event = Event.objects.create(
+                title=f'Talk {i}', description='-', date=datetime.date(2026, 2, 1),
+                time=datetime.time(18, 0), location='Online', type='online', organizer=self.organizer,
+            )
+            event.registered_users.set(attendees)
+
+    def test_list_runs_in_constant_queries(self):
+        attendees = [make_user(f'fan{i}') for i in range(5)]
+        self.make_events(2, attendees)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get('/api/events/')
+        self.make_events(10, attendees + [self.viewer])
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get('/api/events/')
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+        rows = response.data['results']
+        self.assertEqual(sum(row['is_registered'] for row in rows), 10)
+        self.assertEqual({row['participants_count'] for row in rows}, {5, 6})
+
+    def test_organizer_participants_come_from_one_query(self):
+        fans = [make_user(f'fan{i}') for i in range(3)]
+        self.make_events(2, fans[:2])
+        other = Event.objects.create(
+            title='Elsewhere', description='-', date=datetime.date(2026, 3, 1), time=datetime.time(9, 0),
+            location='Hall', type='offline', organizer=self.viewer,
+        )
+        other.registered_users.set(fans[1:])
+        self.client.force_authenticate(self.organizer)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get('/api/events/')
+        self.make_events(5, fans)
+        with CaptureQueriesContext(connection) as large:
+            rows = self.client.get('/api/events/').data['results']
+        self.assertEqual(len(small), len(large))
+
+        self.assertIsNone(next(row for row in rows if row['title'] == 'Elsewhere')['participants'])
+        # fan2 is also registered for other events; only each event's own sign-ups are listed
+        self.assertEqual(
+            sorted([p['username'] for p in row['participants']] for row in rows if row['title'] != 'Elsewhere'),
+            [['fan0', 'fan1']] * 2 + [['fan0', 'fan1', 'fan2']] * 5,
+        )
+
+    def test_registered_users_is_opt_in(self):
+        self.make_events(1, [self.viewer])
+        row = self.client.get('/api/events/').data['results'][0]
+        self.assertNotIn('registered_users', row)
+        row = self.client.get('/api/events/?include=registered_users').data['results'][0]
+        self.assertEqual(row['registered_users'], [self.viewer.id])
+
+
+# =========================
+# INDEX PLAN TESTS
+# =========================
+class ExplainQueriesCommandTests(TestCase):
+    def test_reports_every_scenario(self):
+        make_user('someone')
+        make_alumni('mentor')
+        out = StringIO()
+        call_command('explain_queries', stdout=out)
+        self.assertIn('== mentorship-requests (alumni)', out.getvalue())
+        self.assertIn('== referrals (student)', out.getvalue())
+
+    def test_mysql_plan_flags_tables_read_whole(self):
+        # EXPLAIN FORMAT=JSON from MySQL 8.0 for the student job feed on an unindexed table
+        plan = json.dumps({
+            'query_block': {
+                'select_id': 1,
+                'cost_info': {'query_cost': '2.75'},
+                'ordering_operation': {
+                    'using_filesort': True,
+                    'nested_loop': [
+                        {'table': {
+                            'table_name': 'campus_job', 'access_type': 'ALL', 'rows_examined_per_scan': 5,
+                            'rows_produced_per_join': 5, 'filtered': '100.00',
+                            'cost_info': {'read_cost': '0.25', 'eval_cost': '0.50', 'prefix_cost': '0.75'},
+                            'used_columns': ['id', 'title', 'posted_by_id', 'posted_at'],
+                        }},
+                        {'table': {
+                            'table_name': 'campus_user', 'access_type': 'eq_ref', 'possible_keys': ['PRIMARY'],
+                            'key': 'PRIMARY', 'used_key_parts': ['id'], 'key_length': '8',
+                            'ref': ['gradlink.campus_job.posted_by_id'], 'rows_examined_per_scan': 1,
+                            'rows_produced_per_join': 5, 'filtered': '100.00',
+                            'cost_info': {'read_cost': '1.25', 'eval_cost': '0.50', 'prefix_cost': '2.50'},
+                            'used_columns': ['id', 'first_name', 'last_name'],
+                        }},
+                    ],
+                },
+            },
+        }, indent=2)
+        self.assertEqual(full_scans(plan, 'mysql'), ['campus_job (access_type ALL)'])
+
+
+# =========================
+# EMAIL OUTBOX TESTS
+# =========================
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError("SMTP unavailable")
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class EmailOutboxTests(TestCase):
+    def setUp(self):
+        self.student = make_user('mentee')
+        self.alumni = make_alumni('mentor')
+        self.request = MentorshipRequest.objects.create(student=self.student, alumni=self.alumni, status='accepted')
+        self.client = APIClient()
+        self.client.force_authenticate(self.alumni)
+
+    def schedule_session(self):
+        response = self.client.post('/api/mentorship-activities/', {
+            'mentorship_request': self.request.id,
+            'title': 'Mock interview',
+            'status': 'scheduled',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def test_scheduling_only_queues_the_email(self):
+        self.schedule_session()
+        self.assertEqual(len(mail.outbox), 0)
+        queued = OutboundEmail.objects.get()
+        self.assertEqual(queued.recipients, ['mentee@example.com'])
+
+        call_command('send_queued_emails', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('Mock interview', mail.outbox[0].subject)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'sent')
+
+    @override_settings(EMAIL_BACKEND='campus.tests.FailingEmailBackend', EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+    def test_failures_back_off_then_give_up(self):
+        self.schedule_session()
+        call_command('send_queued_emails', stdout=StringIO())
+        queued = OutboundEmail.objects.get()
+        self.assertEqual((queued.status, queued.attempts), ('pending', 1))
+        self.assertIn('SMTP unavailable', queued.last_error)
+
+        # not due yet, so a second run leaves it alone
+        call_command('send_queued_emails', stdout=StringIO())
+        queued.refresh_from_db()
+        self.assertEqual(queued.attempts, 1)
+
+        OutboundEmail.objects.update(next_attempt_at=queued.created_at)
+        call_command('send_queued_emails', stdout=StringIO())
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('failed', 2))
+
+
+# =========================
+# MENTORSHIP TYPE CATALOGUE TESTS
+# =========================
+class MentorshipTypeCatalogueTests(TestCase):
+    def setUp(self):
+        clear_mentorship_type_catalogue()
+        self.client = APIClient()
+        self.client.force_authenticate(make_user('viewer'))
+        MentorshipType.objects.create(name='Career Guidance')
+
+    def test_etag_revalidation_skips_the_database(self):
+        response = self.client.get('/api/mentorship-types/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([t['name'] for t in response.data], ['Career Guidance'])
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/mentorship-types/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_saving_a_type_invalidates_the_catalogue(self):
+        etag = self.client.get('/api/mentorship-types/')['ETag']
+        with self.captureOnCommitCallbacks() as callbacks:
+            MentorshipType.objects.create(name='Interview Prep')
+            # not before commit: a request rebuilding now would cache the old rows
+            self.assertEqual(self.client.get('/api/mentorship-types/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        for callback in callbacks:
+            callback()
+
+        response = self.client.get('/api/mentorship-types/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 2)
+
+    def test_embedded_type_names_come_from_the_catalogue(self):
+        types = list(MentorshipType.objects.all())
+        alumni = make_alumni('mentor', types=types)
+        self.client.get('/api/mentorship-types/')  # warm the cache
+
+        response = self.client.get(f'/api/alumni/{alumni.id}/')
+        self.assertEqual(response.data['alumni_profile']['available_for'], [{'id': types[0].id, 'name': 'Career Guidance'}])
+
+
+# =========================
+# ALUMNI SEARCH TESTS
+# =========================
+class AlumniSearchTests(TestCase):
+    def setUp(self):
+        clear_mentorship_type_catalogue()
+        self.client = APIClient()
+        self.client.force_authenticate(make_user('viewer'))
+        self.resume = MentorshipType.objects.create(name='Resume Review')
+        self.career = MentorshipType.objects.create(name='Career Guidance')
+        make_alumni('ann', types=[self.resume], current_company='Google', job_title='SRE',
+                    industry='Software', willing_to_mentor=True)
+        make_alumni('bob', types=[self.resume, self.career], current_company='Infosys', job_title='Analyst',
+                    industry='Consulting')
+        make_alumni('cara', types=[self.career], current_company='Google', job_title='Product Manager',
+                    industry='Software', willing_to_mentor=True)
+        User.objects.filter(username='cara').update(batch_year=2015)
+
+    def names(self, response):
+        return sorted(row['name'] for row in response.data['results'])
+
+    def test_text_search_matches_name_company_and_title(self):
+        self.assertEqual(self.names(self.client.get('/api/alumni/?q=google')), ['Ann Test', 'Cara Test'])
+        self.assertEqual(self.names(self.client.get('/api/alumni/?q=product goo')), ['Cara Test'])
+        self.assertEqual(self.names(self.client.get('/api/alumni/?q=ann google')), ['Ann Test'])  # name + company
+        self.assertEqual(self.names(self.client.get('/api/alumni/?q=bob')), ['Bob Test'])
+
+    def test_filters_combine(self):
+        response = self.client.get(f'/api/alumni/?industry=Software&available_for={self.resume.id},{self.career.id}')
+        self.assertEqual(self.names(response), ['Ann Test', 'Cara Test'])
+        response = self.client.get('/api/alumni/?batch_max=2018&willing_to_mentor=true')
+        self.assertEqual(self.names(response), ['Cara Test'])
+
+    def test_facets_ignore_their_own_filter(self):
+        facets = self.client.get('/api/alumni/?industry=Software').data['facets']
+        self.assertEqual(facets['industry'], [{'value': 'Software', 'count': 2}, {'value': 'Consulting', 'count': 1}])
+        self.assertEqual(facets['company'], [{'value': 'Google', 'count': 2}])
+        self.assertEqual(
+            sorted((row['label'], row['count']) for row in facets['available_for']),
+            [('Career Guidance', 1), ('Resume Review', 1)],
+        )
+
+    def test_invalid_numbers_are_rejected(self):
+        self.assertEqual(self.client.get('/api/alumni/?batch_min=soon').status_code, 400)
+
+
+# =========================
+# ALUMNI DASHBOARD TESTS
+# =========================
+class AlumniDashboardTests(TestCase):
+    def setUp(self):
+        self.alumni = make_alumni('mentor')
+        self.students = [make_user(f'student{i}') for i in range(3)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.alumni)
+
+    def dashboard(self):
+        response = self.client.get('/api/alumni/dashboard-stats/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def assert_counters_match_source(self):
+        stored = AlumniStats.objects.get(alumni=self.alumni)
+        expected = compute_stats([self.alumni.id])[self.alumni.id]
+        self.assertEqual({field: getattr(stored, field) for field in COUNTER_FIELDS}, expected)
+
+    def test_counters_follow_changes_incrementally(self):
+        self.dashboard()  # creates the stats row
+
+        first = MentorshipRequest.objects.create(student=self.students[0], alumni=self.alumni)
+        second = MentorshipRequest.objects.create(student=self.students[1], alumni=self.alumni)
+        MentorshipRequest.objects.create(student=self.students[2], alumni=self.alumni, status='rejected')
+        first.status = 'accepted'
+        first.save()
+        # a second accepted request from the same student is still one mentee
+        MentorshipRequest.objects.create(student=self.students[0], alumni=self.alumni, status='accepted')
+        MentorshipActivity.objects.create(mentorship_request=first, title='Kickoff', status='completed')
+        MentorshipActivity.objects.create(mentorship_request=first, title='Follow up')
+        second.delete()
+
+        job = Job.objects.create(title='SDE', company='Acme', location='Remote', description='-', posted_by=self.alumni)
+        referral = ReferralRequest.objects.create(job=job, student=self.students[1], resume='referral_resumes/cv.pdf')
+        referral.status = 'referred'
+        referral.save()
+
+        event = Event.objects.create(
+            title='Meetup', description='-', date=datetime.date(2026, 3, 1), time=datetime.time(9, 0),
+            location='Hall', type='offline', organizer=self.alumni,
+        )
+        event.registered_users.add(*self.students)
+        event.registered_users.remove(self.students[2])
+        dropout = make_user('dropout')
+        dropout.registered_events.add(event)
+        dropout.delete()
+
+        with self.assertNumQueries(1):  # just the stats row
+            data = self.dashboard()
+        self.assertEqual(data['total_mentees'], 1)
+        self.assertEqual((data['pending_requests'], data['accepted_requests'], data['rejected_requests']), (0, 2, 1))
+        self.assertEqual((data['total_activities'], data['completed_activities']), (2, 1))
+        self.assertEqual(data['referrals_referred'], 1)
+        self.assertEqual(data['event_registrations'], 2)
+        self.assertEqual(data['success_rate'], '67%')
+        self.assert_counters_match_source()
+
+    def test_rebuild_command_repairs_drift(self):
+        MentorshipRequest.objects.create(student=self.students[0], alumni=self.alumni, status='accepted')
+        self.dashboard()
+        AlumniStats.objects.filter(alumni=self.alumni).update(total_mentees=42, accepted_requests=0)
+
+        call_command('rebuild_alumni_stats', stdout=StringIO())
+        self.assert_counters_match_source()
+        self.assertEqual(self.dashboard()['total_mentees'], 1)
+
+    def test_students_are_forbidden(self):
+        self.client.force_authenticate(self.students[0])
+        self.assertEqual(self.client.get('/api/alumni/dashboard-stats/').status_code, 403)
+
+
+# =========================
+# EVENT REGISTRATION TESTS
+# =========================
+class EventRegistrationTests(TestCase):
+    def setUp(self):
+        self.organizer = make_alumni('host')
+        self.event = Event.objects.create(
+            title='Workshop', description='-', date=datetime.date(2026, 4, 1), time=datetime.time(10, 0),
+            location='Lab', type='offline', organizer=self.organizer, capacity=2,
+        )
+        self.url = f'/api/events/{self.event.id}/register/'
+        self.client = APIClient()
+
+    def as_user(self, username):
+        user = make_user(username)
+        self.client.force_authenticate(user)
+        return user
+
+    def test_put_and_delete_are_idempotent(self):
+        user = self.as_user('keen')
+        for _ in range(2):
+            response = self.client.put(self.url)
+            self.assertEqual(response.data, {'status': 'registered'})
+        self.assertEqual(list(self.event.registered_users.all()), [user])
+
+        for _ in range(2):
+            response = self.client.delete(self.url)
+            self.assertEqual(response.data, {'status': 'unregistered'})
+        self.assertFalse(self.event.registered_users.exists())
+
+    def test_capacity_is_enforced(self):
+        self.as_user('first')
+        self.assertEqual(self.client.put(self.url).status_code, 200)
+        self.as_user('second')
+        self.assertEqual(self.client.put(self.url).status_code, 200)
+        self.as_user('third')
+        response = self.client.put(self.url)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.event.registered_users.count(), 2)
+
+        # already registered users still get a success when the event is full
+        self.client.force_authenticate(User.objects.get(username='first'))
+        self.assertEqual(self.client.put(self.url).status_code, 200)
+
+    def test_dashboard_counter_follows_registrations(self):
+        self.client.force_authenticate(self.organizer)
+        self.client.get('/api/alumni/dashboard-stats/')
+        self.as_user('fan')
+        self.client.put(self.url)
+        self.client.put(self.url)
+        self.assertEqual(AlumniStats.objects.get(alumni=self.organizer).event_registrations, 1)
+        self.client.delete(self.url)
+        self.assertEqual(AlumniStats.objects.get(alumni=self.organizer).event_registrations, 0)
+
+
+# =========================
+# BENCHMARK HARNESS TESTS
+# =========================
+class BenchmarkHarnessTests(TestCase):
+    def test_generate_and_benchmark_small_dataset(self):
+        call_command('generate_campus_data', users=20, stdout=StringIO())
+        self.assertEqual(User.objects.filter(username__startswith='bench_alumni_').count(), 4)
+        self.assertEqual(AlumniStats.objects.count(), 4)
+        accepted_pairs = set(MentorshipRequest.objects.filter(status='accepted').values_list('student_id', 'alumni_id'))
+        self.assertTrue(accepted_pairs)
+        self.assertEqual(set(Mentorship.objects.values_list('student_id', 'alumni_id')), accepted_pairs)
+
+        output = f'{self.id()}.json'
+        self.addCleanup(lambda: os.path.exists(output) and os.remove(output))
+        call_command(
+            'benchmark_api', iterations=2, warmup=0, only=['events (list)', 'mentorship types', 'mentorships'],
+            output=output, stdout=StringIO(), stderr=StringIO(),
+        )
+        with open(output) as f:
+            results = json.load(f)
+        self.assertEqual([row['name'] for row in results['scenarios']], [
+            'events (list)', 'mentorship types', 'mentorships (mentors)', 'mentorships (mentees)',
+        ])
+        for row in results['scenarios']:
+            self.assertEqual(row['statuses'], {'200': 2})
+            self.assertGreater(row['p50_ms'], 0)
+
+
+# =========================
+# MENTORSHIP INBOX TESTS
+# =========================
+class MentorshipInboxTests(TestCase):
+    def setUp(self):
+        clear_mentorship_type_catalogue()
+        self.alumni = make_alumni('mentor', current_company='Infosys', job_title='Architect')
+        self.type = MentorshipType.objects.create(name='Career Guidance')
+        self.client = APIClient()
+        self.client.force_authenticate(self.alumni)
+        get_mentorship_type_catalogue()
+
+    def add_requests(self, count, status='pending'):
+        for _ in range(count):
+            student = make_user(f'student{User.objects.count()}')
+            request = MentorshipRequest.objects.create(student=student, alumni=self.alumni, status=status)
+            request.mentorship_types.set([self.type])
+
+    def count_queries(self, url='/api/mentorship-requests/'):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_inbox_runs_in_constant_queries(self):
+        self.add_requests(2)
+        small, _ = self.count_queries()
+        self.add_requests(15)
+        large, response = self.count_queries()
+        self.assertEqual(small, large)
+
+        row = response.data['results'][0]
+        self.assertEqual((row['alumni_company'], row['alumni_role']), ('Infosys', 'Architect'))
+        self.assertEqual(row['mentorship_types_details'], [{'id': self.type.id, 'name': 'Career Guidance'}])
+
+    def test_status_and_updated_since_filters(self):
+        self.add_requests(2)
+        self.add_requests(1, status='accepted')
+        _, response = self.count_queries('/api/mentorship-requests/?status=accepted')
+        self.assertEqual(len(response.data['results']), 1)
+
+        watermark = MentorshipRequest.objects.latest('updated_at').updated_at
+        MentorshipRequest.objects.filter(status='pending').first().save()
+        _, response = self.count_queries(f'/api/mentorship-requests/?updated_since={watermark.isoformat().replace("+", "%2B")}')
+        self.assertEqual(len(response.data['results']), 1)
+
+        self.assertEqual(self.client.get('/api/mentorship-requests/?updated_since=yesterday').status_code, 400)
+
+
+# =========================
+# DELTA SYNC TESTS
+# =========================
+class DeltaSyncTests(TestCase):
+    def setUp(self):
+        self.student = make_user('mentee')
+        self.alumni = make_alumni('mentor')
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def sync(self, since=None):
+        params = {'since': since} if since else {}
+        response = self.client.get('/api/sync/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_changes_and_deletions_since_watermark(self):
+        kept = MentorshipRequest.objects.create(student=self.student, alumni=self.alumni)
+        dropped = MentorshipRequest.objects.create(student=self.student, alumni=self.alumni)
+        activity = MentorshipActivity.objects.create(mentorship_request=dropped, title='Intro call')
+        MentorshipRequest.objects.create(student=make_user('someone_else'), alumni=self.alumni)
+
+        first = self.sync()
+        self.assertEqual({row['id'] for row in first['mentorship_requests']['changed']}, {kept.id, dropped.id})
+        self.assertEqual([row['id'] for row in first['mentorship_activities']['changed']], [activity.id])
+
+        # push the existing rows behind the watermark, then change one and delete another
+        MentorshipRequest.objects.update(updated_at=timezone.now() - timedelta(minutes=10))
+        MentorshipActivity.objects.update(updated_at=timezone.now() - timedelta(minutes=10))
+        kept.status = 'accepted'
+        kept.save()
+        dropped_id, activity_id = dropped.id, activity.id
+        dropped.delete()
+
+        second = self.sync(first['watermark'])
+        self.assertEqual([row['id'] for row in second['mentorship_requests']['changed']], [kept.id])
+        self.assertEqual(second['mentorship_requests']['deleted'], [dropped_id])
+        self.assertEqual(second['mentorship_activities']['changed'], [])
+        self.assertEqual(second['mentorship_activities']['deleted'], [activity_id])
+        self.assertFalse(second['full_resync'])
+
+    @override_settings(SYNC_PAGE_SIZE=2)
+    def test_pages_move_on_when_rows_share_a_timestamp(self):
+        created = [MentorshipRequest.objects.create(student=self.student, alumni=self.alumni) for _ in range(5)]
+        MentorshipRequest.objects.update(updated_at=timezone.now() - timedelta(minutes=10))
+
+        seen, since = [], None
+        for _ in range(5):
+            page = self.sync(since)
+            seen += [row['id'] for row in page['mentorship_requests']['changed']]
+            since = page['watermark']
+            if not page['has_more']:
+                break
+        self.assertFalse(page['has_more'])
+        self.assertEqual(seen, [row.id for row in created])
+
+        self.assertEqual(self.client.get('/api/sync/', {'since': 'not-a-watermark'}).status_code, 400)
+
+    def test_stale_watermark_requests_full_resync(self):
+        stale = (timezone.now() - timedelta(days=365)).isoformat()
+        self.assertTrue(self.sync(stale)['full_resync'])
+
+
+class RecordingBroker:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, user_id, message):
+        self.published.append((user_id, message))
+
+
+class NotificationTests(TestCase):
+    def setUp(self):
+        self.student = make_user('mentee')
+        self.alumni = make_alumni('mentor')
+        self.broker = RecordingBroker()
+        notifications._broker = self.broker
+        self.addCleanup(setattr, notifications, '_broker', None)
+
+    def test_accepting_request_notifies_both_sides_after_commit(self):
+        mentorship_request = MentorshipRequest.objects.create(student=self.student, alumni=self.alumni)
+        client = APIClient()
+        client.force_authenticate(self.alumni)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post(f'/api/mentorship-requests/{mentorship_request.id}/accept/')
+        self.assertEqual(response.status_code, 200)
+
+        message = {'type': 'mentorship_request', 'id': mentorship_request.id, 'status': 'accepted', 'previous_status': 'pending'}
+        self.assertCountEqual(self.broker.published, [(self.student.id, message), (self.alumni.id, message)])
+
+    def test_unchanged_status_sends_nothing(self):
+        mentorship_request = MentorshipRequest.objects.create(student=self.student, alumni=self.alumni)
+        mentorship_request.status = 'accepted'
+        mentorship_request.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            mentorship_request.message = 'edited'
+            mentorship_request.save()
+        self.assertEqual(self.broker.published, [])
+
+
+class NotificationStreamTests(TransactionTestCase):
+    def test_stream_delivers_published_message(self):
+        broker = notifications._broker = notifications.InProcessBroker()
+        self.addCleanup(setattr, notifications, '_broker', None)
+        user = make_user('listener')
+        token = Token.objects.create(user=user)
+
+        async def read_stream():
+            request = AsyncRequestFactory().get('/api/notifications/stream/', {'token': token.key})
+            response = await notification_stream(request)
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            # the view's own generator: closing a wrapper around it (streaming_content,
+            # the test client's) would leave it suspended inside the subscription
+            chunks = response._iterator
+            self.assertEqual(await anext(chunks), 'retry: 3000\n\n')
+            # the subscription is open once the first chunk is out
+            broker.publish(user.id, {'type': 'ping', 'id': 1})
+            chunk = await asyncio.wait_for(anext(chunks), timeout=5)
+            await chunks.aclose()
+            self.assertNotIn(user.id, broker._subscribers)  # closing the stream ends the subscription
+            return chunk
+
+        self.assertEqual(asyncio.run(read_stream()), 'event: ping\ndata: {"type": "ping", "id": 1}\n\n')
+
+    def test_stream_rejects_unknown_token(self):
+        response = asyncio.run(AsyncClient().get('/api/notifications/stream/', {'token': 'nope'}))
+        self.assertEqual(response.status_code, 401)
+
+
+class TokenAuthenticationTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = make_user('reader')
+        response = APIClient().post('/api/login/', {'username': 'reader', 'password': 'pass12345'})
+        self.key = response.data['token']
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.key}')
+
+    def test_cached_token_skips_lookup(self):
+        self.client.get('/api/profile/update/')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/profile/update/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('authtoken_token' in q['sql'] for q in queries.captured_queries))
+
+    def test_logout_revokes_cached_token(self):
+        self.client.get('/api/profile/update/')
+        self.assertEqual(self.client.post('/api/logout/').status_code, 200)
+        self.assertEqual(self.client.get('/api/profile/update/').status_code, 401)
+
+    def test_profile_update_is_not_served_stale(self):
+        self.client.get('/api/profile/update/')
+        self.client.put('/api/profile/update/', {'first_name': 'Renamed'}, format='json')
+        self.assertEqual(self.client.get('/api/profile/update/').data['user']['first_name'], 'Renamed')
+
+    def test_expired_token_is_rejected_and_rotated_on_login(self):
+        Token.objects.filter(key=self.key).update(created=timezone.now() - timedelta(days=30))
+        token_cache.clear()
+        self.assertEqual(self.client.get('/api/profile/update/').status_code, 401)
+
+        response = APIClient().post('/api/login/', {'username': 'reader', 'password': 'pass12345'})
+        self.assertNotEqual(response.data['token'], self.key)
+        self.assertFalse(Token.objects.filter(key=self.key).exists())
+
+
+class ChunkedUploadTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        overrides = override_settings(MEDIA_ROOT=media.name, UPLOAD_TEMP_DIR=os.path.join(media.name, 'tmp'))
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.student = make_user('applicant')
+        self.alumni = make_alumni('recruiter')
+        self.jobs = [
+            Job.objects.create(title=f'Role {n}', company='Acme', location='Remote', description='-', posted_by=self.alumni)
+            for n in range(2)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+        self.pdf = b'%PDF-1.4\n' + b'x' * 100_000
+
+    def send_chunk(self, upload_id, offset, data):
+        return self.client.generic(
+            'PATCH', f'/api/uploads/{upload_id}/', data,
+            content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def start(self, filename='cv.pdf', size=None):
+        return self.client.post('/api/uploads/', {
+            'purpose': 'resume', 'filename': filename, 'size': len(self.pdf) if size is None else size,
+        }, format='json')
+
+    def test_resumable_upload_is_stored_once_for_many_referrals(self):
+        upload_id = self.start().data['id']
+        self.assertEqual(self.send_chunk(upload_id, 0, self.pdf[:60_000]).status_code, 200)
+
+        # a client that lost track asks where to continue; a wrong offset is refused
+        self.assertEqual(self.client.head(f'/api/uploads/{upload_id}/')['Upload-Offset'], '60000')
+        self.assertEqual(self.send_chunk(upload_id, 1000, self.pdf[1000:]).status_code, 409)
+
+        response = self.send_chunk(upload_id, 60_000, self.pdf[60_000:])
+        self.assertEqual(response.data['status'], 'complete')
+
+        for job in self.jobs:
+            response = self.client.post('/api/referrals/', {'job': job.id, 'upload': upload_id}, format='json')
+            self.assertEqual(response.status_code, 201, response.data)
+        # the same resume sent directly is deduplicated too
+        self.client.post('/api/referrals/', {
+            'job': self.jobs[0].id, 'resume': SimpleUploadedFile('again.pdf', self.pdf),
+        }, format='multipart')
+
+        stored = Upload.objects.get().file
+        self.assertEqual(set(ReferralRequest.objects.values_list('resume', flat=True)), {stored.name})
+        self.assertEqual(os.listdir(os.path.dirname(stored.path)), [os.path.basename(stored.name)])
+
+    def test_limits_and_content_checks(self):
+        self.assertEqual(self.start(size=50 * 1024 * 1024).status_code, 400)
+        self.assertEqual(self.start(filename='cv.exe').status_code, 400)
+
+        upload_id = self.start(size=20).data['id']
+        self.assertEqual(self.send_chunk(upload_id, 0, b'MZ' + b'\0' * 18).status_code, 400)
+        self.assertEqual(self.send_chunk(upload_id, 0, b'%PDF-' + b'y' * 30).status_code, 400)  # longer than declared
+
+        response = self.client.post('/api/referrals/', {
+            'job': self.jobs[0].id, 'resume': SimpleUploadedFile('cv.pdf', b'not really a pdf'),
+        }, format='multipart')
+        self.assertEqual(response.status_code, 400)
+
+    def test_first_chunk_shorter_than_the_signature_is_checked_later(self):
+        upload_id = self.start().data['id']
+        self.assertEqual(self.send_chunk(upload_id, 0, self.pdf[:3]).status_code, 200)
+        self.assertEqual(self.send_chunk(upload_id, 3, self.pdf[3:]).data['status'], 'complete')
+
+        upload_id = self.start(size=20).data['id']
+        self.assertEqual(self.send_chunk(upload_id, 0, b'%P').status_code, 200)
+        self.assertEqual(self.send_chunk(upload_id, 2, b'NG' + b'\0' * 16).status_code, 400)
+        self.assertEqual(self.client.head(f'/api/uploads/{upload_id}/')['Upload-Offset'], '2')
+
+    def test_a_chunk_that_lost_the_race_leaves_the_file_alone(self):
+        upload_id = self.start().data['id']
+        stale = Upload.objects.get(pk=upload_id)
+        self.send_chunk(upload_id, 0, self.pdf[:1000])
+
+        # a second request for the same offset read the row before the first one committed
+        with self.assertRaises(OffsetMismatch):
+            append_chunk(stale, 0, io.BytesIO(b'%PDF-' + b'z' * 995))
+        with open(temp_path(stale), 'rb') as part:
+            self.assertEqual(part.read(), self.pdf[:1000])
+
+    def test_upload_of_another_user_cannot_be_attached(self):
+        upload_id = self.start().data['id']
+        self.send_chunk(upload_id, 0, self.pdf)
+        self.client.force_authenticate(make_user('intruder'))
+        response = self.client.post('/api/referrals/', {'job': self.jobs[0].id, 'upload': upload_id}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class MediaServingTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        overrides = override_settings(MEDIA_ROOT=media.name, UPLOAD_TEMP_DIR=os.path.join(media.name, 'tmp'))
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.student = make_user('applicant')
+        self.alumni = make_alumni('recruiter')
+        job = Job.objects.create(title='Role', company='Acme', location='Remote', description='-', posted_by=self.alumni)
+        self.content = b'%PDF-1.4\n' + bytes(range(256)) * 40
+        client = APIClient()
+        client.force_authenticate(self.student)
+        client.post('/api/referrals/', {'job': job.id, 'resume': SimpleUploadedFile('cv.pdf', self.content)}, format='multipart')
+        self.referral = ReferralRequest.objects.get()
+        self.url = f'/media/{self.referral.resume.name}'
+
+    def body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_resume_needs_a_participant(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.client.force_login(make_user('stranger'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+        self.client.force_login(self.alumni)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.content)
+
+    def test_signed_link_from_api_works_without_credentials(self):
+        api = APIClient()
+        api.force_authenticate(self.alumni)
+        link = api.get(f'/api/referrals/{self.referral.id}/').data['resume']
+        self.assertEqual(self.client.get(link).status_code, 200)
+        self.assertEqual(self.client.get(link.replace('&s=', '&s=x')).status_code, 403)
+
+    def test_range_and_etag(self):
+        self.client.force_login(self.student)
+        response = self.client.get(self.url, HTTP_RANGE='bytes=5-14')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 5-14/{len(self.content)}')
+        self.assertEqual(self.body(response), self.content[5:15])
+
+        self.assertEqual(self.body(self.client.get(self.url, HTTP_RANGE='bytes=-4')), self.content[-4:])
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.content)}-').status_code, 416)
+
+        etag = response['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    @override_settings(MEDIA_SENDFILE='nginx')
+    def test_transfer_is_handed_to_nginx(self):
+        self.client.force_login(self.student)
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.referral.resume.name}')
+        self.assertEqual(response.content, b'')
+
+    def test_profile_images_are_public_and_paths_cannot_escape(self):
+        os.makedirs(os.path.join(settings.MEDIA_ROOT, 'profile_images'))
+        with open(os.path.join(settings.MEDIA_ROOT, 'profile_images', 'a.png'), 'wb') as image:
+            image.write(b'\x89PNG\r\n\x1a\n')
+        self.assertEqual(self.client.get('/media/profile_images/a.png').status_code, 200)
+        self.assertEqual(self.client.get('/media/../manage.py').status_code, 404)
+        # dot segments must not take a protected file out of its prefix
+        name = self.referral.resume.name
+        self.assertEqual(self.client.get(f'/media/profile_images/../{name}').status_code, 403)
+        self.assertEqual(self.client.get(f'/media/./{name}').status_code, 403)
+
+
+@override_settings(THUMBNAIL_WORKERS=0)
+class ThumbnailTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        overrides = override_settings(MEDIA_ROOT=media.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.alumni = make_alumni('photogenic')
+
+    def photo(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (1600, 1200), 'teal').save(buffer, 'JPEG')
+        return SimpleUploadedFile('me.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+    def test_upload_creates_variants_used_by_directory_cards(self):
+        client = APIClient()
+        client.force_authenticate(self.alumni)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.put('/api/profile/update/', {'image': self.photo()}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+
+        image_name = User.objects.get(pk=self.alumni.pk).image.name
+        variants = os.listdir(os.path.join(settings.MEDIA_ROOT, 'thumbnails', image_name))
+        self.assertCountEqual(variants, [f'{size}.{fmt}' for size in (64, 128, 256) for fmt in ('webp', 'jpg')])
+
+        card = client.get('/api/alumni/').data['results'][0]
+        self.assertTrue(card['image'].endswith(f'/media/thumbnails/{image_name}/128.webp'))
+        self.assertTrue(card['image_fallback'].endswith(f'/media/thumbnails/{image_name}/128.jpg'))
+        small = os.path.getsize(os.path.join(settings.MEDIA_ROOT, 'thumbnails', image_name, '128.webp'))
+        self.assertLess(small * 10, os.path.getsize(os.path.join(settings.MEDIA_ROOT, image_name)))
+
+    def test_missing_variant_is_made_on_request(self):
+        User.objects.filter(pk=self.alumni.pk).update(image=default_storage.save('profile_images/me.jpg', self.photo()))
+        image_name = User.objects.get(pk=self.alumni.pk).image.name
+
+        response = self.client.get(f'/media/thumbnails/{image_name}/64.jpg')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(self.client.get(f'/media/thumbnails/{image_name}/65.jpg').status_code, 404)
+
+    def test_protected_images_get_no_public_variants(self):
+        name = default_storage.save('mentorship_activities/whiteboard.jpg', self.photo())
+        self.assertEqual(self.client.get(f'/media/{name}').status_code, 403)
+        self.assertEqual(self.client.get(f'/media/thumbnails/{name}/256.webp').status_code, 404)
+        self.assertFalse(default_storage.exists(f'thumbnails/{name}/256.webp'))
+
+
+class ConnectionTimingTests(TestCase):
+    def test_connection_setup_is_reported_and_counted(self):
+        reset_connection_stats()
+        client = APIClient()
+        client.force_authenticate(make_user('timer'))
+        for _ in range(3):
+            response = client.get('/api/events/')
+        self.assertRegex(response['Server-Timing'], r'^db-connect;dur=[\d.]+;desc="reused"')
+        stats = connection_stats()
+        self.assertEqual(stats['opened'] + stats['reused'], 3)
+        self.assertEqual(stats['reuse_ratio'], 1.0)  # the test database connection stays open
+
+    def test_requests_without_queries_do_not_touch_the_connection(self):
+        reset_connection_stats()
+        client = APIClient()
+        client.force_authenticate(make_user('cached'))
+        catalogue = client.get('/api/mentorship-types/')
+        before = connection_stats()
+        with self.assertNumQueries(0):
+            response = client.get('/api/mentorship-types/', HTTP_IF_NONE_MATCH=catalogue['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertNotIn('db-connect', response.get('Server-Timing', ''))
+        self.assertEqual(connection_stats(), before)
+
+    def test_async_views_are_skipped(self):
+        reset_connection_stats()
+        response = asyncio.run(AsyncClient().get('/api/notifications/stream/'))
+        self.assertEqual(response.status_code, 401)
+        self.assertNotIn('db-connect', response['Server-Timing'])
+        self.assertEqual(connection_stats()['opened'] + connection_stats()['reused'], 0)
+
+
+@override_settings(PERF_SAMPLE_RATE=1.0)
+class PerformanceMiddlewareTests(TestCase):
+    def setUp(self):
+        reset_metrics()
+        self.student = make_user('profiled')
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def test_server_timing_and_metrics(self):
+        response = self.client.get('/api/events/')
+        timing = response['Server-Timing']
+        for entry in ('total;dur=', 'db;dur=', 'serialize;dur='):
+            self.assertIn(entry, timing)
+
+        self.client.force_authenticate(make_user('ops', is_staff=True))
+        views = self.client.get('/api/metrics/').data['views']
+        events = views['GET event-list']
+        self.assertEqual((events['requests'], events['sampled']), (1, 1))
+        self.assertEqual(events['bytes_per_request'], len(response.content))
+        self.assertGreater(events['queries_per_request'], 0)
+
+        self.client.force_authenticate(self.student)
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+        # loopback is not enough: behind a local proxy every request comes from there
+        self.assertEqual(APIClient(REMOTE_ADDR='127.0.0.1').get('/api/metrics/').status_code, 401)
+        with override_settings(METRICS_TOKEN='s3cret'):
+            scraper = APIClient(HTTP_X_METRICS_TOKEN='s3cret')
+            self.assertEqual(scraper.get('/api/metrics/').status_code, 200)
+            self.assertEqual(APIClient(HTTP_X_METRICS_TOKEN='guess').get('/api/metrics/').status_code, 401)
+
+    def test_repeated_queries_are_flagged(self):
+        for n in range(6):
+            MentorshipRequest.objects.create(student=self.student, alumni=make_alumni(f'mentor{n}'))
+
+        def n_plus_one_view(request):
+            names = [r.alumni.username for r in MentorshipRequest.objects.all()]  # one alumni query per row
+            return JsonResponse({'names': names})
+
+        def get_response(request):
+            request.resolver_match = ResolverMatch(n_plus_one_view, (), {}, url_name='n-plus-one')
+            middleware.process_view(request, n_plus_one_view, (), {})
+            return n_plus_one_view(request)
+
+        middleware = PerformanceMiddleware(get_response)
+        with self.assertLogs('campus.perf', 'WARNING') as logs:
+            response = middleware(RequestFactory().get('/n-plus-one/'))
+        self.assertIn('n-plus-one;desc="6x same query"', response['Server-Timing'])
+        self.assertIn('6x SELECT', logs.output[0])
+        self.assertEqual(metrics_snapshot()['GET n-plus-one']['n_plus_one_requests'], 1)
+
+
+    def test_profile_ignores_queries_of_other_requests_on_the_connection(self):
+        # under ASGI, sync code of concurrent requests runs on one thread and shares its connection
+        profile = RequestProfile()
+        request_context = contextvars.copy_context()
+        request_context.run(setattr, perf._local, 'profile', profile)
+        with connection.execute_wrapper(profile):
+            User.objects.count()
+            request_context.run(User.objects.count)
+        self.assertEqual(profile.queries, 1)
+
+
+class ReplicaRouterTests(TransactionTestCase):  # TestCase's transaction would keep every read on the primary
+    def setUp(self):
+        patcher = mock.patch('campus.routers.replica_aliases', return_value=['replica1'])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(setattr, routing_state, 'use_replica', False)
+        self.router = ReplicaRouter()
+
+    def test_only_flagged_campus_reads_outside_transactions_use_a_replica(self):
+        routing_state.use_replica = False
+        self.assertIsNone(self.router.db_for_read(Event))
+
+        routing_state.use_replica = True
+        self.assertEqual(self.router.db_for_read(Event), 'replica1')
+        self.assertIsNone(self.router.db_for_read(Token))  # auth lookups stay on the primary
+        self.assertEqual(self.router.db_for_write(Event), 'default')
+
+    def test_flag_belongs_to_the_request_context_not_the_thread(self):
+        request_context = contextvars.copy_context()
+        request_context.run(setattr, routing_state, 'use_replica', True)
+        self.assertEqual(request_context.run(self.router.db_for_read, Event), 'replica1')
+        self.assertIsNone(self.router.db_for_read(Event))  # another request on the same thread
+
+    def test_requests_are_flagged_by_viewset_method_and_recent_writes(self):
+        user = make_user('reader')
+        token = Token.objects.create(user=user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        seen = []
+
+        def db_for_read(router, model, **hints):
+            seen.append(routing_state.use_replica)
+
+        with mock.patch.object(ReplicaRouter, 'db_for_read', db_for_read):
+            client.get('/api/events/')
+            self.assertTrue(seen.pop())
+            client.get('/api/mentorship-requests/')  # not a replica viewset
+            self.assertFalse(seen.pop())
+
+            client.put('/api/profile/update/', {'bio': 'hi'}, format='json')
+            seen.clear()
+            client.get('/api/events/')  # pinned to the primary right after a write
+            self.assertFalse(any(seen))
+
+
+@skipUnless('replica1' in settings.DATABASES, "Set DB_REPLICAS to run, e.g. DB_ENGINE=django.db.backends.sqlite3 "
+                                              "DB_NAME=primary.sqlite3 DB_REPLICAS=replica.sqlite3")
+class ReplicaDatabaseTests(TransactionTestCase):
+    databases = {'default', 'replica1'} & set(settings.DATABASES)
+
+    def test_reads_hit_the_replica_until_the_user_writes(self):
+        user = make_user('reader')
+        token = Token.objects.create(user=user)
+        # a row that only exists on the replica shows which database answered
+        User.objects.db_manager('replica1').create_user(
+            username='replica_only', first_name='Replica', last_name='Only',
+            role='alumni', college='GEC', degree='B.Tech', batch_year=2015,
+        )
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        names = lambda: [row['name'] for row in client.get('/api/alumni/').data['results']]  # noqa: E731
+        self.assertEqual(names(), ['Replica Only'])
+        client.put('/api/profile/update/', {'bio': 'hi'}, format='json')
+        self.assertEqual(names(), [])
+
+
+class JobBoardTests(TestCase):
+    def setUp(self):
+        self.student = make_user('seeker')
+        self.mentor = make_alumni('mentor')
+        self.stranger = make_alumni('stranger')
+        self.jobs = {
+            'backend': Job.objects.create(title='Backend Engineer', company='Acme', location='Kochi',
+                                          description='Django APIs', job_type='full_time', posted_by=self.mentor),
+            'intern': Job.objects.create(title='Data Intern', company='Globex', location='Remote',
+                                         description='Pandas', job_type='internship', posted_by=self.mentor),
+            'hidden': Job.objects.create(title='Hidden', company='Acme', location='Kochi',
+                                         description='-', posted_by=self.stranger),
+        }
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def titles(self, **params):
+        return sorted(row['title'] for row in self.client.get('/api/jobs/', params).data['results'])
+
+    def test_feed_is_one_query_and_follows_accepted_mentorships(self):
+        self.assertEqual(self.titles(), [])
+        request = MentorshipRequest.objects.create(student=self.student, alumni=self.mentor)
+        with self.captureOnCommitCallbacks(execute=True):
+            request.status = 'accepted'
+            request.save()
+
+        self.titles()  # fills the visibility cache
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/jobs/')
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(response.data['results'][0]['posted_by_full_name'], 'Mentor Test')
+        self.assertEqual(self.titles(), ['Backend Engineer', 'Data Intern'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/mentorship-requests/{request.id}/cancel/')
+        self.assertEqual(self.titles(), [])
+
+    def test_filters(self):
+        self.client.force_authenticate(self.mentor)  # alumni see every job
+        self.assertEqual(self.titles(job_type='internship'), ['Data Intern'])
+        self.assertEqual(self.titles(company='acme'), ['Backend Engineer', 'Hidden'])
+        self.assertEqual(self.titles(location='remote'), ['Data Intern'])
+        self.assertEqual(self.titles(q='django engineer'), ['Backend Engineer'])
+        self.assertEqual(self.titles(my_jobs='true', company='acme'), ['Backend Engineer'])
+
+
+class ReferralInboxTests(TestCase):
+    def setUp(self):
+        self.poster = make_alumni('poster')
+        self.jobs = [
+            Job.objects.create(title=f'Job {i}', company='Acme', location='Kochi', description='-', posted_by=self.poster)
+            for i in range(2)
+        ]
+        states = ['pending', 'pending', 'viewed', 'referred', 'rejected']
+        for i, state in enumerate(states):
+            ReferralRequest.objects.create(
+                job=self.jobs[i % 2], student=make_user(f'applicant{i}'),
+                resume='referral_resumes/cv.pdf', status=state,
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.poster)
+
+    def test_inbox_query_count_does_not_grow_with_rows(self):
+        with CaptureQueriesContext(connection) as small:
+            self.client.get('/api/referrals/')
+        for i in range(5):
+            ReferralRequest.objects.create(job=self.jobs[0], student=make_user(f'late{i}'), resume='referral_resumes/cv.pdf')
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get('/api/referrals/')
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(response.data['results'][0]['job_title'], 'Job 0')
+
+    def test_filters_by_job_and_status(self):
+        response = self.client.get('/api/referrals/', {'job': self.jobs[0].id, 'status': 'pending,referred'})
+        self.assertEqual([r['status'] for r in response.data['results']], ['pending'])
+        response = self.client.get('/api/referrals/', {'status': 'viewed'})
+        self.assertEqual([r['job'] for r in response.data['results']], [self.jobs[0].id])
+        self.assertEqual(self.client.get('/api/referrals/', {'job': 'x'}).status_code, 400)
+
+    def test_own_job_list_carries_referral_counts(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/jobs/', {'my_jobs': 'true'})
+        self.assertEqual(len(queries), 1)
+        counts = {
+            row['title']: (row['pending_referrals'], row['viewed_referrals'], row['referred_referrals'])
+            for row in response.data['results']
+        }
+        self.assertEqual(counts, {'Job 0': (1, 1, 0), 'Job 1': (1, 0, 1)})
+        self.assertNotIn('pending_referrals', self.client.get('/api/jobs/').data['results'][0])
+
+
+class BulkStatusTests(TestCase):
+    def setUp(self):
+        self.alumni = make_alumni('mentor')
+        self.other = make_alumni('other')
+        self.students = [make_user(f'student{i}') for i in range(4)]
+        self.pending = [MentorshipRequest.objects.create(student=s, alumni=self.alumni) for s in self.students[:3]]
+        self.rejected = MentorshipRequest.objects.create(student=self.students[3], alumni=self.alumni, status='rejected')
+        self.foreign = MentorshipRequest.objects.create(student=self.students[0], alumni=self.other)
+        self.client = APIClient()
+        self.client.force_authenticate(self.alumni)
+        self.client.get('/api/alumni/dashboard-stats/')  # creates the stats row
+
+    def bulk(self, url, ids, target):
+        return self.client.post(url, {'ids': ids, 'status': target}, format='json')
+
+    def assert_counters_match_source(self, alumni):
+        stored = AlumniStats.objects.get(alumni=alumni)
+        expected = compute_stats([alumni.id])[alumni.id]
+        self.assertEqual({field: getattr(stored, field) for field in COUNTER_FIELDS}, expected)
+
+    def test_accept_many_with_per_id_outcomes(self):
+        ids = [r.id for r in self.pending] + [self.rejected.id, self.foreign.id, 999999]
+        before = self.pending[0].updated_at
+        with mock.patch('campus.transitions.notify') as notify_mock, \
+                CaptureQueriesContext(connection) as queries:
+            response = self.bulk('/api/mentorship-requests/bulk-status/', ids, 'accepted')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 3)
+        results = {r['id']: r['result'] for r in response.data['results']}
+        self.assertEqual(results[self.rejected.id], 'invalid_transition')
+        self.assertEqual(results[self.foreign.id], 'not_found')
+        self.assertEqual(results[999999], 'not_found')
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "campus_mentorshiprequest"')]
+        self.assertEqual(len(updates), 1)
+
+        self.assertEqual(notify_mock.call_count, 3)
+        self.pending[0].refresh_from_db()
+        self.assertEqual(self.pending[0].status, 'accepted')
+        self.assertGreater(self.pending[0].updated_at, before)
+        self.foreign.refresh_from_db()
+        self.assertEqual(self.foreign.status, 'pending')
+        self.assert_counters_match_source(self.alumni)
+
+        # the students cancel; one keeps an older accepted request, so stays a mentee
+        MentorshipRequest.objects.create(student=self.students[0], alumni=self.alumni, status='accepted')
+        self.client.force_authenticate(self.students[0])
+        response = self.bulk('/api/mentorship-requests/bulk-status/', [self.pending[0].id, self.pending[1].id], 'cancelled')
+        self.assertEqual([r['result'] for r in response.data['results']], ['updated', 'not_found'])
+        self.assert_counters_match_source(self.alumni)
+
+    def test_referrals_move_in_one_call(self):
+        job = Job.objects.create(title='SDE', company='Acme', location='Remote', description='-', posted_by=self.alumni)
+        referrals = [
+            ReferralRequest.objects.create(job=job, student=s, resume='referral_resumes/cv.pdf', status=state)
+            for s, state in zip(self.students, ['pending', 'viewed', 'rejected'])
+        ]
+        with mock.patch('campus.transitions.notify'):
+            response = self.bulk('/api/referrals/bulk-status/', [r.id for r in referrals], 'referred')
+        self.assertEqual([r['result'] for r in response.data['results']], ['updated', 'updated', 'invalid_transition'])
+        self.assertEqual(ReferralRequest.objects.filter(status='referred').count(), 2)
+        self.assert_counters_match_source(self.alumni)
+
+        self.client.force_authenticate(self.other)
+        response = self.bulk('/api/referrals/bulk-status/', [referrals[2].id], 'viewed')
+        self.assertEqual(response.data['results'], [{'id': referrals[2].id, 'result': 'not_found'}])
+
+    def test_rejects_bad_bodies(self):
+        url = '/api/mentorship-requests/bulk-status/'
+        self.assertEqual(self.bulk(url, [1], 'pending').status_code, 400)
+        self.assertEqual(self.bulk(url, [], 'accepted').status_code, 400)
+        self.assertEqual(self.bulk(url, ['1'], 'accepted').status_code, 400)
+        with override_settings(BULK_STATUS_MAX_IDS=2):
+            self.assertEqual(self.bulk(url, [1, 2, 3], 'accepted').status_code, 400)
+
+
+class ChangedColumnsTests(TestCase):
+    def setUp(self):
+        self.alumni = make_alumni('mentor')
+        self.student = make_user('mentee')
+        self.client = APIClient()
+
+    def updated_columns(self, queries, table):
+        # e.g. UPDATE "campus_user" SET "bio" = %s WHERE ... -> ['bio']
+        statements = [q['sql'] for q in queries if q['sql'].startswith(f'UPDATE "{table}" SET')]
+        self.assertEqual(len(statements), 1, statements)
+        assignments = statements[0].split(' SET ', 1)[1].rsplit(' WHERE ', 1)[0]
+        return sorted(re.findall(r'"(\w+)" = ', assignments))
+
+    def test_status_actions_write_only_status(self):
+        request = MentorshipRequest.objects.create(student=self.student, alumni=self.alumni, message='Long note ' * 50)
+        self.client.force_authenticate(self.alumni)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(f'/api/mentorship-requests/{request.id}/accept/')
+        self.assertEqual(self.updated_columns(queries, 'campus_mentorshiprequest'), ['status', 'updated_at'])
+
+    def test_profile_edit_writes_only_changed_columns(self):
+        self.client.force_authenticate(self.alumni)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.put('/api/profile/update/', {
+                'bio': 'Now mentoring', 'first_name': self.alumni.first_name, 'job_title': 'Staff Engineer',
+                'current_company': 'Acme',
+            }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.updated_columns(queries, 'campus_user'), ['bio'])
+        self.assertEqual(self.updated_columns(queries, 'campus_alumniprofile'), ['job_title'])
+
+        self.alumni.refresh_from_db()
+        self.assertEqual((self.alumni.bio, self.alumni.alumni_profile.job_title), ('Now mentoring', 'Staff Engineer'))
+
+    def test_unchanged_and_deferred_fields(self):
+        with self.assertNumQueries(0):
+            self.student.save()  # nothing changed, no auto_now column: no UPDATE at all
+
+        user = User.objects.only('id', 'first_name').get(pk=self.student.pk)
+        user.first_name = 'Renamed'
+        user.bio  # loading a deferred field must not forget the pending edit
+        with CaptureQueriesContext(connection) as queries:
+            user.save()
+        self.assertEqual(self.updated_columns(queries, 'campus_user'), ['first_name'])
+        self.assertEqual(User.objects.get(pk=user.pk).first_name, 'Renamed')
+
+
+class MentorshipReadModelTests(TestCase):
+    def setUp(self):
+        self.alumni = make_alumni('mentor', job_title='Architect')
+        self.students = [make_user(f'mentee{i}') for i in range(3)]
+        self.client = APIClient()
+
+    def pairs(self):
+        return set(Mentorship.objects.values_list('alumni_id', 'student_id', 'request_id'))
+
+    def set_status(self, request, status):
+        request.status = status
+        request.save()
+
+    def test_rows_follow_accepts_cancels_and_deletes(self):
+        student = self.students[0]
+        first = MentorshipRequest.objects.create(student=student, alumni=self.alumni)
+        self.assertEqual(self.pairs(), set())
+        self.set_status(first, 'accepted')
+        started = Mentorship.objects.get().started_at
+
+        second = MentorshipRequest.objects.create(student=student, alumni=self.alumni, status='accepted')
+        self.assertEqual(self.pairs(), {(self.alumni.id, student.id, second.id)})
+        self.assertEqual(Mentorship.objects.get().started_at, started)
+
+        second.delete()  # the row falls back to the request still accepted
+        self.assertEqual(self.pairs(), {(self.alumni.id, student.id, first.id)})
+        self.set_status(first, 'cancelled')
+        self.assertEqual(self.pairs(), set())
+
+    def test_bulk_transitions_keep_rows_in_sync(self):
+        requests = [MentorshipRequest.objects.create(student=s, alumni=self.alumni) for s in self.students]
+        self.client.force_authenticate(self.alumni)
+        self.client.post('/api/mentorship-requests/bulk-status/', {'ids': [r.id for r in requests], 'status': 'accepted'}, format='json')
+        self.assertEqual(len(self.pairs()), 3)
+
+        self.client.force_authenticate(self.students[0])
+        self.client.post('/api/mentorship-requests/bulk-status/', {'ids': [requests[0].id], 'status': 'cancelled'}, format='json')
+        self.assertEqual({student_id for _, student_id, _ in self.pairs()}, {self.students[1].id, self.students[2].id})
+
+    def test_lists_are_paginated_with_profiles_in_constant_queries(self):
+        def list_mentees():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get('/api/mentorships/', {'page_size': 2})
+            return len(queries), response
+
+        self.client.force_authenticate(self.alumni)
+        MentorshipRequest.objects.create(student=self.students[0], alumni=self.alumni, status='accepted')
+        small, _ = list_mentees()
+        for student in self.students[1:]:
+            MentorshipRequest.objects.create(student=student, alumni=self.alumni, status='accepted')
+        MentorshipRequest.objects.create(student=self.students[1], alumni=make_alumni('other'), status='accepted')
+        large, response = list_mentees()
+        self.assertEqual(small, large)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+        self.assertEqual(response.data['results'][0]['student_full_name'], 'Mentee2 Test')
+
+        self.client.force_authenticate(self.students[1])
+        mentors = self.client.get('/api/mentorships/').data['results']
+        self.assertEqual(sorted(m['alumni_role'] for m in mentors), ['Architect', 'Engineer'])
@@ -0,0 +1,124 @@
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# PROFILE IMAGE THUMBNAILS
+# =========================
+# Every profile image gets square variants in THUMBNAIL_SIZES, each as WebP
+# and as a JPEG fallback, stored next to each other:
+#
+#   thumbnails/<image name>/<size>.webp     e.g. thumbnails/profile_images/me.png/128.webp
+#   thumbnails/<image name>/<size>.jpg
+#
+# The names depend only on the image name, so serializers can link a variant
+# without checking the disk. Variants are made in the background after the
+# upload commits; if one is asked for before it exists, serve_media makes it
+# on the spot (see `ensure_thumbnail`).
+FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpg': {'format': 'JPEG', 'quality': 85, 'optimize': True, 'progressive': True},
+}
+DEFAULT_FORMAT = 'webp'
+PREFIX = 'thumbnails/'
+# only profile images (User.image's upload_to) get variants; thumbnails are
+# served publicly, so a protected activity image must never be a source
+SOURCE_PREFIX = 'profile_images/'
+
+_executor = None
+
+
+def thumbnail_name(image_name, size, fmt=DEFAULT_FORMAT):
+    return f'{PREFIX}{image_name}/{size}.{fmt}'
+
+
+def parse_thumbnail_name(name):
+    """Returns (image name, size, format) for a thumbnail path, or None if it isn't one."""
+    if not name.startswith(PREFIX):
+        return None
+    image_name, variant = posixpath.split(name[len(PREFIX):])
+    size, _, fmt = variant.partition('.')
+    if not image_name.startswith(SOURCE_PREFIX) or not size.isdigit() or int(size) not in settings.THUMBNAIL_SIZES or fmt not in FORMATS:
+        return None
+    return image_name, int(size), fmt
+
+
+def render(source, size, fmt):
+    image = ImageOps.fit(source, (size, size), Image.LANCZOS)
+    if fmt == 'jpg' and image.mode != 'RGB':
+        # JPEG has no alpha channel; flatten transparent avatars onto white
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.convert('RGBA').split()[-1])
+        image = background
+    buffer = BytesIO()
+    image.save(buffer, **FORMATS[fmt])
+    return buffer.getvalue()
+
+
+def generate_thumbnails(image_name, variants=None):
+    """Writes the missing variants of one image; `variants` defaults to every size and format."""
+    variants = variants or [(size, fmt) for size in settings.THUMBNAIL_SIZES for fmt in FORMATS]
+    missing = [(size, fmt) for size, fmt in variants if not default_storage.exists(thumbnail_name(image_name, size, fmt))]
+    if not missing:
+        return 0
+
+    with default_storage.open(image_name, 'rb') as handle:
+        source = Image.open(handle)
+        source = ImageOps.exif_transpose(source)  # phone photos are often stored sideways
+        source.load()
+    if source.mode not in ('RGB', 'RGBA'):
+        source = source.convert('RGBA' if 'transparency' in source.info or source.mode in ('LA', 'PA') else 'RGB')
+
+    for size, fmt in missing:
+        name = thumbnail_name(image_name, size, fmt)
+        saved = default_storage.save(name, ContentFile(render(source, size, fmt)))
+        if saved != name:
+            default_storage.delete(saved)  # made concurrently by another worker
+    return len(missing)
+
+
+def ensure_thumbnail(name):
+    """Makes one missing variant on request. Returns False if `name` isn't a valid thumbnail of an existing image."""
+    parsed = parse_thumbnail_name(name)
+    if parsed is None or not default_storage.exists(parsed[0]):
+        return False
+    try:
+        generate_thumbnails(parsed[0], [(parsed[1], parsed[2])])
+    except (OSError, Image.DecompressionBombError):
+        logger.warning("Could not make thumbnail %s", name, exc_info=True)
+        return False
+    return True
+
+
+def queue_thumbnails(image_name):
+    """Generates the variants of a newly uploaded image once the transaction commits."""
+    def run():
+        try:
+            generate_thumbnails(image_name)
+        except Exception:
+            logger.exception("Could not make thumbnails for %s", image_name)
+
+    def submit():
+        if settings.THUMBNAIL_WORKERS:
+            get_executor().submit(run)
+        else:
+            run()
+
+    transaction.on_commit(submit)
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.THUMBNAIL_WORKERS, thread_name_prefix='thumbnails')
+    return _executor
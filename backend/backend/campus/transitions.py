@@ -0,0 +1,160 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .cache import invalidate_visible_job_posters
+from .mentorships import pair_filter, sync_mentorships
+from .models import Job, MentorshipRequest, ReferralRequest
+from .notifications import notify
+from .stats import bump, status_deltas, REQUEST_STATUS_FIELDS, REFERRAL_STATUS_FIELDS
+
+
+# =========================
+# BULK STATUS TRANSITIONS
+# =========================
+# Target status -> (who may move a row there, statuses it may come from).
+# The actor is the field on the row that must be the caller.
+MENTORSHIP_TRANSITIONS = {
+    'accepted': ('alumni', ('pending',)),
+    'rejected': ('alumni', ('pending',)),
+    'cancelled': ('student', ('pending', 'accepted')),
+}
+
+REFERRAL_TRANSITIONS = {
+    'viewed': ('job__posted_by', ('pending',)),
+    'referred': ('job__posted_by', ('pending', 'viewed')),
+    'rejected': ('job__posted_by', ('pending', 'viewed')),
+}
+
+
+def parse_bulk_request(data, transitions):
+    """Validates a `{"ids": [...], "status": "..."}` body; returns (ids in order without repeats, status)."""
+    target = data.get('status')
+    if target not in transitions:
+        raise ValidationError({'status': f"Expected one of: {', '.join(transitions)}."})
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        raise ValidationError({'ids': 'Expected a non-empty list of ids.'})
+    if len(ids) > settings.BULK_STATUS_MAX_IDS:
+        raise ValidationError({'ids': f'At most {settings.BULK_STATUS_MAX_IDS} ids per call.'})
+    return list(dict.fromkeys(ids)), target
+
+
+def apply_transition(queryset, user, ids, target, transitions, extra_fields=None):
+    """
+    Moves the rows of `ids` that `user` may change to `target` with one UPDATE
+    whose WHERE clause repeats the ownership and source-status checks. The
+    rows are read (and locked) first for their previous status, which the
+    callers need for counters and notifications.
+
+    Returns (outcomes by id, changed rows as dicts with their old `status`).
+    """
+    actor, sources = transitions[target]
+    owned = queryset.filter(owner_filter(actor, user), pk__in=ids)
+    rows = {row['id']: row for row in owned.select_for_update().values('id', *row_fields(queryset.model))}
+
+    movable = [pk for pk, row in rows.items() if row['status'] in sources]
+    if movable:
+        owned.filter(pk__in=movable, status__in=sources).update(status=target, **(extra_fields or {}))
+
+    outcomes = {}
+    for pk in ids:
+        row = rows.get(pk)
+        if row is None:
+            outcomes[pk] = {'id': pk, 'result': 'not_found'}
+        elif pk in movable:
+            outcomes[pk] = {'id': pk, 'result': 'updated', 'status': target, 'previous_status': row['status']}
+        else:
+            outcomes[pk] = {'id': pk, 'result': 'invalid_transition', 'status': row['status']}
+    return outcomes, [rows[pk] for pk in movable]
+
+
+def owner_filter(actor, user):
+    if actor == 'job__posted_by':
+        # a subquery, not a join: MySQL can't UPDATE a table joined into its own WHERE
+        return Q(job__in=Job.objects.filter(posted_by=user).values('pk'))
+    return Q(**{actor: user})
+
+
+def row_fields(model):
+    if model is MentorshipRequest:
+        return ('status', 'student_id', 'alumni_id')
+    return ('status', 'student_id', 'job_id')
+
+
+# `queryset.update()` sends no signals, so the two functions below do by hand
+# what the post_save receivers in campus/signals.py do for a single save.
+
+@transaction.atomic
+def bulk_mentorship_status(user, ids, target):
+    outcomes, changed = apply_transition(
+        MentorshipRequest.objects.all(), user, ids, target, MENTORSHIP_TRANSITIONS,
+        extra_fields={'updated_at': timezone.now()},  # auto_now isn't applied by update(); delta sync needs it
+    )
+    if not changed:
+        return list(outcomes.values())
+
+    deltas = defaultdict(lambda: defaultdict(int))
+    for row in changed:
+        for field, delta in status_deltas(REQUEST_STATUS_FIELDS, row['status'], target).items():
+            deltas[row['alumni_id']][field] += delta
+    for (student_id, alumni_id), delta in mentee_deltas(changed, target).items():
+        deltas[alumni_id]['total_mentees'] += delta
+    for alumni_id, counters in deltas.items():
+        bump(alumni_id, **counters)
+    sync_mentorships(
+        (row['student_id'], row['alumni_id']) for row in changed if 'accepted' in (row['status'], target)
+    )
+
+    for row in changed:
+        if 'accepted' in (row['status'], target):
+            invalidate_visible_job_posters(row['student_id'])
+        notify([row['student_id'], row['alumni_id']], {
+            'type': 'mentorship_request', 'id': row['id'], 'status': target, 'previous_status': row['status'],
+        })
+    return list(outcomes.values())
+
+
+def mentee_deltas(changed, target):
+    """
+    +1/-1 per (student, alumnus) pair that gains or loses its last accepted
+    request in this batch; the batch version of stats.mentee_delta.
+    """
+    pairs = {(row['student_id'], row['alumni_id']) for row in changed}
+    had_accepted = {(row['student_id'], row['alumni_id']) for row in changed if row['status'] == 'accepted'}
+    others = set(
+        MentorshipRequest.objects.filter(pair_filter(pairs), status='accepted')
+        .exclude(pk__in=[row['id'] for row in changed])
+        .values_list('student_id', 'alumni_id')
+    )
+    deltas = {}
+    for pair in pairs:
+        before = pair in others or pair in had_accepted
+        after = pair in others or target == 'accepted'
+        if before != after:
+            deltas[pair] = 1 if after else -1
+    return deltas
+
+
+@transaction.atomic
+def bulk_referral_status(user, ids, target):
+    outcomes, changed = apply_transition(ReferralRequest.objects.all(), user, ids, target, REFERRAL_TRANSITIONS)
+    if not changed:
+        return list(outcomes.values())
+
+    counters = defaultdict(int)
+    for row in changed:
+        for field, delta in status_deltas(REFERRAL_STATUS_FIELDS, row['status'], target).items():
+            counters[field] += delta
+    bump(user.id, **counters)  # the caller posted every job in the batch
+
+    for row in changed:
+        notify([row['student_id'], user.id], {
+            'type': 'referral_request', 'id': row['id'], 'job': row['job_id'],
+            'status': target, 'previous_status': row['status'],
+        })
+    return list(outcomes.values())
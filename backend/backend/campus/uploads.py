@@ -0,0 +1,209 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from .models import Upload
+
+
+# =========================
+# LIMITS & CONTENT CHECKS
+# =========================
+# Per-purpose limits live in settings.UPLOAD_LIMITS. The extension must be
+# allowed and the first bytes must look like that kind of file, so a renamed
+# executable isn't accepted as a "resume.pdf".
+READ_BLOCK = 64 * 1024
+
+SIGNATURES = {
+    'pdf': (b'%PDF-',),
+    'png': (b'\x89PNG\r\n\x1a\n',),
+    'jpg': (b'\xff\xd8\xff',),
+    'jpeg': (b'\xff\xd8\xff',),
+    'docx': (b'PK\x03\x04',),
+    'pptx': (b'PK\x03\x04',),
+    'xlsx': (b'PK\x03\x04',),
+    'zip': (b'PK\x03\x04',),
+    'doc': (b'\xd0\xcf\x11\xe0',),
+    'ppt': (b'\xd0\xcf\x11\xe0',),
+    'xls': (b'\xd0\xcf\x11\xe0',),
+}
+
+# where the finished files of each purpose are stored (the model fields' upload_to)
+STORAGE_DIRS = {
+    'resume': 'referral_resumes/',
+    'activity_file': 'mentorship_activities/',
+}
+
+
+def extension(filename):
+    return os.path.splitext(filename)[1].lower().lstrip('.')
+
+
+def check_declared(purpose, filename, size):
+    """Validates an upload's name and size before any bytes are accepted."""
+    limits = settings.UPLOAD_LIMITS[purpose]
+    if size < 1:
+        raise ValidationError({'size': 'The file is empty.'})
+    if extension(filename) not in limits['extensions']:
+        raise ValidationError({'filename': f"Allowed file types: {', '.join(limits['extensions'])}."})
+    if size > limits['max_size']:
+        raise ValidationError({'size': f"Files may be at most {limits['max_size'] // (1024 * 1024)} MB."})
+
+
+def signature_length(filename):
+    """How many leading bytes `check_content` needs to judge a file."""
+    ext = extension(filename)
+    if ext == 'txt':
+        return READ_BLOCK
+    return max(len(signature) for signature in SIGNATURES.get(ext, (b'',)))
+
+
+def check_content(filename, head):
+    """Checks the first bytes of a file against the signature of its extension."""
+    ext = extension(filename)
+    if ext == 'txt':
+        ok = b'\x00' not in head
+    else:
+        ok = head.startswith(SIGNATURES.get(ext, (b'',)))
+    if not ok:
+        raise ValidationError({'file': f"The file content does not match a .{ext} file."})
+
+
+def check_file(uploaded_file, purpose):
+    """Validates a file sent directly as multipart form data."""
+    check_declared(purpose, uploaded_file.name, uploaded_file.size)
+    uploaded_file.seek(0)
+    check_content(uploaded_file.name, uploaded_file.read(READ_BLOCK))
+    uploaded_file.seek(0)
+    return uploaded_file
+
+
+# =========================
+# CONTENT-ADDRESSED STORAGE
+# =========================
+def file_sha256(fileobj):
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    for block in iter(lambda: fileobj.read(READ_BLOCK), b''):
+        digest.update(block)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def store_file(fileobj, filename, purpose, sha256=None):
+    """
+    Saves `fileobj` under its SHA-256 and returns the storage name. When the
+    same content was stored before, nothing is written and the existing name
+    is returned, so one resume sent to many jobs is kept once.
+    """
+    sha256 = sha256 or file_sha256(fileobj)
+    ext = extension(filename)
+    name = f"{STORAGE_DIRS[purpose]}{sha256[:2]}/{sha256}{'.' + ext if ext else ''}"
+    if default_storage.exists(name):
+        return name
+    saved = default_storage.save(name, File(fileobj))
+    if saved != name:
+        # someone stored the same content in between; keep theirs
+        default_storage.delete(saved)
+    return name
+
+
+# =========================
+# CHUNKED UPLOADS
+# =========================
+# Protocol (see UploadViewSet):
+#   POST  /api/uploads/        {purpose, filename, size}  -> upload with offset 0
+#   PATCH /api/uploads/<id>/   raw bytes, Upload-Offset: <n>  -> appends one chunk
+#   HEAD  /api/uploads/<id>/   -> Upload-Offset of the bytes received so far
+# A client that loses its connection asks for the offset and resumes there.
+# When the last byte arrives the file is checked, hashed and stored, and the
+# upload id can be passed as `upload` when creating a referral or activity.
+
+class OffsetMismatch(Exception):
+    def __init__(self, offset):
+        self.offset = offset
+
+
+def temp_path(upload):
+    return os.path.join(settings.UPLOAD_TEMP_DIR, f'{upload.pk}.part')
+
+
+def append_chunk(upload, offset, stream):
+    """
+    Streams one chunk from `stream` into the upload's temp file at `offset`
+    and returns the refreshed upload. Raises OffsetMismatch when `offset` is
+    not where the upload currently ends.
+
+    The chunk is first spooled to its own file; it is only copied into the
+    temp file while holding the upload's row lock, after the offset has been
+    checked again, so two requests sending the same chunk can't interleave.
+    """
+    if upload.status != 'uploading' or offset != upload.received:
+        raise OffsetMismatch(upload.received)
+
+    remaining = upload.size - offset
+    os.makedirs(settings.UPLOAD_TEMP_DIR, exist_ok=True)
+    with tempfile.TemporaryFile(dir=settings.UPLOAD_TEMP_DIR) as chunk:
+        written = 0
+        while True:
+            block = stream.read(READ_BLOCK)
+            if not block:
+                break
+            written += len(block)
+            if written > remaining or written > settings.UPLOAD_MAX_CHUNK_SIZE:
+                raise ValidationError({'chunk': 'Chunk is larger than the rest of the file or UPLOAD_MAX_CHUNK_SIZE.'})
+            chunk.write(block)
+
+        with transaction.atomic():
+            upload = Upload.objects.select_for_update().get(pk=upload.pk)
+            if upload.status != 'uploading' or offset != upload.received:
+                raise OffsetMismatch(upload.received)
+
+            path = temp_path(upload)
+            with open(path, 'r+b' if os.path.exists(path) else 'w+b') as part:
+                part.seek(offset)
+                chunk.seek(0)
+                shutil.copyfileobj(chunk, part, READ_BLOCK)
+                part.truncate(offset + written)
+
+                # the first chunk may be shorter than the signature; check once enough has arrived
+                needed = signature_length(upload.filename)
+                if offset < needed and (offset + written >= needed or offset + written == upload.size):
+                    part.seek(0)
+                    try:
+                        check_content(upload.filename, part.read(READ_BLOCK))
+                    except ValidationError:
+                        part.truncate(offset)
+                        raise
+
+            upload.received = offset + written
+            upload.save(update_fields=['received', 'updated_at'])
+
+    if upload.received == upload.size:
+        finish_upload(upload)
+    return upload
+
+
+def finish_upload(upload):
+    path = temp_path(upload)
+    with open(path, 'rb') as part:
+        sha256 = file_sha256(part)
+        name = store_file(part, upload.filename, upload.purpose, sha256)
+    os.remove(path)
+    upload.sha256 = sha256
+    upload.file.name = name
+    upload.status = 'complete'
+    upload.save(update_fields=['sha256', 'file', 'status', 'updated_at'])
+
+
+def discard_upload(upload):
+    path = temp_path(upload)
+    if os.path.exists(path):
+        os.remove(path)
+    upload.delete()
@@ -3,8 +3,9 @@ from rest_framework.routers import DefaultRouter #automatically creates URLs for
 from .views import (
     signup, login_view, update_profile, logout_view, delete_profile,
     EventViewSet, AlumniViewSet, MentorshipTypeViewSet,
-    MentorshipRequestViewSet, MentorshipActivityViewSet,
-    JobViewSet, ReferralRequestViewSet, alumni_dashboard_stats
+    MentorshipRequestViewSet, MentorshipViewSet, MentorshipActivityViewSet,
+    JobViewSet, ReferralRequestViewSet, UploadViewSet, alumni_dashboard_stats, sync,
+    notification_stream, metrics
 )
 
 router = DefaultRouter()
@@ -12,9 +13,11 @@ router.register(r'events', EventViewSet)
 router.register(r'alumni', AlumniViewSet)
 router.register(r'mentorship-types', MentorshipTypeViewSet, basename='mentorship-types')
 router.register(r'mentorship-requests', MentorshipRequestViewSet, basename='mentorship-requests')
+router.register(r'mentorships', MentorshipViewSet, basename='mentorship')
 router.register(r'mentorship-activities', MentorshipActivityViewSet, basename='mentorship-activities')
 router.register(r'jobs', JobViewSet, basename='job')
 router.register(r'referrals', ReferralRequestViewSet, basename='referral')
+router.register(r'uploads', UploadViewSet, basename='upload')
 
 urlpatterns = [
     path('signup/', signup),  
@@ -23,5 +26,8 @@ urlpatterns = [
     path('logout/', logout_view),
     path('delete-profile/', delete_profile),
     path('alumni/dashboard-stats/', alumni_dashboard_stats),
+    path('sync/', sync),
+    path('notifications/stream/', notification_stream),
+    path('metrics/', metrics),
     path('', include(router.urls)),       
 ]
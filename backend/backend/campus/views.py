@@ -1,19 +1,53 @@
+import base64
+import binascii
+import json
+import os
+from datetime import datetime, timedelta
+from io import BytesIO
+
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
-from .permissions import IsOrganizerOrReadOnly
+from .permissions import IsOrganizerOrReadOnly, IsStaffOrMetricsToken
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.authtoken.models import Token
-from django.contrib.auth import authenticate, login, logout
-from django.db.models import Q
-from django.core.mail import send_mail
 from django.conf import settings
-from .models import User, Event, MentorshipType, MentorshipRequest, MentorshipActivity, Job, ReferralRequest
+from django.core.exceptions import SuspiciousFileOperation
+from django.contrib.auth import authenticate, login, logout
+from django.shortcuts import get_object_or_404
+from django.http import Http404, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.views.decorators.http import require_safe
+from django.db.models import Q, Count, Exists, OuterRef, Prefetch, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import AuthenticationFailed, NotFound, ValidationError
+from .authentication import CachedTokenAuthentication, issue_token, token_expired, token_expires_at
+from .cache import get_mentorship_type_catalogue, mentorship_type_details, visible_job_posters
+from .db import connection_stats
+from .emails import queue_email
+from .media import can_access, media_response, is_protected, signed_user_id
+from .notifications import get_broker
+from .perf import metrics_snapshot
+from .registration import register_user, unregister_user
+from .search import search_alumni, alumni_facets, int_param, split_param
+from .stats import get_alumni_stats, COUNTER_FIELDS
+from .thumbnails import ensure_thumbnail
+from .transitions import (
+    MENTORSHIP_TRANSITIONS, REFERRAL_TRANSITIONS, bulk_mentorship_status, bulk_referral_status, parse_bulk_request,
+)
+from .uploads import OffsetMismatch, append_chunk, discard_upload
+from .models import (
+    User, Event, MentorshipType, MentorshipRequest, MentorshipActivity, Mentorship, Job, ReferralRequest, Tombstone, Upload,
+)
 from .serializers import (
     SignupSerializer, UserSerializer, UserUpdateSerializer, 
     EventSerializer, AlumniCardSerializer, MentorshipTypeSerializer,
-    MentorshipRequestSerializer, MentorshipActivitySerializer,
-    JobSerializer, ReferralRequestSerializer
+    MentorshipRequestSerializer, MentorshipSerializer, MentorshipActivitySerializer,
+    JobSerializer, ReferralRequestSerializer, UploadSerializer, wants_registered_users
 )
 
 # =========================
@@ -25,11 +59,12 @@ def signup(request):
 
     if serializer.is_valid():
         user = serializer.save()
-        token, created = Token.objects.get_or_create(user=user) #This creates an authentication token
+        token = issue_token(user) #This creates an authentication token
         return Response(
             {
                 "message": "Signup successful",
                 "token": token.key,
+                "token_expires_at": token_expires_at(token.created),
                 "user": UserSerializer(user).data
             },
             status=status.HTTP_201_CREATED
@@ -62,13 +97,14 @@ def login_view(request):
         )
 
     login(request, user)
-    token, created = Token.objects.get_or_create(user=user)
+    token = issue_token(user)  # replaces expired or old tokens
 
     serializer = UserSerializer(user)
     return Response(
         {
             "message": "Login successful",
             "token": token.key,
+            "token_expires_at": token_expires_at(token.created),
             "user": serializer.data
         },
         status=status.HTTP_200_OK
@@ -102,6 +138,8 @@ def update_profile(request):
 # =========================
 @api_view(['POST'])
 def logout_view(request):
+    if isinstance(request.auth, Token):
+        request.auth.delete()  # revoke the token this request used
     logout(request)
     return Response(
         {"message": "Logout successful"},
@@ -116,11 +154,11 @@ def logout_view(request):
 @permission_classes([IsAuthenticated])
 def delete_profile(request):
     user = request.user
-    user.delete()
+    user.delete()  # cascades to the token; signals evict it from the token cache
     return Response({"message": "User deleted successfully"}, status=status.HTTP_204_NO_CONTENT)
 
 
-from rest_framework import viewsets
+from rest_framework import mixins, viewsets
 from .serializers import SignupSerializer, UserSerializer, UserUpdateSerializer, EventSerializer, AlumniCardSerializer
 # from .models import User, Event
 
@@ -131,21 +169,60 @@ class EventViewSet(viewsets.ModelViewSet):
     queryset = Event.objects.all().order_by('-date')
     serializer_class = EventSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsOrganizerOrReadOnly]
+    cursor_ordering = ('-date', '-id')
+    read_from_replica = True  # see campus/routers.py
+
+    def get_queryset(self):
+        # Attendance count and the caller's own registration come back as columns
+        # of the event query instead of two extra queries per event.
+        user = self.request.user
+        if user.is_authenticated:
+            is_registered = Exists(
+                Event.registered_users.through.objects.filter(event_id=OuterRef('pk'), user_id=user.id)
+            )
+        else:
+            is_registered = Value(False)
+
+        # A correlated count (rather than JOIN + GROUP BY) lets the '-date' index
+        # drive the ordering and stop at the page limit.
+        participants_count = Coalesce(Subquery(
+            Event.registered_users.through.objects.filter(event_id=OuterRef('pk'))
+            .order_by().values('event_id').annotate(total=Count('*')).values('total')
+        ), 0)
+
+        queryset = (
+            Event.objects.select_related('organizer')
+            .annotate(participants_count=participants_count, is_registered=is_registered)
+            .order_by('-date')
+        )
+        if wants_registered_users(self.request):
+            queryset = queryset.prefetch_related('registered_users')
+        if user.is_authenticated:
+            # organizers see who signed up: one query for the whole page, and only
+            # for the caller's own events (the filter shares the prefetch's join)
+            queryset = queryset.prefetch_related(Prefetch(
+                'registered_users',
+                queryset=User.objects.filter(registered_events__organizer=user)
+                .only('id', 'first_name', 'last_name', 'email', 'username').order_by('id'),
+                to_attr='organizer_participants',
+            ))
+        return queryset
 
     def perform_create(self, serializer):
         serializer.save(organizer=self.request.user)
 
-    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    # PUT registers, DELETE unregisters. Both are idempotent, so retries and
+    # double clicks always end in the state the client asked for.
+    @action(detail=True, methods=['put', 'delete'], permission_classes=[IsAuthenticated])
     def register(self, request, pk=None):
-        event = self.get_object()
-        user = request.user
-        #This checks:Is the user already registered for the event?
-        if event.registered_users.filter(id=user.id).exists():
-            event.registered_users.remove(user)
+        event = get_object_or_404(Event.objects.only('id', 'capacity', 'organizer_id'), pk=pk)
+        if request.method == 'DELETE':
+            unregister_user(event, request.user)
             return Response({'status': 'unregistered'}, status=status.HTTP_200_OK)
-        else:
-            event.registered_users.add(user)
-            return Response({'status': 'registered'}, status=status.HTTP_200_OK)
+
+        if register_user(event, request.user) == 'full':
+            return Response({'error': 'This event is full'}, status=status.HTTP_409_CONFLICT)
+        return Response({'status': 'registered'}, status=status.HTTP_200_OK)
 
 
 # =========================
@@ -154,6 +231,28 @@ class EventViewSet(viewsets.ModelViewSet):
 class AlumniViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = User.objects.filter(role='alumni')
     permission_classes = [IsAuthenticated]
+    cursor_ordering = ('id',)
+    read_from_replica = True
+
+    def get_queryset(self):
+        # Load the profile in the same query and all mentorship types in one more,
+        # so the directory costs a fixed number of queries however many alumni there are.
+        queryset = (
+            User.objects.filter(role='alumni')
+            .select_related('alumni_profile')
+            .prefetch_related('alumni_profile__available_for')
+            .order_by('id')
+        )
+        if self.action == 'list':
+            queryset = search_alumni(queryset, self.request.query_params)  # see campus/search.py
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        # Facets describe the whole result set, so only the first page pays for them.
+        if 'cursor' not in request.query_params and request.query_params.get('facets') != 'false':
+            response.data['facets'] = alumni_facets(User.objects.filter(role='alumni'), request.query_params)
+        return response
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -168,22 +267,79 @@ class MentorshipTypeViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = MentorshipType.objects.all()
     serializer_class = MentorshipTypeSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = None  # small catalogue, always returned whole
+    read_from_replica = True
+
+    # Served from campus.cache; clients sending If-None-Match / If-Modified-Since
+    # get a 304 without touching the database or the serializer.
+    def list(self, request, *args, **kwargs):
+        catalogue = get_mentorship_type_catalogue()
+        return self.conditional_response(request, catalogue, catalogue['types'])
+
+    def retrieve(self, request, pk=None, *args, **kwargs):
+        catalogue = get_mentorship_type_catalogue()
+        details = mentorship_type_details([int(pk)]) if str(pk).isdigit() else []
+        if not details:
+            raise NotFound()
+        return self.conditional_response(request, catalogue, details[0])
+
+    def conditional_response(self, request, catalogue, data):
+        not_modified = get_conditional_response(
+            request, etag=catalogue['etag'], last_modified=catalogue['last_modified']
+        )
+        response = not_modified or Response(data)
+        response['ETag'] = catalogue['etag']
+        response['Last-Modified'] = http_date(catalogue['last_modified'])
+        return response
 
 
 # =========================
 # MENTORSHIP REQUEST VIEWSET
 # =========================
+def mentorship_requests_for(user):
+    if user.role == 'student':
+        queryset = MentorshipRequest.objects.filter(student=user)
+    elif user.role == 'alumni':
+        queryset = MentorshipRequest.objects.filter(alumni=user)
+    else:
+        return MentorshipRequest.objects.none()
+    # Both participants and the alumni profile come in the same query and the
+    # types in one more, so an inbox costs the same however long it is.
+    return (
+        queryset.select_related('student', 'alumni', 'alumni__alumni_profile')
+        .prefetch_related('mentorship_types')
+    )
+
+
+def parse_updated_since(params):
+    value = params.get('updated_since')
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValidationError({'updated_since': 'Expected an ISO 8601 datetime.'})
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
 class MentorshipRequestViewSet(viewsets.ModelViewSet):
     serializer_class = MentorshipRequestSerializer
     permission_classes = [IsAuthenticated]
+    cursor_ordering = ('-requested_at', '-id')
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'student':
-            return MentorshipRequest.objects.filter(student=user).order_by('-requested_at')
-        elif user.role == 'alumni':
-            return MentorshipRequest.objects.filter(alumni=user).order_by('-requested_at')
-        return MentorshipRequest.objects.none()
+        queryset = mentorship_requests_for(self.request.user)
+
+        # ?status=pending,accepted  and  ?updated_since=<ISO datetime> for cheap polling
+        statuses = split_param(self.request.query_params, 'status')
+        if statuses:
+            queryset = queryset.filter(status__in=statuses)
+        updated_since = parse_updated_since(self.request.query_params)
+        if updated_since is not None:
+            queryset = queryset.filter(updated_at__gt=updated_since)
+
+        return queryset.order_by('-requested_at')
 
     def perform_create(self, serializer):
         serializer.save(student=self.request.user)
@@ -218,6 +374,45 @@ class MentorshipRequestViewSet(viewsets.ModelViewSet):
         mentorship_request.save()
         return Response({'status': 'cancelled'})
 
+    @action(detail=False, methods=['post'], url_path='bulk-status')
+    def bulk_status(self, request):
+        """
+        {"ids": [...], "status": "accepted" | "rejected" | "cancelled"} applies
+        one status to many requests in a single UPDATE (campus/transitions.py).
+        Answers with one outcome per id: updated, not_found or invalid_transition.
+        """
+        ids, target = parse_bulk_request(request.data, MENTORSHIP_TRANSITIONS)
+        results = bulk_mentorship_status(request.user, ids, target)
+        return Response({'updated': sum(r['result'] == 'updated' for r in results), 'results': results})
+
+
+# =========================
+# MENTEES / MENTORS
+# =========================
+class MentorshipViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    The caller's active mentorships, newest first: mentees for alumni, mentors
+    for students. Read from the Mentorship table (campus/mentorships.py)
+    rather than filtering every request. `request` is the accepted request
+    that activities are opened on.
+    """
+    serializer_class = MentorshipSerializer
+    permission_classes = [IsAuthenticated]
+    cursor_ordering = ('-started_at', '-id')
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.role == 'alumni':
+            queryset = Mentorship.objects.filter(alumni=user)
+        elif user.role == 'student':
+            queryset = Mentorship.objects.filter(student=user)
+        else:
+            return Mentorship.objects.none()
+        return (
+            queryset.select_related('student', 'alumni', 'alumni__alumni_profile')
+            .prefetch_related('request__mentorship_types')
+        )
+
 
 # =========================
 # ALUMNI DASHBOARD STATS API
@@ -226,45 +421,26 @@ class MentorshipRequestViewSet(viewsets.ModelViewSet):
 @permission_classes([IsAuthenticated])
 def alumni_dashboard_stats(request):
     """
-    Returns dashboard statistics for alumni:
-    - Total mentees (accepted requests)
-    - Hours mentored (from completed activities)
-    - Average rating (placeholder for now)
-    - Success rate
+    Returns all dashboard statistics for alumni in one response:
+    - Mentees and mentorship requests by status
+    - Activities (total and completed)
+    - Referral requests on their jobs by status
+    - Registrations for events they organize
+    The numbers come from the user's AlumniStats row (campus/stats.py), so this
+    is a single-row read no matter how much history exists.
     """
     if request.user.role != 'alumni':
         return Response({'error': 'Only alumni can access this endpoint'}, status=status.HTTP_403_FORBIDDEN)
-    
-    user = request.user
-    
-    # Total accepted mentorship requests (unique students)
-    accepted_requests = MentorshipRequest.objects.filter(
-        alumni=user, 
-        status='accepted'
-    )
-    total_mentees = accepted_requests.values('student').distinct().count()
-    
-    # Hours mentored - sum from completed activities
-    # Assuming each completed activity is 1 hour for now
-    # completed_activities = MentorshipActivity.objects.filter(
-    #     mentorship_request__alumni=user,
-    #     status='completed'
-    # ).count()
-    # hours_mentored = completed_activities  # Can be enhanced later with actual duration field
-    
-    # Average rating - placeholder (4.9) until rating system is implemented
-    # avg_rating = 4.9
-    
-    # Success rate - percentage of accepted vs total requests
-    # total_requests = MentorshipRequest.objects.filter(alumni=user).exclude(status='cancelled').count()
-    # success_rate = round((accepted_requests.count() / total_requests * 100), 0) if total_requests > 0 else 0
-    
-    return Response({
-        'total_mentees': total_mentees,
-        # 'hours_mentored': hours_mentored,
-        # 'avg_rating': avg_rating,
-        # 'success_rate': f"{int(success_rate)}%"
-    })
+
+    stats = get_alumni_stats(request.user)
+
+    # Success rate - percentage of accepted vs total requests (cancelled ones don't count)
+    total_requests = stats.pending_requests + stats.accepted_requests + stats.rejected_requests
+    success_rate = round(stats.accepted_requests / total_requests * 100) if total_requests > 0 else 0
+
+    data = {field: getattr(stats, field) for field in COUNTER_FIELDS}
+    data['success_rate'] = f"{int(success_rate)}%"
+    return Response(data)
 
 
 from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
@@ -273,10 +449,18 @@ from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 # =========================
 # MENTORSHIP ACTIVITY VIEWSET
 # =========================
+def mentorship_activities_for(user):
+    #Q() is used to apply OR conditions.
+    return MentorshipActivity.objects.filter(
+        Q(mentorship_request__student=user) | Q(mentorship_request__alumni=user)
+    )
+
+
 class MentorshipActivityViewSet(viewsets.ModelViewSet):
     serializer_class = MentorshipActivitySerializer
     permission_classes = [IsAuthenticated]
     parser_classes = (JSONParser, MultiPartParser, FormParser) #These tell the API how to read incoming data.
+    cursor_ordering = ('-created_at', '-id')
 
     # The get_queryset method is overridden to allow filtering activities based on mentorship request and status.
     def get_queryset(self):
@@ -285,10 +469,7 @@ class MentorshipActivityViewSet(viewsets.ModelViewSet):
         status_filter = self.request.query_params.get('status')
         
         # Base queryset: Only show activities where the user is involved.
-        #Q() is used to apply OR conditions.
-        queryset = MentorshipActivity.objects.filter(
-            Q(mentorship_request__student=user) | Q(mentorship_request__alumni=user)
-        )
+        queryset = mentorship_activities_for(user)
         
         if request_id:
             queryset = queryset.filter(mentorship_request_id=request_id)
@@ -302,16 +483,15 @@ class MentorshipActivityViewSet(viewsets.ModelViewSet):
         # We might want to add some validation here, e.g., only alumni can create certain types
         # or just ensure the user is part of the request.
         mentorship_request = serializer.validated_data.get('mentorship_request')
-        if mentorship_request.student != self.request.user and mentorship_request.alumni != self.request.user:
-             raise serializer.ValidationError("You are not part of this mentorship request.")
- # ---------------------------------------------------------------------------------------------------
+        if mentorship_request.student_id != self.request.user.id and mentorship_request.alumni_id != self.request.user.id:
+             raise ValidationError("You are not part of this mentorship request.")
         activity = serializer.save()
 
-        # Send email notification if a meeting is scheduled
+        # Queue an email notification if a meeting is scheduled.
+        # It is delivered by the send_queued_emails worker, not inside this request.
         if activity.status == 'scheduled':
-            try:
-                subject = f"New Mentorship Session Scheduled: {activity.title}"
-                message = f"""
+            subject = f"New Mentorship Session Scheduled: {activity.title}"
+            message = f"""
 Hello {mentorship_request.student.first_name},
 
 Your mentor, {mentorship_request.alumni.first_name} {mentorship_request.alumni.last_name}, has scheduled a new mentorship session for you.
@@ -329,27 +509,21 @@ Please make sure to attend the session on time.
 Best regards,
 GradLink Team
 """
-                send_mail(
-                    subject,
-                    message,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [mentorship_request.student.email],
-                    fail_silently=False,
-                )
-                print(f"Email sent to {mentorship_request.student.email}")
-            except Exception as e:
-                print(f"Failed to send email: {e}")
+            queue_email(subject, message, [mentorship_request.student.email])
 
 
 
 # =========================
 # JOB & REFERRAL VIEWSETS
 # =========================
+REFERRAL_COUNT_STATES = ('pending', 'viewed', 'referred')  # shown on the poster's job list
 
 class JobViewSet(viewsets.ModelViewSet):
     queryset = Job.objects.all().order_by('-posted_at')
     serializer_class = JobSerializer
     permission_classes = [IsAuthenticated]
+    cursor_ordering = ('-posted_at', '-id')
+    read_from_replica = True
 
     def perform_create(self, serializer):
         if self.request.user.role != 'alumni':
@@ -357,21 +531,39 @@ class JobViewSet(viewsets.ModelViewSet):
         serializer.save(posted_by=self.request.user)
 
     def get_queryset(self):
+        """
+        Students see the jobs of their accepted mentors, alumni see every job;
+        `my_jobs=true` limits it to the caller's own posts and adds their
+        pending/viewed/referred referral counts. Filters:
+        job_type (comma separated), company, location and q (words matched
+        against title, company and description).
+        """
         user = self.request.user
-        queryset = Job.objects.all().order_by('-posted_at')
-        
-        my_jobs = self.request.query_params.get('my_jobs')
-        if my_jobs == 'true':
-            queryset = queryset.filter(posted_by=user)
+        params = self.request.query_params
+        # posted_by is joined in, so the serializer's poster names cost nothing
+        queryset = Job.objects.select_related('posted_by').order_by('-posted_at')
+
+        if params.get('my_jobs') == 'true':
+            # the poster's screen shows referral counts per job; count them in the same query
+            queryset = queryset.filter(posted_by=user).annotate(**{
+                f'{state}_referrals': Count('referral_requests', filter=Q(referral_requests__status=state))
+                for state in REFERRAL_COUNT_STATES
+            })
         elif user.role == 'student':
-            # Get alumni IDs who have an accepted mentorship request with this student
-            accepted_mentors = MentorshipRequest.objects.filter(
-                student=user,
-                status='accepted'
-            ).values_list('alumni', flat=True)
-            
-            queryset = queryset.filter(posted_by__id__in=accepted_mentors)
-        
+            # a literal id list from the cache: no mentorship lookup per feed request
+            queryset = queryset.filter(posted_by_id__in=visible_job_posters(user.id))
+
+        job_types = split_param(params, 'job_type')
+        if job_types:
+            queryset = queryset.filter(job_type__in=job_types)
+        if params.get('company'):
+            queryset = queryset.filter(company__icontains=params['company'].strip())
+        if params.get('location'):
+            queryset = queryset.filter(location__icontains=params['location'].strip())
+        for word in params.get('q', '').split():
+            queryset = queryset.filter(
+                Q(title__icontains=word) | Q(company__icontains=word) | Q(description__icontains=word)
+            )
         return queryset
 
 
@@ -380,19 +572,293 @@ class ReferralRequestViewSet(viewsets.ModelViewSet):
     serializer_class = ReferralRequestSerializer
     permission_classes = [IsAuthenticated]
     parser_classes = (MultiPartParser, FormParser, JSONParser)
+    cursor_ordering = ('-requested_at', '-id')
 
     def get_queryset(self):
+        """
+        Students see the referrals they asked for, alumni the ones for jobs
+        they posted. Filters: job (id) and status (comma separated).
+        """
         user = self.request.user
+        params = self.request.query_params
         if user.role == 'student':
-            return ReferralRequest.objects.filter(student=user).order_by('-requested_at')
+            queryset = ReferralRequest.objects.filter(student=user)
         elif user.role == 'alumni':
             # See referrals for jobs they posted
-            return ReferralRequest.objects.filter(job__posted_by=user).order_by('-requested_at')
-        return ReferralRequest.objects.none()
+            queryset = ReferralRequest.objects.filter(job__posted_by=user)
+        else:
+            return ReferralRequest.objects.none()
+
+        job_id = int_param(params, 'job')
+        if job_id is not None:
+            queryset = queryset.filter(job_id=job_id)
+        statuses = split_param(params, 'status')
+        if statuses:
+            queryset = queryset.filter(status__in=statuses)
+        # the serializer reads student and job names for every row
+        return queryset.select_related('student', 'job').order_by('-requested_at')
 
     def perform_create(self, serializer):
         if self.request.user.role != 'student':
             raise serializer.ValidationError("Only students can request referrals.")
         serializer.save(student=self.request.user)
 
+    @action(detail=False, methods=['post'], url_path='bulk-status')
+    def bulk_status(self, request):
+        """{"ids": [...], "status": "viewed" | "referred" | "rejected"}; see MentorshipRequestViewSet.bulk_status."""
+        ids, target = parse_bulk_request(request.data, REFERRAL_TRANSITIONS)
+        results = bulk_referral_status(request.user, ids, target)
+        return Response({'updated': sum(r['result'] == 'updated' for r in results), 'results': results})
+
+
+# =========================
+# CHUNKED UPLOADS
+# =========================
+class UploadViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    Resumable uploads for resumes and activity files (protocol in campus/uploads.py).
+    Chunks are PATCHed as raw bytes with an `Upload-Offset` header and streamed
+    to disk, so a large file is never held in memory.
+    """
+    serializer_class = UploadSerializer
+    permission_classes = [IsAuthenticated]
+    parser_classes = (JSONParser,)
+
+    def get_queryset(self):
+        return Upload.objects.filter(owner=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(owner=self.request.user)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        data = getattr(response, 'data', None)
+        if isinstance(data, dict) and 'offset' in data:
+            response['Upload-Offset'] = str(data['offset'])
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def partial_update(self, request, pk=None):
+        upload = self.get_object()
+        try:
+            offset = int(request.headers['Upload-Offset'])
+        except (KeyError, ValueError):
+            raise ValidationError({'Upload-Offset': 'Send the byte offset of this chunk in the Upload-Offset header.'})
+
+        try:
+            # read the raw body stream; touching request.data would parse (and buffer) it
+            upload = append_chunk(upload, offset, request.stream or BytesIO())
+        except OffsetMismatch as mismatch:
+            return Response(
+                {'error': 'Offset does not match the bytes received so far.', 'offset': mismatch.offset},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(self.get_serializer(upload).data)
+
+    def perform_destroy(self, instance):
+        discard_upload(instance)
+
+
+# =========================
+# DELTA SYNC API
+# =========================
+SYNC_SECTIONS = ('mentorship_requests', 'mentorship_activities', 'deleted')
+
+
+def parse_sync_watermark(value):
+    """
+    Returns {section: (updated_at, id of the last row sent or None)} for a
+    `since` watermark: a plain datetime applies to every section, a cursor
+    (see `sync`) gives each its own position.
+    """
+    try:
+        since = parse_datetime(value)
+    except ValueError:
+        since = None
+    if since is not None:
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return {section: (since, None) for section in SYNC_SECTIONS}
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(value.encode()))
+        positions = {}
+        for section in SYNC_SECTIONS:
+            updated_at, last_id = payload[section]
+            if last_id is not None and not isinstance(last_id, int):
+                raise TypeError(last_id)
+            updated_at = datetime.fromisoformat(updated_at)
+            if timezone.is_naive(updated_at):
+                raise ValueError(updated_at)
+            positions[section] = (updated_at, last_id)
+        return positions
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        raise ValidationError({'since': 'Expected an ISO 8601 datetime or a watermark returned by /api/sync/.'})
+
+
+def sync_cursor(positions):
+    payload = {section: [updated_at.isoformat(), last_id] for section, (updated_at, last_id) in positions.items()}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def after_position(updated_at, last_id, field='updated_at'):
+    """Rows past (updated_at, id); with no id, every row from updated_at on."""
+    if last_id is None:
+        return Q(**{f'{field}__gte': updated_at})
+    return Q(**{f'{field}__gt': updated_at}) | Q(**{field: updated_at, 'id__gt': last_id})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def sync(request):
+    """
+    Returns the mentorship requests and activities created, updated or deleted
+    since `?since=<watermark>` (everything when it is omitted), plus the
+    `watermark` to send next time.
+
+    The watermark trails the server clock by SYNC_OVERLAP_SECONDS so rows
+    committed late by a slower transaction are still picked up; clients should
+    upsert by id, since rows near the boundary can be sent twice. When a page
+    is cut at SYNC_PAGE_SIZE rows, `has_more` is true and the watermark is an
+    opaque cursor holding the (updated_at, id) of the last row sent, so pages
+    move on even when more rows than that share one timestamp. `full_resync`
+    means the client was away longer than tombstones are kept and must drop
+    its local copy first.
+    """
+    user = request.user
+    now = timezone.now()
+    positions = {}
+    full_resync = False
+    if request.query_params.get('since'):
+        positions = parse_sync_watermark(request.query_params['since'])
+        oldest = min(updated_at for updated_at, _ in positions.values())
+        if oldest < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+            positions, full_resync = {}, True
+
+    limit = settings.SYNC_PAGE_SIZE
+    watermark = now - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)
+    next_positions = {'deleted': (watermark, None)}
+    has_more = False
+    data = {}
+
+    requests_qs = mentorship_requests_for(user)
+    activities_qs = MentorshipActivity.objects.filter(
+        mentorship_request_id__in=mentorship_requests_for(user).values('id')
+    )
+    tombstones = Tombstone.objects.filter(Q(student_id=user.id) | Q(alumni_id=user.id))
+    if positions:
+        tombstones = tombstones.filter(after_position(positions['deleted'][0], None, 'deleted_at'))
+
+    for key, queryset, serializer_class, model in (
+        ('mentorship_requests', requests_qs, MentorshipRequestSerializer, 'mentorship_request'),
+        ('mentorship_activities', activities_qs, MentorshipActivitySerializer, 'mentorship_activity'),
+    ):
+        if positions:
+            queryset = queryset.filter(after_position(*positions[key]))
+        rows = list(queryset.order_by('updated_at', 'id')[:limit + 1])
+        if len(rows) > limit:
+            rows = rows[:limit]
+            has_more = True
+            next_positions[key] = (rows[-1].updated_at, rows[-1].id)
+        else:
+            next_positions[key] = (watermark, None)
+        data[key] = {
+            'changed': serializer_class(rows, many=True, context={'request': request}).data,
+            'deleted': list(tombstones.filter(model=model).order_by('deleted_at').values_list('object_id', flat=True)),
+        }
+
+    return Response({
+        'watermark': sync_cursor(next_positions) if has_more else watermark.isoformat(),
+        'has_more': has_more,
+        'full_resync': full_resync,
+        **data,
+    })
+
+
+# =========================
+# NOTIFICATION STREAM
+# =========================
+# Server-Sent Events: the client keeps one GET open and receives a `data:`
+# line per notification (see signals.py, PUSH NOTIFICATIONS). EventSource
+# can't set headers, so the token may also be passed as `?token=`.
+# Needs an ASGI server (backend/asgi.py); each open stream is an idle
+# coroutine, not a worker thread.
+async def stream_user(request):
+    header = request.headers.get('Authorization', '')
+    key = header[len('Token '):] if header.startswith('Token ') else request.GET.get('token')
+    if key:
+        try:
+            token = await Token.objects.select_related('user').aget(key=key)
+        except Token.DoesNotExist:
+            return None
+        return token.user if token.user.is_active and not token_expired(token.created) else None
+    user = await request.auser()
+    return user if user.is_authenticated else None
+
+
+async def notification_stream(request):
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+    user = await stream_user(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+    async def events():
+        async with get_broker().subscribe(user.id) as subscription:
+            yield f'retry: {settings.NOTIFICATION_RETRY_MS}\n\n'
+            while True:
+                message = await subscription.get(timeout=settings.NOTIFICATION_HEARTBEAT_SECONDS)
+                if message is None:
+                    yield ': keep-alive\n\n'
+                else:
+                    yield f'event: {message["type"]}\ndata: {json.dumps(message)}\n\n'
 
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+    return response
+
+
+# =========================
+# MEDIA FILES
+# =========================
+@require_safe
+def serve_media(request, path):
+    """
+    Serves MEDIA_ROOT files. Resumes and activity files need a signed link
+    (see campus/media.py) or a logged-in user who is part of the referral or
+    mentorship; everything else, like profile images, is public.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    # checks run on the storage name safe_join resolved, not the URL: `a/../referral_resumes/x.pdf` is a resume
+    path = os.path.relpath(full_path, os.path.abspath(settings.MEDIA_ROOT)).replace(os.sep, '/')
+    if not os.path.isfile(full_path) and not ensure_thumbnail(path):
+        raise Http404
+
+    protected = is_protected(path)
+    if protected:
+        user_id = signed_user_id(path, request.GET)
+        if user_id is None:
+            try:
+                authenticated = CachedTokenAuthentication().authenticate(request)
+            except AuthenticationFailed:
+                authenticated = None
+            user = authenticated[0] if authenticated else request.user
+            user_id = user.pk if user.is_authenticated else None
+        if not can_access(user_id, path):
+            return HttpResponseForbidden()
+    return media_response(request, path, full_path, protected)
+
+
+# =========================
+# METRICS API
+# =========================
+@api_view(['GET'])
+@permission_classes([IsStaffOrMetricsToken])
+def metrics(request):
+    """Request timings per view and database connection reuse for this worker process."""
+    return Response({
+        'sample_rate': settings.PERF_SAMPLE_RATE,
+        'views': metrics_snapshot(),
+        'db_connections': connection_stats(),
+    })
@@ -24,10 +24,21 @@ api.interceptors.request.use(
     }
 );
 
+// List endpoints are cursor-paginated ({ next, previous, results }).
+// Follow the `next` links so screens that expect a full array keep working.
+const getAllPages = async (url, params = {}) => {
+    let response = await api.get(url, { params: { page_size: 100, ...params } });
+    const results = [...response.data.results];
+    while (response.data.next) {
+        response = await api.get(response.data.next);
+        results.push(...response.data.results);
+    }
+    return results;
+};
+
 // EVENTS
 export const getEvents = async () => {
-    const response = await api.get('events/');
-    return response.data;
+    return getAllPages('events/');
 };
 
 export const createEvent = async (eventData) => {
@@ -35,8 +46,11 @@ export const createEvent = async (eventData) => {
     return response.data;
 };
 
-export const registerEvent = async (id) => {
-    const response = await api.post(`events/${id}/register/`);
+// PUT registers and DELETE unregisters; both are safe to retry.
+export const registerEvent = async (id, register = true) => {
+    const response = register
+        ? await api.put(`events/${id}/register/`)
+        : await api.delete(`events/${id}/register/`);
     return response.data;
 };
 
@@ -52,8 +66,7 @@ export const updateEvent = async (id, eventData) => {
 
 //Alumni APIs
 export const getAlumni = async () => {
-    const response = await api.get('alumni/');
-    return response.data;
+    return getAllPages('alumni/');
 };
 
 export const getAlumniProfile = async (id) => {
@@ -73,8 +86,13 @@ export const getMentorshipTypes = async () => {
 };
 
 export const getMentorshipRequests = async () => {
-    const response = await api.get('mentorship-requests/');
-    return response.data;
+    return getAllPages('mentorship-requests/');
+};
+
+// Active mentorships: mentees for alumni, mentors for students. Each row has
+// `request`, the accepted request its activities belong to.
+export const getMentorships = async () => {
+    return getAllPages('mentorships/');
 };
 
 export const createMentorshipRequest = async (requestData) => {
@@ -97,11 +115,17 @@ export const cancelMentorshipRequest = async (id) => {
     return response.data;
 };
 
+// Applies one status to many requests at once. Resolves to
+// { updated, results: [{ id, result: 'updated' | 'not_found' | 'invalid_transition', status }] }.
+export const bulkUpdateMentorshipRequests = async (ids, status) => {
+    const response = await api.post('mentorship-requests/bulk-status/', { ids, status });
+    return response.data;
+};
+
 //Mentorship Activities
 export const getMentorshipActivities = async (requestId) => {
-    const url = requestId ? `mentorship-activities/?request_id=${requestId}` : 'mentorship-activities/';
-    const response = await api.get(url);
-    return response.data;
+    const params = requestId ? { request_id: requestId } : {};
+    return getAllPages('mentorship-activities/', params);
 };
 
 export const createMentorshipActivity = async (activityData) => {
@@ -123,8 +147,7 @@ export const deleteMentorshipActivity = async (id) => {
 
 // Jobs
 export const getJobs = async (params = {}) => {
-    const response = await api.get('jobs/', { params });
-    return response.data;
+    return getAllPages('jobs/', params);
 };
 
 export const createJob = async (jobData) => {
@@ -143,9 +166,9 @@ export const deleteJob = async (id) => {
 };
 
 // Referrals
-export const getReferrals = async () => {
-    const response = await api.get('referrals/');
-    return response.data;
+// params: job (id) and status (comma separated), e.g. { status: 'pending,viewed' }
+export const getReferrals = async (params = {}) => {
+    return getAllPages('referrals/', params);
 };
 
 export const createReferral = async (referralData) => {
@@ -159,4 +182,47 @@ export const updateReferral = async (id, referralData) => {
     return response.data;
 };
 
+// status: 'viewed' | 'referred' | 'rejected'; same response as bulkUpdateMentorshipRequests
+export const bulkUpdateReferrals = async (ids, status) => {
+    const response = await api.post('referrals/bulk-status/', { ids, status });
+    return response.data;
+};
+
+// UPLOADS
+// Sends a file in resumable chunks and returns the upload id, which can be
+// passed as `upload` to createReferral / createMentorshipActivity instead of the file.
+const UPLOAD_CHUNK_SIZE = 1024 * 1024;
+
+export const uploadFile = async (file, purpose, onProgress) => {
+    const started = await api.post('uploads/', { purpose, filename: file.name, size: file.size });
+    let offset = started.data.offset;
+    while (offset < file.size) {
+        try {
+            const response = await api.patch(`uploads/${started.data.id}/`, file.slice(offset, offset + UPLOAD_CHUNK_SIZE), {
+                headers: { 'Content-Type': 'application/offset+octet-stream', 'Upload-Offset': offset },
+            });
+            offset = response.data.offset;
+        } catch (error) {
+            // 409: the server has a different offset (e.g. a retried chunk landed); resume from there
+            if (error.response?.status !== 409) throw error;
+            offset = error.response.data.offset;
+        }
+        if (onProgress) onProgress(offset / file.size);
+    }
+    return started.data.id;
+};
+
+// NOTIFICATIONS
+// Opens the server-sent event stream; `onMessage` gets { type, id, status, ... }
+// whenever a mentorship request or referral changes. Call .close() to stop.
+export const subscribeNotifications = (onMessage) => {
+    const user = JSON.parse(localStorage.getItem('user'));
+    if (!user || !user.token) return null;
+    const source = new EventSource(`${API_URL}notifications/stream/?token=${encodeURIComponent(user.token)}`);
+    const handler = (event) => onMessage(JSON.parse(event.data));
+    source.addEventListener('mentorship_request', handler);
+    source.addEventListener('referral_request', handler);
+    return source;
+};
+
 export default api;
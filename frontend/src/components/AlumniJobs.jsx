@@ -74,7 +74,8 @@ const AlumniJobs = () => {
         }
     };
 
-    const pendingCount = referrals.filter(r => r.status === 'pending').length;
+    // counted by the server on the my_jobs list
+    const pendingCount = jobs.reduce((total, job) => total + (job.pending_referrals || 0), 0);
 
     return (
         <>
@@ -286,6 +287,13 @@ const AlumniJobs = () => {
                                                                     color: primaryBrand 
                                                                 }}
                                                             />
+                                                            {job.pending_referrals > 0 && (
+                                                                <Chip
+                                                                    label={`${job.pending_referrals} PENDING`}
+                                                                    size="small"
+                                                                    sx={{ borderRadius: '8px', fontWeight: 700, fontSize: '0.65rem' }}
+                                                                />
+                                                            )}
                                                         </Stack>
                                                         <Typography 
                                                             variant="body2" 
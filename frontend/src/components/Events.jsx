@@ -118,7 +118,8 @@ const Events = () => {
 
   const handleRegister = async (id) => {
     try {
-      const result = await registerEvent(id);
+      const current = events.find(ev => ev.id === id);
+      const result = await registerEvent(id, !current?.registered);
       const isRegistered = result.status === 'registered';
 
       setEvents(events.map(ev => ev.id === id ? { ...ev, registered: isRegistered } : ev));
@@ -28,7 +28,7 @@ import {
 import { useNavigate } from 'react-router-dom';
 import ANavbar from './ANavbar';
 
-import { getMentorshipRequests } from '../api';
+import { getMentorships } from '../api';
 
 const MyMentees = () => {
   const navigate = useNavigate();
@@ -45,8 +45,8 @@ const MyMentees = () => {
   useEffect(() => {
     const fetchMentees = async () => {
       try {
-        const data = await getMentorshipRequests();
-        setMentees(data.filter(r => r.status === 'accepted'));
+        const data = await getMentorships();
+        setMentees(data);
       } catch (error) {
         console.error("Failed to fetch mentees", error);
       } finally {
@@ -197,7 +197,7 @@ const MyMentees = () => {
                         fullWidth
                         variant="outlined"
                         endIcon={<Launch />}
-                        onClick={() => navigate(`/menteeactivities/${mentee.id}`)}
+                        onClick={() => navigate(`/menteeactivities/${mentee.request}`)}
                         sx={{
                           borderRadius: '12px',
                           textTransform: 'none',
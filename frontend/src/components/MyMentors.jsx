@@ -26,7 +26,7 @@ import {
 } from '@mui/icons-material';
 import { useNavigate } from 'react-router-dom';
 import SNavbar from './SNavbar';
-import { getMentorshipRequests } from '../api';
+import { getMentorships } from '../api';
 
 const MyMentors = () => {
   const navigate = useNavigate();
@@ -41,8 +41,8 @@ const MyMentors = () => {
   useEffect(() => {
     const fetchMentors = async () => {
       try {
-        const data = await getMentorshipRequests();
-        setMentors(data.filter(r => r.status === 'accepted'));
+        const data = await getMentorships();
+        setMentors(data);
       } catch (error) {
         console.error("Failed to fetch mentors", error);
       } finally {
@@ -142,14 +142,14 @@ const MyMentors = () => {
           <Stack direction="row" spacing={1} alignItems="center">
             <CalendarToday sx={{ fontSize: 14, color: mutedZinc }} />
             <Typography variant="caption" fontWeight="600" color={mutedZinc}>
-              Since {new Date(mentor.requested_at).toLocaleDateString()}
+              Since {new Date(mentor.started_at).toLocaleDateString()}
             </Typography>
           </Stack>
           <Button
             variant="contained"
             disableElevation
             startIcon={<Timeline />}
-            onClick={() => navigate(`/mentorshipactivities/${mentor.id}`)}
+            onClick={() => navigate(`/mentorshipactivities/${mentor.request}`)}
             sx={{
               bgcolor: deepZinc,
               textTransform: 'none',